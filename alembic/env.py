@@ -21,10 +21,27 @@ if config.config_file_name is not None:
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from db.session import base
+from db.session import base, getDatabaseUrl
 from models import Warehouse, Supplier, Product, Stock
+from models.product_search import SEARCH_INDEX, SEARCH_TABLE
 target_metadata = base.metadata
 
+
+def include_name(name, type_, parent_names):
+    # Full-text search is created outside the metadata, see models/product_search.py;
+    # FTS5 also keeps its own shadow tables next to the virtual table
+    if type_ == "table":
+        return not name.startswith(SEARCH_TABLE)
+    if type_ == "index":
+        return name != SEARCH_INDEX
+    return True
+
+# Migrate the same database the application uses (DATABASE_URL)
+config.set_main_option(
+    "sqlalchemy.url",
+    getDatabaseUrl().render_as_string(hide_password=False).replace("%", "%%")
+)
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -49,6 +66,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -70,7 +88,11 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=include_name,
+            # SQLite can not ALTER most constraints in place
+            render_as_batch=True,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,30 @@
+"""resource versions
+
+Revision ID: 3c1f8a2b7d45
+Revises: 597a934de068
+Create Date: 2026-10-17 11:02:44.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f8a2b7d45'
+down_revision: Union[str, None] = '597a934de068'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('resource_versions',
+    sa.Column('scope', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('scope')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('resource_versions')
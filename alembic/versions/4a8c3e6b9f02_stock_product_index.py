@@ -0,0 +1,26 @@
+"""stock product index
+
+Revision ID: 4a8c3e6b9f02
+Revises: e2f6a8c1d937
+Create Date: 2026-10-17 15:52:13.640982
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a8c3e6b9f02'
+down_revision: Union[str, None] = 'e2f6a8c1d937'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_stocks_product_id_stock_quantity', 'stocks', ['product_id', 'stock_quantity'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stocks_product_id_stock_quantity', table_name='stocks')
@@ -0,0 +1,82 @@
+"""stock warehouse key
+
+Revision ID: 597a934de068
+Revises: d99eebc97550
+Create Date: 2026-10-17 09:31:05.742119
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '597a934de068'
+down_revision: Union[str, None] = 'd99eebc97550'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('stocks') as batch_op:
+        batch_op.add_column(sa.Column('warehouse_id', sa.UUID(), nullable=True))
+
+    # Backfill from the association table
+    op.execute("""
+        UPDATE stocks SET warehouse_id = (
+            SELECT MIN(stock_warehouses.warehouse_id) FROM stock_warehouses
+            WHERE stock_warehouses.stock_id = stocks.id
+        )
+    """)
+
+    # Stock rows not linked to any warehouse were unreachable through the API
+    op.execute("DELETE FROM stock_suppliers WHERE stock_id IN (SELECT id FROM stocks WHERE warehouse_id IS NULL)")
+    op.execute("DELETE FROM stocks WHERE warehouse_id IS NULL")
+
+    # Merge duplicate (warehouse, product) rows into one before the unique index
+    op.execute("""
+        UPDATE stocks SET stock_quantity = (
+            SELECT SUM(duplicate.stock_quantity) FROM stocks AS duplicate
+            WHERE duplicate.warehouse_id = stocks.warehouse_id
+            AND duplicate.product_id = stocks.product_id
+        )
+        WHERE id IN (
+            SELECT MIN(id) FROM stocks GROUP BY warehouse_id, product_id HAVING COUNT(*) > 1
+        )
+    """)
+    op.execute("""
+        DELETE FROM stock_suppliers WHERE stock_id IN (
+            SELECT id FROM stocks WHERE id NOT IN (
+                SELECT MIN(id) FROM stocks GROUP BY warehouse_id, product_id
+            )
+        )
+    """)
+    op.execute("""
+        DELETE FROM stocks WHERE id NOT IN (
+            SELECT MIN(id) FROM stocks GROUP BY warehouse_id, product_id
+        )
+    """)
+
+    with op.batch_alter_table('stocks') as batch_op:
+        batch_op.alter_column('warehouse_id', existing_type=sa.UUID(), nullable=False)
+        batch_op.create_foreign_key('fk_stocks_warehouse_id_warehouses', 'warehouses', ['warehouse_id'], ['id'])
+        batch_op.create_index('ix_stocks_warehouse_id_product_id', ['warehouse_id', 'product_id'], unique=True)
+
+    op.drop_table('stock_warehouses')
+
+
+def downgrade() -> None:
+    op.create_table('stock_warehouses',
+    sa.Column('stock_id', sa.UUID(), nullable=False),
+    sa.Column('warehouse_id', sa.UUID(), nullable=False),
+    sa.ForeignKeyConstraint(['stock_id'], ['stocks.id'], ),
+    sa.ForeignKeyConstraint(['warehouse_id'], ['warehouses.id'], ),
+    sa.PrimaryKeyConstraint('stock_id', 'warehouse_id')
+    )
+    op.execute("INSERT INTO stock_warehouses (stock_id, warehouse_id) SELECT id, warehouse_id FROM stocks")
+
+    with op.batch_alter_table('stocks') as batch_op:
+        batch_op.drop_index('ix_stocks_warehouse_id_product_id')
+        batch_op.drop_constraint('fk_stocks_warehouse_id_warehouses', type_='foreignkey')
+        batch_op.drop_column('warehouse_id')
@@ -0,0 +1,30 @@
+"""product listing indexes
+
+Revision ID: 7c3d9e1f5a28
+Revises: 4a8c3e6b9f02
+Create Date: 2026-10-17 18:05:41.207315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3d9e1f5a28'
+down_revision: Union[str, None] = '4a8c3e6b9f02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_products_category_created_at_id', 'products', ['category', 'created_at', 'id'], unique=False)
+    op.create_index('ix_products_name_id', 'products', ['name', 'id'], unique=False)
+    op.create_index('ix_products_price_id', 'products', ['price', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_products_price_id', table_name='products')
+    op.drop_index('ix_products_name_id', table_name='products')
+    op.drop_index('ix_products_category_created_at_id', table_name='products')
@@ -0,0 +1,41 @@
+"""stock movements
+
+Revision ID: 8e4b2d9f1a63
+Revises: 3c1f8a2b7d45
+Create Date: 2026-10-17 12:18:09.527331
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4b2d9f1a63'
+down_revision: Union[str, None] = '3c1f8a2b7d45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('stock_movements',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('warehouse_id', sa.UUID(), nullable=False),
+    sa.Column('product_id', sa.UUID(), nullable=False),
+    sa.Column('movement_type', sa.String(length=20), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('supplier_id', sa.UUID(), nullable=True),
+    sa.Column('counterpart_warehouse_id', sa.UUID(), nullable=True),
+    sa.Column('reason', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.ForeignKeyConstraint(['warehouse_id'], ['warehouses.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_stock_movements_warehouse_id_product_id_created_at', 'stock_movements', ['warehouse_id', 'product_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stock_movements_warehouse_id_product_id_created_at', table_name='stock_movements')
+    op.drop_table('stock_movements')
@@ -0,0 +1,63 @@
+"""product search
+
+Revision ID: 9d4e7b2c6f15
+Revises: 7c3d9e1f5a28
+Create Date: 2026-10-17 19:12:06.583914
+
+"""
+from typing import Sequence, Union
+from uuid import UUID
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4e7b2c6f15'
+down_revision: Union[str, None] = '7c3d9e1f5a28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 10000
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+
+    if connection.dialect.name == "postgresql":
+        op.execute(
+            "CREATE INDEX ix_products_search ON products USING gin "
+            "(to_tsvector('simple', name || ' ' || coalesce(description, '')))"
+        )
+        return
+
+    op.execute(
+        "CREATE VIRTUAL TABLE product_search USING fts5("
+        "product_id UNINDEXED, name, description, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+
+    # Index the existing products, keyed like api/search.py does
+    insert = sa.text(
+        "INSERT INTO product_search (rowid, product_id, name, description) "
+        "VALUES (:rowid, :product_id, :name, :description)"
+    )
+    products = connection.execute(sa.text("SELECT id, name, description FROM products"))
+    while rows := products.fetchmany(BATCH_SIZE):
+        connection.execute(insert, [
+            {
+                "rowid": int.from_bytes(UUID(str(id)).bytes[:8], "big") >> 1,
+                "product_id": UUID(str(id)).hex,
+                "name": name,
+                "description": description or "",
+            }
+            for id, name, description in rows
+        ])
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index('ix_products_search', table_name='products')
+        return
+
+    op.execute("DROP TABLE product_search")
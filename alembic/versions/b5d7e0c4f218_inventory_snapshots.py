@@ -0,0 +1,96 @@
+"""inventory snapshots
+
+Revision ID: b5d7e0c4f218
+Revises: 8e4b2d9f1a63
+Create Date: 2026-10-17 13:40:51.204417
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+from uuid import uuid4
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d7e0c4f218'
+down_revision: Union[str, None] = '8e4b2d9f1a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+stocks = sa.table('stocks',
+    sa.column('warehouse_id', sa.UUID()),
+    sa.column('product_id', sa.UUID()),
+    sa.column('stock_quantity', sa.Integer()),
+    sa.column('created_at', sa.DateTime())
+)
+
+stock_movements = sa.table('stock_movements',
+    sa.column('id', sa.Uuid()),
+    sa.column('warehouse_id', sa.UUID()),
+    sa.column('product_id', sa.UUID()),
+    sa.column('movement_type', sa.String()),
+    sa.column('quantity', sa.Integer()),
+    sa.column('reason', sa.String()),
+    sa.column('created_at', sa.DateTime())
+)
+
+
+def upgrade() -> None:
+    # Store the ledger id as CHAR(32) on SQLite; with the NUMERIC affinity
+    # of a UUID column some ids are coerced to REAL and collide
+    with op.batch_alter_table('stock_movements') as batch_op:
+        batch_op.alter_column('id', type_=sa.Uuid(), existing_type=sa.UUID(), existing_nullable=False)
+
+    op.create_table('inventory_snapshots',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('warehouse_id', sa.UUID(), nullable=False),
+    sa.Column('taken_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['warehouse_id'], ['warehouses.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_inventory_snapshots_warehouse_id_taken_at', 'inventory_snapshots', ['warehouse_id', 'taken_at'], unique=True)
+    op.create_table('inventory_snapshot_items',
+    sa.Column('snapshot_id', sa.Uuid(), nullable=False),
+    sa.Column('product_id', sa.UUID(), nullable=False),
+    sa.Column('stock_quantity', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.ForeignKeyConstraint(['snapshot_id'], ['inventory_snapshots.id'], ),
+    sa.PrimaryKeyConstraint('snapshot_id', 'product_id')
+    )
+    op.create_index('ix_stock_movements_warehouse_id_created_at', 'stock_movements', ['warehouse_id', 'created_at'], unique=False)
+
+    # Stock that existed before the ledger gets an opening balance, so
+    # replaying the movements of any stock row adds up to its quantity
+    recorded = sa.select(sa.func.coalesce(sa.func.sum(stock_movements.c.quantity), 0)).where(
+        stock_movements.c.warehouse_id == stocks.c.warehouse_id,
+        stock_movements.c.product_id == stocks.c.product_id
+    ).scalar_subquery()
+    missing = op.get_bind().execute(
+        sa.select(stocks.c.warehouse_id, stocks.c.product_id, stocks.c.created_at, (stocks.c.stock_quantity - recorded).label('quantity'))
+        .where(stocks.c.stock_quantity != recorded)
+    ).all()
+    if missing:
+        op.bulk_insert(stock_movements, [
+            {
+                'id': uuid4(),
+                'warehouse_id': row.warehouse_id,
+                'product_id': row.product_id,
+                'movement_type': 'initial',
+                'quantity': row.quantity,
+                'reason': 'Opening balance',
+                'created_at': row.created_at or datetime.utcnow()
+            }
+            for row in missing
+        ])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stock_movements_warehouse_id_created_at', table_name='stock_movements')
+    op.drop_table('inventory_snapshot_items')
+    op.drop_index('ix_inventory_snapshots_warehouse_id_taken_at', table_name='inventory_snapshots')
+    op.drop_table('inventory_snapshots')
+    with op.batch_alter_table('stock_movements') as batch_op:
+        batch_op.alter_column('id', type_=sa.UUID(), existing_type=sa.Uuid(), existing_nullable=False)
@@ -0,0 +1,36 @@
+"""keyset pagination indexes
+
+Revision ID: c1e7a4d8b352
+Revises: 9d4e7b2c6f15
+Create Date: 2026-10-17 21:40:12.914377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c1e7a4d8b352'
+down_revision: Union[str, None] = '9d4e7b2c6f15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Listings page on (created_at, id), see api/pagination.py
+INDEXES = (
+    ('ix_warehouses_created_at_id', 'warehouses'),
+    ('ix_suppliers_created_at_id', 'suppliers'),
+    ('ix_products_created_at_id', 'products'),
+    ('ix_stocks_created_at_id', 'stocks'),
+)
+
+
+def upgrade() -> None:
+    for name, table in INDEXES:
+        op.create_index(name, table, ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    for name, table in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
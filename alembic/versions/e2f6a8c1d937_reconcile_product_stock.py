@@ -0,0 +1,33 @@
+"""reconcile product stock
+
+Revision ID: e2f6a8c1d937
+Revises: b5d7e0c4f218
+Create Date: 2026-10-17 15:06:27.815530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2f6a8c1d937'
+down_revision: Union[str, None] = 'b5d7e0c4f218'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Product totals are maintained by the stock routes from now on; start
+    # them from the sum of the existing stock
+    op.execute("""
+        UPDATE products SET stock_quantity = COALESCE((
+            SELECT SUM(stocks.stock_quantity) FROM stocks
+            WHERE stocks.product_id = products.id
+        ), 0)
+    """)
+
+
+def downgrade() -> None:
+    pass
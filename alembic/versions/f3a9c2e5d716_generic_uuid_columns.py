@@ -0,0 +1,66 @@
+"""generic uuid columns
+
+Revision ID: f3a9c2e5d716
+Revises: c1e7a4d8b352
+Create Date: 2026-10-17 22:18:37.605291
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a9c2e5d716'
+down_revision: Union[str, None] = 'c1e7a4d8b352'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column, nullable) of every id still declared as the PostgreSQL UUID
+COLUMNS = (
+    ('warehouses', 'id', False),
+    ('suppliers', 'id', False),
+    ('products', 'id', False),
+    ('stocks', 'id', False),
+    ('stocks', 'warehouse_id', False),
+    ('stocks', 'product_id', False),
+    ('stock_suppliers', 'stock_id', False),
+    ('stock_suppliers', 'supplier_id', False),
+    ('stock_movements', 'warehouse_id', False),
+    ('stock_movements', 'product_id', False),
+    ('stock_movements', 'supplier_id', True),
+    ('stock_movements', 'counterpart_warehouse_id', True),
+    ('inventory_snapshots', 'warehouse_id', False),
+    ('inventory_snapshot_items', 'product_id', False),
+)
+
+
+def alter_columns(type_, existing_type) -> None:
+    tables = {}
+    for table, column, nullable in COLUMNS:
+        tables.setdefault(table, []).append((column, nullable))
+
+    for table, columns in tables.items():
+        with op.batch_alter_table(table) as batch_op:
+            for column, nullable in columns:
+                batch_op.alter_column(column, type_=type_, existing_type=existing_type, existing_nullable=nullable)
+
+
+def upgrade() -> None:
+    # Both types are the native UUID on PostgreSQL. On SQLite a UUID column
+    # has NUMERIC affinity, so a hex id that parses as a number was stored
+    # as a lossy REAL; CHAR(32) keeps every id as text, like
+    # stock_movements.id already is. Ids mangled that way before this
+    # revision can not be recovered.
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    alter_columns(sa.Uuid(), sa.UUID())
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    alter_columns(sa.UUID(), sa.Uuid())
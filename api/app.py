@@ -1,15 +1,34 @@
+import asyncio
+import os
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
-from .routes import warehouses, suppliers, stock_management, product_management
+from .routes import warehouses, suppliers, stock_management, product_management, product_import, product_search, inventory_reports, diagnostics, metrics
+from .compression import COMPRESSION_ENABLED, CompressionMiddleware
+from .metrics import RequestMetricsMiddleware, TimedJSONResponse
 from .rate_limiter import setup_rate_limiting
+from .snapshots import SNAPSHOT_INTERVAL_SECONDS, run_snapshot_scheduler
+import db.session as db
 
-app = FastAPI(title="Inventory Management API", version="1.0.0")
+app = None
 
-# Setup rate limiting
-setup_rate_limiting(app)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs inside every worker process after it is forked, so no engine or
+    # pooled connection is ever shared across processes.
+    db.initConnection(create_schema=False)
+    scheduler = asyncio.create_task(run_snapshot_scheduler()) if SNAPSHOT_INTERVAL_SECONDS > 0 else None
+    yield
+    if scheduler:
+        scheduler.cancel()
+    await db.getAsyncEngine().dispose()
 
-def runApp():
+def create_app() -> FastAPI:
+    app = FastAPI(title="Inventory Management API", version="1.0.0", lifespan=lifespan, default_response_class=TimedJSONResponse)
+
+    # Setup rate limiting
+    setup_rate_limiting(app)
 
     api_router = APIRouter(prefix="/api")
 
@@ -17,8 +36,13 @@ def runApp():
     api_router.include_router(suppliers.router)
     api_router.include_router(stock_management.router)
     api_router.include_router(product_management.router)
+    api_router.include_router(product_import.router)
+    api_router.include_router(product_search.router)
+    api_router.include_router(inventory_reports.router)
+    api_router.include_router(diagnostics.router)
 
     app.include_router(api_router)
+    app.include_router(metrics.router)
     
     app.add_middleware(
         CORSMiddleware,
@@ -26,10 +50,34 @@ def runApp():
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "ETag", "Server-Timing"],
     )
 
-    uvicorn.run(app, host="127.0.0.1", port=8000)
+    if COMPRESSION_ENABLED:
+        app.add_middleware(CompressionMiddleware)
+
+    # Added last so it wraps every other middleware and times the whole request
+    app.add_middleware(RequestMetricsMiddleware)
+
+    return app
+
+def runApp():
+    # Create the schema once in the parent instead of racing in every worker
+    db.createSchema()
+
+    uvicorn.run(
+        "api.app:create_app",
+        factory=True,
+        host=os.getenv("API_HOST", "127.0.0.1"),
+        port=int(os.getenv("API_PORT", "8000")),
+        workers=int(os.getenv("API_WORKERS", "1")),
+        backlog=int(os.getenv("API_BACKLOG", "2048")),
+    )
 
 def getApp():
     global app
-    return app
\ No newline at end of file
+
+    if app is None:
+        app = create_app()
+
+    return app
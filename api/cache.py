@@ -0,0 +1,116 @@
+import os
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, NamedTuple, Optional
+from uuid import UUID
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import Warehouse
+
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "30"))
+
+# Bounded LRU cache whose entries also expire after a TTL. Writes in this
+# process invalidate their keys directly; the TTL bounds how long another
+# worker process can keep serving an entry changed elsewhere. A TTL of 0
+# disables caching. Routes that tag responses with a resource version (see
+# api/etag.py) read the database instead, so body and ETag always agree.
+class TTLCache:
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.lock = Lock()
+        self.entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    # Taken before reading the value to cache, and handed to set()
+    def generation(self) -> int:
+        with self.lock:
+            return self.invalidations
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+
+        with self.lock:
+            # Something was invalidated since the value was read, possibly
+            # this key; caching the older value would undo the invalidation
+            if generation is not None and generation != self.invalidations:
+                return
+
+            self.entries[key] = (value, time.monotonic() + self.ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self.lock:
+            self.entries.pop(key, None)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.invalidations += 1
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+class WarehouseMetadata(NamedTuple):
+    id: UUID
+    name: str
+    location: str
+
+warehouse_cache = TTLCache(CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS)
+
+# Misses are not cached, so a row created by another worker is visible at once
+async def get_warehouse_metadata(db: AsyncSession, warehouse_uuid: UUID) -> Optional[WarehouseMetadata]:
+    warehouse = warehouse_cache.get(warehouse_uuid)
+    if warehouse is None:
+        generation = warehouse_cache.generation()
+        row = (await db.execute(
+            select(Warehouse.id, Warehouse.name, Warehouse.location).where(Warehouse.id == warehouse_uuid)
+        )).first()
+        if row is None:
+            return None
+
+        warehouse = WarehouseMetadata(*row)
+        warehouse_cache.set(warehouse_uuid, warehouse, generation)
+
+    return warehouse
+
+def get_cache_stats() -> dict:
+    return {
+        "warehouses": warehouse_cache.snapshot(),
+    }
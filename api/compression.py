@@ -0,0 +1,167 @@
+import asyncio
+import gzip
+import os
+import zlib
+from typing import Dict, Optional
+from starlette.datastructures import Headers, MutableHeaders
+
+# brotli is optional; without it only gzip is offered
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() != "false"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+# Bodies and chunks at least this large are compressed in a worker thread;
+# zlib and brotli release the GIL, so other requests keep being served
+# meanwhile. Smaller ones are not worth the thread hand-off.
+COMPRESSION_THREAD_MIN_SIZE = 64 * 1024
+
+# A body still unfinished after this much is compressed as a stream, without
+# a Content-Length, instead of being buffered whole
+COMPRESSION_STREAM_BUFFER_SIZE = 256 * 1024
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson", "application/msgpack", "+json")
+
+def accepted_encoding(accept_encoding: str) -> Optional[str]:
+    # The supported coding with the highest q-value, brotli on a tie; "*"
+    # stands for any coding not named and q=0 refuses one. An identity
+    # ranked above all of them leaves the body uncompressed.
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, parameters = part.partition(";")
+        name, _, value = parameters.partition("=")
+        try:
+            weights[coding.strip()] = float(value) if name.strip() == "q" else 1.0
+        except ValueError:
+            continue
+
+    best, best_q = None, 0.0
+    for coding in (("br", "gzip") if brotli else ("gzip",)):
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+
+    if weights.get("identity", 0.0) > best_q:
+        return None
+    return best
+
+def is_compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "").split(";")[0].strip()
+    return "content-encoding" not in headers and any(
+        content_type.startswith(kind) or content_type.endswith(kind) for kind in COMPRESSIBLE_TYPES
+    )
+
+def vary_on_encoding(message) -> MutableHeaders:
+    # Every response that could have been compressed says so, including
+    # small, refused and 304 ones, or a shared cache could hand a
+    # compressed body to a client that did not ask for it, or the reverse
+    message.setdefault("headers", [])
+    headers = MutableHeaders(scope=message)
+    if is_compressible(headers) or message["status"] == 304:
+        headers.add_vary_header("Accept-Encoding")
+    return headers
+
+class StreamCompressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self.compressor = brotli.Compressor(quality=brotli_quality)
+            self.compress = self.compressor.process
+            self.finish = self.compressor.finish
+        else:
+            self.compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+            self.compress = self.compressor.compress
+            self.finish = self.compressor.flush
+
+async def off_loop(function, data: bytes) -> bytes:
+    if len(data) >= COMPRESSION_THREAD_MIN_SIZE:
+        return await asyncio.to_thread(function, data)
+    return function(data)
+
+class CompressionMiddleware:
+    # Plain ASGI middleware compressing response bodies with brotli or gzip,
+    # as negotiated through Accept-Encoding. Bodies that end within the
+    # stream buffer are compressed whole and get a Content-Length; longer
+    # streams, such as exports, are compressed chunk by chunk.
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE, gzip_level: int = GZIP_LEVEL, brotli_quality: int = BROTLI_QUALITY):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def compress(self, encoding: str, body: bytes) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = accepted_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            async def send_identity(message):
+                if message["type"] == "http.response.start":
+                    vary_on_encoding(message)
+                await send(message)
+
+            await self.app(scope, receive, send_identity)
+            return
+
+        start_message = None
+        compressor: Optional[StreamCompressor] = None
+        passthrough = False
+        pending = b""
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough, pending
+
+            if message["type"] == "http.response.start":
+                # Held back until enough of the body shows whether to compress
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                # Responses passing through BaseHTTPMiddleware arrive in several
+                # chunks even when complete, so the start is buffered
+                pending += body
+                if more_body and len(pending) < COMPRESSION_STREAM_BUFFER_SIZE:
+                    return
+                body, pending = pending, b""
+
+                headers = vary_on_encoding(start_message)
+                if not is_compressible(headers) or (not more_body and len(body) < self.minimum_size):
+                    passthrough = True
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body, "more_body": more_body})
+                    return
+
+                headers["Content-Encoding"] = encoding
+                if not more_body:
+                    body = await off_loop(lambda data: self.compress(encoding, data), body)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+
+                del headers["Content-Length"]
+                compressor = StreamCompressor(encoding, self.gzip_level, self.brotli_quality)
+                await send(start_message)
+
+            chunk = await off_loop(compressor.compress, body)
+            if not more_body:
+                chunk += compressor.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
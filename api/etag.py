@@ -0,0 +1,81 @@
+import hashlib
+from uuid import UUID
+from fastapi import Request, Response
+from sqlalchemy import or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import ResourceVersion
+from .serialization import negotiate_media_type
+
+ETAG_HEADER = "ETag"
+
+# Clients may keep the response but have to revalidate it on every use
+CACHE_CONTROL = "no-cache"
+
+DIALECT_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+INVENTORY_PREFIX = "inventory:"
+
+# Stands for every warehouse's inventory scope at once. Stock writes only
+# bump their own warehouse, so product totals, which any warehouse can
+# change, are versioned by the sum of those counters; counters never go
+# down, so the sum moves with every bump.
+ALL_INVENTORY_SCOPE = "inventory:*"
+
+def inventory_scope(warehouse_uuid: UUID) -> str:
+    return f"{INVENTORY_PREFIX}{warehouse_uuid.hex}"
+
+async def bump_versions(db: AsyncSession, *scopes: str) -> None:
+    # Runs in the write's own transaction, so the new version becomes
+    # visible together with the change. Scopes are bumped in a fixed order
+    # so concurrent writers lock the counter rows without deadlocking.
+    dialect = db.get_bind().dialect.name
+    statement = DIALECT_INSERTS[dialect](ResourceVersion)
+    statement = statement.on_conflict_do_update(
+        index_elements=[ResourceVersion.scope],
+        set_={"version": ResourceVersion.version + 1}
+    )
+    await db.execute(statement, [{"scope": scope, "version": 1} for scope in sorted(set(scopes))])
+
+async def get_etag(db: AsyncSession, request: Request, *scopes: str) -> str:
+    # The versions are read before the data, so a write landing in between
+    # can only make the ETag older than the body, never newer.
+    conditions = [ResourceVersion.scope.in_([scope for scope in scopes if scope != ALL_INVENTORY_SCOPE])]
+    if ALL_INVENTORY_SCOPE in scopes:
+        # A range rather than LIKE, which SQLite can not serve from the key
+        conditions.append(ResourceVersion.scope.between(INVENTORY_PREFIX, INVENTORY_PREFIX + "\uffff"))
+    versions = dict((await db.execute(
+        select(ResourceVersion.scope, ResourceVersion.version).where(or_(*conditions))
+    )).all())
+    version = ".".join(
+        str(sum(value for key, value in versions.items() if key.startswith(INVENTORY_PREFIX)))
+        if scope == ALL_INVENTORY_SCOPE else str(versions.get(scope, 0))
+        for scope in scopes
+    )
+    # Each format a listing can be negotiated in is a representation of its own
+    media_type = negotiate_media_type(request.headers.get("accept"))
+    digest = hashlib.blake2b(f"{version}|{request.url.query}|{media_type}".encode(), digest_size=8).hexdigest()
+    return f'W/"{version}-{digest}"'
+
+# `*` matches whatever representation exists, so routes for a single resource
+# look it up first and answer 404 for a missing one rather than 304
+def is_not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    # Weak comparison, as required for If-None-Match
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers[ETAG_HEADER] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={ETAG_HEADER: etag, "Cache-Control": CACHE_CONTROL})
@@ -0,0 +1,8 @@
+import sys
+
+def starts_with(column, prefix: str):
+    # A range instead of LIKE: SQLite only turns LIKE into an index range for
+    # literal patterns on case-insensitive indexes, this uses the plain one
+    if prefix[-1] == chr(sys.maxunicode):
+        return column.startswith(prefix, autoescape=True)
+    return (column >= prefix) & (column < prefix[:-1] + chr(ord(prefix[-1]) + 1))
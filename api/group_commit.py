@@ -0,0 +1,113 @@
+import asyncio
+import os
+import time
+from threading import Lock
+from typing import Any, Awaitable, Callable, List, Optional
+from db.metrics import current_query_stats
+
+# How long the first queued stock increase waits for others to share its
+# transaction; 0 applies every increase in its own request
+STOCK_GROUP_COMMIT_MS = float(os.getenv("STOCK_GROUP_COMMIT_MS", "0"))
+
+# A batch this large is applied without waiting out the window
+STOCK_GROUP_COMMIT_MAX_BATCH = int(os.getenv("STOCK_GROUP_COMMIT_MAX_BATCH", "500"))
+
+# Queues writes for up to `window_ms` or `max_batch` items and hands them to
+# `apply`, which writes the whole batch in one transaction and returns one
+# result per item. Callers get their result only after that commit, so a
+# response never reports a write that is not durable yet. Batches are
+# applied one at a time, in order. State is per worker process.
+class GroupCommitter:
+    def __init__(self, apply: Callable[[List[Any]], Awaitable[List[Any]]], window_ms: float, max_batch: int):
+        self.apply = apply
+        self.window_ms = window_ms
+        self.max_batch = max_batch
+        self.pending: List[tuple] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.previous: Optional[asyncio.Task] = None
+        self.lock = Lock()
+        self.reset()
+
+    @property
+    def enabled(self) -> bool:
+        return self.window_ms > 0
+
+    def reset(self) -> None:
+        with self.lock:
+            self.batches = 0
+            self.items = 0
+            self.failed_batches = 0
+            self.largest_batch = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.apply_total = 0.0
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((item, future, time.perf_counter()))
+
+        if len(self.pending) >= self.max_batch:
+            self.flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.window_ms / 1000, self.flush)
+
+        return await future
+
+    def flush(self) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+        batch, self.pending = self.pending, []
+        if batch:
+            self.previous = asyncio.ensure_future(self.apply_batch(batch, self.previous))
+
+    async def apply_batch(self, batch: List[tuple], previous: Optional[asyncio.Task]) -> None:
+        # The batch's statements are shared work, not part of the request
+        # whose timer or submit happened to start this task
+        current_query_stats.set(None)
+        if previous is not None and not previous.done():
+            await asyncio.wait([previous])
+
+        start = time.perf_counter()
+        try:
+            results = await self.apply([item for item, _, _ in batch])
+        except Exception as e:
+            with self.lock:
+                self.failed_batches += 1
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        finished = time.perf_counter()
+        with self.lock:
+            self.batches += 1
+            self.items += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+            self.apply_total += finished - start
+            for _, _, queued_at in batch:
+                self.wait_total += finished - queued_at
+                self.wait_max = max(self.wait_max, finished - queued_at)
+
+        # A caller that went away still had its write applied
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "enabled": self.enabled,
+                "window_ms": self.window_ms,
+                "max_batch": self.max_batch,
+                "batches": self.batches,
+                "items": self.items,
+                "failed_batches": self.failed_batches,
+                "largest_batch": self.largest_batch,
+                "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+                "avg_wait_ms": self.wait_total / self.items * 1000 if self.items else 0.0,
+                "max_wait_ms": self.wait_max * 1000,
+                "avg_apply_ms": self.apply_total / self.batches * 1000 if self.batches else 0.0,
+            }
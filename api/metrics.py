@@ -0,0 +1,146 @@
+import time
+from bisect import bisect_left
+from threading import Lock
+from typing import Any, Dict, List, Tuple
+from fastapi.responses import JSONResponse
+from db.metrics import RequestQueryStats, current_query_stats
+from .serialization import MSGPACK_MEDIA_TYPE, dump_json, dump_msgpack
+
+# Upper bounds of the request latency histogram, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Requests that match no route share one label, so scanners can not grow
+# the metrics without bound
+UNMATCHED_ROUTE = "unmatched"
+
+class TimedJSONResponse(JSONResponse):
+    encode = staticmethod(dump_json)
+
+    # Adds the time spent encoding the body to the request's statistics
+    def render(self, content: Any) -> bytes:
+        start = time.perf_counter()
+        body = self.encode(content)
+        stats = current_query_stats.get()
+        if stats:
+            stats.serialize_time += time.perf_counter() - start
+        return body
+
+class TimedMessagePackResponse(TimedJSONResponse):
+    media_type = MSGPACK_MEDIA_TYPE
+    encode = staticmethod(dump_msgpack)
+
+class RouteMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.statuses: Dict[int, int] = {}
+        self.latency_buckets = [0] * len(LATENCY_BUCKETS)
+        self.latency_total = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+
+# Per-route totals since startup, kept per worker process
+class RequestMetrics:
+    def __init__(self):
+        self.lock = Lock()
+        self.routes: Dict[Tuple[str, str], RouteMetrics] = {}
+
+    def record(self, method: str, route: str, status: int, latency: float, stats: RequestQueryStats) -> None:
+        with self.lock:
+            metrics = self.routes.get((method, route))
+            if metrics is None:
+                metrics = self.routes[(method, route)] = RouteMetrics()
+            metrics.requests += 1
+            metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+            bucket = bisect_left(LATENCY_BUCKETS, latency)
+            if bucket < len(LATENCY_BUCKETS):
+                metrics.latency_buckets[bucket] += 1
+            metrics.latency_total += latency
+            metrics.queries += stats.queries
+            metrics.db_time += stats.db_time
+            metrics.serialize_time += stats.serialize_time
+
+    def render(self, query_stats: dict) -> str:
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help: str) -> None:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self.lock:
+            routes = sorted(self.routes.items())
+
+            family("http_requests_total", "counter", "Requests by route and status.")
+            for (method, route), metrics in routes:
+                for status, count in sorted(metrics.statuses.items()):
+                    lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+
+            family("http_request_duration_seconds", "histogram", "Time until the response headers were sent.")
+            for (method, route), metrics in routes:
+                labels = f'method="{method}",route="{route}"'
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, metrics.latency_buckets):
+                    cumulative += count
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {metrics.requests}')
+                lines.append(f"http_request_duration_seconds_sum{{{labels}}} {metrics.latency_total}")
+                lines.append(f"http_request_duration_seconds_count{{{labels}}} {metrics.requests}")
+
+            for name, attribute, help in (
+                ("http_request_db_queries_total", "queries", "Database statements run by requests."),
+                ("http_request_db_seconds_total", "db_time", "Time requests spent in database statements."),
+                ("http_request_serialization_seconds_total", "serialize_time", "Time requests spent encoding JSON bodies."),
+            ):
+                family(name, "counter", help)
+                for (method, route), metrics in routes:
+                    lines.append(f'{name}{{method="{method}",route="{route}"}} {getattr(metrics, attribute)}')
+
+        family("db_queries_total", "counter", "Database statements, including background work.")
+        lines.append(f"db_queries_total {query_stats['queries']}")
+        family("db_query_seconds_total", "counter", "Time spent in database statements, including background work.")
+        lines.append(f"db_query_seconds_total {query_stats['db_time']}")
+        family("db_slow_queries_total", "counter", "Statements over SLOW_QUERY_THRESHOLD_MS.")
+        lines.append(f"db_slow_queries_total {query_stats['slow_queries']}")
+
+        return "\n".join(lines) + "\n"
+
+request_metrics = RequestMetrics()
+
+class RequestMetricsMiddleware:
+    # Plain ASGI middleware: it times each request up to its response
+    # headers and adds a Server-Timing header, without buffering the body
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(scope["method"], scope["path"])
+        token = current_query_stats.set(stats)
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                latency = time.perf_counter() - start
+                route = scope.get("route")
+                request_metrics.record(
+                    scope["method"],
+                    route.path if route is not None else UNMATCHED_ROUTE,
+                    message["status"],
+                    latency,
+                    stats
+                )
+                timing = (
+                    f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries", '
+                    f"serialize;dur={stats.serialize_time * 1000:.1f}, "
+                    f"total;dur={latency * 1000:.1f}"
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_query_stats.reset(token)
@@ -0,0 +1,108 @@
+import base64
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from .etag import not_modified_response, set_etag
+from .metrics import TimedJSONResponse, TimedMessagePackResponse
+from .serialization import COLUMNAR_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, Columns, Rows, negotiate_media_type
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def cursor_text(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return value.hex
+    return str(value)
+
+def cursor_value(text: str, column) -> Any:
+    # Parsed back into the column's type, so it compares the same way as
+    # the stored values
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(text)
+    if python_type in (Decimal, float, int, UUID):
+        return python_type(text)
+    return text
+
+def encode_cursor(value: Any, id: Any) -> str:
+    raw = f"{cursor_text(value)}|{cursor_text(id)}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort_column, id_column) -> Tuple[Any, Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        value, id = raw.rsplit("|", 1)
+        return cursor_value(value, sort_column), cursor_value(id, id_column)
+    except (ValueError, ArithmeticError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def parse_fields(fields: Optional[str], allowed: Dict[str, Any]) -> Dict[str, Any]:
+    if not fields:
+        return allowed
+
+    selected = {}
+    for name in fields.split(","):
+        name = name.strip()
+        if name not in allowed:
+            raise HTTPException(status_code=400, detail=f"Unknown field: {name}")
+        selected[name] = allowed[name]
+
+    return selected
+
+def select_fields(columns: Dict[str, Any]) -> Select:
+    return select(*(column.label(name) for name, column in columns.items()))
+
+async def fetch_page(db: AsyncSession, statement: Select, sort_column, id_column, cursor: Optional[str], limit: int, descending: bool = False) -> Tuple[List[Any], Optional[str]]:
+    # Keyset pagination on (sort column, id): each page is an index range
+    # scan from the previous position instead of an OFFSET over all rows.
+    statement = statement.add_columns(
+        sort_column.label("cursor_value"),
+        id_column.label("cursor_id")
+    )
+    if cursor:
+        value, id = decode_cursor(cursor, sort_column, id_column)
+        position = tuple_(sort_column, id_column)
+        statement = statement.where(position < tuple_(value, id) if descending else position > tuple_(value, id))
+
+    order = (sort_column.desc(), id_column.desc()) if descending else (sort_column, id_column)
+    rows = (await db.execute(
+        statement.order_by(*order).limit(limit + 1)
+    )).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].cursor_value, rows[-1].cursor_id)
+
+    return rows, next_cursor
+
+def page_response(request: Request, rows: List[Any], fields: List[str], next_cursor: Optional[str], etag: Optional[str] = None) -> TimedJSONResponse:
+    # Every listing selects its fields first, so rows are encoded by position
+    media_type = negotiate_media_type(request.headers.get("accept"))
+    if media_type == MSGPACK_MEDIA_TYPE:
+        response = TimedMessagePackResponse(content=Rows(rows, fields))
+    elif media_type == COLUMNAR_MEDIA_TYPE:
+        response = TimedJSONResponse(content=Columns(rows, fields), media_type=COLUMNAR_MEDIA_TYPE)
+    else:
+        response = TimedJSONResponse(content=Rows(rows, fields))
+    response.headers.add_vary_header("Accept")
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    if etag:
+        set_etag(response, etag)
+    return response
+
+# Listings are negotiated on Accept, and a 304 must vary the way the 200 it
+# revalidates did
+def page_not_modified(etag: str) -> Response:
+    response = not_modified_response(etag)
+    response.headers.add_vary_header("Accept")
+    return response
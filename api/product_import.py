@@ -0,0 +1,155 @@
+import csv
+import json
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+from uuid import UUID, uuid4
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import Product, Stock, StockMovement, stock_suppliers
+from .etag import bump_versions, inventory_scope
+from .search import index_products
+from .routes.product_management import PRODUCTS_SCOPE, ProductCreate
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# Products written per transaction; each batch costs one SKU lookup and one
+# executemany INSERT per table, whatever its size
+IMPORT_BATCH_SIZE = 1000
+
+# A batch that collides with a product created concurrently is checked and
+# written again, at most this many times
+IMPORT_ATTEMPTS = 3
+
+PRODUCT_COLUMNS = Product.__table__.c
+
+class ImportRowError(BaseModel):
+    line: int
+    sku: Optional[str] = None
+    error: str
+
+class ImportResult(BaseModel):
+    imported: int = 0
+    failed: int = 0
+    errors: List[ImportRowError] = []
+
+def read_records(lines: Iterable[str], format: str) -> Iterator[Tuple[int, object]]:
+    # (line number, record) pairs; a record that can not be parsed is
+    # passed on as the error message instead
+    if format == "csv":
+        reader = csv.DictReader(lines)
+        for record in reader:
+            # Empty cells are missing values, not empty strings
+            yield reader.line_num, {field: value for field, value in record.items() if field and value != ""}
+        return
+
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError:
+            yield number, "Invalid JSON"
+
+def validate_record(record: object) -> Tuple[Optional[ProductCreate], Optional[str]]:
+    if isinstance(record, str):
+        return None, record
+    if not isinstance(record, dict):
+        return None, "Expected an object"
+
+    try:
+        product = ProductCreate(**record)
+    except ValidationError as e:
+        error = e.errors()[0]
+        return None, f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+
+    if product.stock_quantity < 0:
+        return None, "Stock quantity can not be negative"
+    for field in ("name", "sku", "description", "category"):
+        value = getattr(product, field)
+        if value is not None and len(value) > PRODUCT_COLUMNS[field].type.length:
+            return None, f"{field}: at most {PRODUCT_COLUMNS[field].type.length} characters"
+
+    return product, None
+
+async def write_batch(db: AsyncSession, warehouse_uuid: UUID, supplier_uuid: Optional[UUID], batch: List[Tuple[int, ProductCreate]], result: ImportResult) -> None:
+    for attempt in range(IMPORT_ATTEMPTS):
+        # Set-based uniqueness check: one query for the whole batch
+        existing = set((await db.scalars(
+            select(Product.sku).where(Product.sku.in_([product.sku for _, product in batch]))
+        )).all())
+        for line, product in batch:
+            if product.sku in existing:
+                result.errors.append(ImportRowError(line=line, sku=product.sku, error="Product with this SKU already exists"))
+        batch = [(line, product) for line, product in batch if product.sku not in existing]
+        if not batch:
+            return
+
+        now = datetime.utcnow()
+        products = [
+            Product(id=uuid4(), name=product.name, sku=product.sku, description=product.description, price=product.price,
+                    category=product.category, stock_quantity=product.stock_quantity, created_at=now)
+            for _, product in batch
+        ]
+        stock_uuids = [uuid4() for _ in products]
+
+        try:
+            await db.execute(insert(Product.__table__), [
+                {column: getattr(product, column) for column in ("id", "name", "sku", "description", "price", "category", "stock_quantity", "created_at")}
+                for product in products
+            ])
+            await db.execute(insert(Stock.__table__), [
+                {"id": stock_uuid, "warehouse_id": warehouse_uuid, "product_id": product.id, "sku": product.sku,
+                 "stock_quantity": product.stock_quantity, "created_at": now}
+                for stock_uuid, product in zip(stock_uuids, products)
+            ])
+            await db.execute(insert(StockMovement.__table__), [
+                {"warehouse_id": warehouse_uuid, "product_id": product.id, "movement_type": "initial",
+                 "quantity": product.stock_quantity, "supplier_id": supplier_uuid, "created_at": now}
+                for product in products
+            ])
+            if supplier_uuid:
+                await db.execute(insert(stock_suppliers), [
+                    {"stock_id": stock_uuid, "supplier_id": supplier_uuid} for stock_uuid in stock_uuids
+                ])
+            await index_products(db, products)
+            await bump_versions(db, PRODUCTS_SCOPE, inventory_scope(warehouse_uuid))
+            await db.commit()
+        except IntegrityError:
+            # A SKU was taken since the check; the next attempt skips it
+            await db.rollback()
+            continue
+
+        result.imported += len(batch)
+        return
+
+    for line, product in batch:
+        result.errors.append(ImportRowError(line=line, sku=product.sku, error="Not imported: conflicting concurrent writes"))
+
+async def import_products(db: AsyncSession, warehouse_uuid: UUID, supplier_uuid: Optional[UUID], lines: Iterable[str], format: str) -> ImportResult:
+    result = ImportResult()
+    seen: Set[str] = set()
+    batch: List[Tuple[int, ProductCreate]] = []
+
+    for line, record in read_records(lines, format):
+        product, error = validate_record(record)
+        if product and product.sku in seen:
+            error = "Duplicate SKU in import"
+        if error:
+            sku = record.get("sku") if isinstance(record, dict) else None
+            result.errors.append(ImportRowError(line=line, sku=sku if isinstance(sku, str) else None, error=error))
+            continue
+
+        seen.add(product.sku)
+        batch.append((line, product))
+        if len(batch) == IMPORT_BATCH_SIZE:
+            await write_batch(db, warehouse_uuid, supplier_uuid, batch, result)
+            batch = []
+
+    if batch:
+        await write_batch(db, warehouse_uuid, supplier_uuid, batch, result)
+
+    result.errors.sort(key=lambda error: error.line)
+    result.failed = len(result.errors)
+    return result
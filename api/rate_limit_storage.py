@@ -0,0 +1,191 @@
+import logging
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from threading import Lock
+from typing import Optional, Tuple
+from limits import RateLimitItem
+from limits.storage import Storage
+from limits.strategies import RateLimiter
+from limits.util import WindowStats
+
+logger = logging.getLogger(__name__)
+
+# slowapi checks limits synchronously, on the event loop; a hit waits at most
+# this long for another worker's write before it is let through uncounted
+RATE_LIMIT_BUSY_TIMEOUT_MS = int(os.getenv("RATE_LIMIT_BUSY_TIMEOUT_MS", "20"))
+
+# Slack for float rounding, so a full bucket admits exactly `capacity` hits
+EPSILON = 1e-9
+
+# Storages that keep a token bucket per key. A bucket holds `capacity`
+# tokens and refills one every `period / capacity` seconds. Its whole state
+# is one timestamp per key, the time at which it is full again (GCRA), so
+# it maps onto a single Redis key with a TTL updated by a script; a Redis
+# backend, or the local fake in the tests, implements these two methods.
+class TokenBucketSupport(ABC):
+    # Takes `cost` tokens if the bucket has them, atomically
+    @abstractmethod
+    def acquire_tokens(self, key: str, capacity: int, period: int, cost: int = 1) -> bool:
+        raise NotImplementedError
+
+    # (when the next token is available, tokens left)
+    @abstractmethod
+    def get_token_bucket(self, key: str, capacity: int, period: int) -> Tuple[float, int]:
+        raise NotImplementedError
+
+# The `token-bucket` strategy: a client may burst up to the limit's amount,
+# then gets one request per `period / amount` seconds, instead of a fixed
+# window that admits twice the amount around a window boundary
+class TokenBucketRateLimiter(RateLimiter):
+    def __init__(self, storage: Storage):
+        if not isinstance(storage, TokenBucketSupport):
+            raise NotImplementedError(f"Token bucket rate limiting is not implemented for storage of type {storage.__class__}")
+        super().__init__(storage)
+
+    def hit(self, item: RateLimitItem, *identifiers: str, cost: int = 1) -> bool:
+        return self.storage.acquire_tokens(item.key_for(*identifiers), item.amount, item.get_expiry(), cost)
+
+    def test(self, item: RateLimitItem, *identifiers: str, cost: int = 1) -> bool:
+        return self.get_window_stats(item, *identifiers).remaining >= cost
+
+    def get_window_stats(self, item: RateLimitItem, *identifiers: str) -> WindowStats:
+        reset_time, remaining = self.storage.get_token_bucket(item.key_for(*identifiers), item.amount, item.get_expiry())
+        return WindowStats(reset_time, remaining)
+
+# Token buckets, and fixed-window counters for the `limits` strategies, in a
+# SQLite file shared by every worker process on the host, registered with
+# `limits` under the sqlite:/// scheme. Each hit is one primary-key UPSERT,
+# and full buckets and expired windows are pruned periodically, so memory is
+# bounded by the number of clients active within a period. Writes fail
+# open: when the file stays locked past the busy timeout the hit is allowed
+# rather than stalling the worker's event loop.
+class SQLiteStorage(Storage, TokenBucketSupport):
+    STORAGE_SCHEME = ["sqlite"]
+
+    PRUNE_INTERVAL = 1000
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        path = uri[len("sqlite:///"):]
+
+        self.lock = Lock()
+        self.hits = 0
+        self.connection = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        # Counters are disposable; losing the last writes on an OS crash is fine
+        self.connection.execute("PRAGMA synchronous=OFF")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS rate_limits (
+                key TEXT PRIMARY KEY,
+                count INTEGER NOT NULL,
+                expiry REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS token_buckets (
+                key TEXT PRIMARY KEY,
+                full_at REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+        # Setup above may wait for workers starting alongside; hits may not
+        self.connection.execute(f"PRAGMA busy_timeout={RATE_LIMIT_BUSY_TIMEOUT_MS}")
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+        with self.lock:
+            # A window that has already expired restarts at this hit
+            row = self.write("""
+                INSERT INTO rate_limits (key, count, expiry) VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    count = CASE WHEN rate_limits.expiry <= ? THEN excluded.count ELSE rate_limits.count + excluded.count END,
+                    expiry = CASE WHEN rate_limits.expiry <= ? THEN excluded.expiry ELSE rate_limits.expiry END
+                RETURNING count
+            """, (key, amount, now + expiry, now, now), now)
+
+        return row[0]
+
+    def acquire_tokens(self, key: str, capacity: int, period: int, cost: int = 1) -> bool:
+        if cost > capacity:
+            return False
+
+        now = time.time()
+        with self.lock:
+            # A bucket that is already full starts from now. When the update
+            # would overdraw the bucket its WHERE fails and no row comes back.
+            row = self.write("""
+                INSERT INTO token_buckets (key, full_at) VALUES (:key, :now + :drawn)
+                ON CONFLICT(key) DO UPDATE SET full_at = max(token_buckets.full_at, :now) + :drawn
+                WHERE max(token_buckets.full_at, :now) + :drawn <= :now + :period + :epsilon
+                RETURNING full_at
+            """, {"key": key, "now": now, "drawn": cost * period / capacity, "period": period, "epsilon": EPSILON}, now)
+
+        return row is not None
+
+    def get_token_bucket(self, key: str, capacity: int, period: int) -> Tuple[float, int]:
+        now = time.time()
+        with self.lock:
+            row = self.connection.execute("SELECT full_at FROM token_buckets WHERE key = ?", (key,)).fetchone()
+
+        full_at = max(row[0], now) if row else now
+        interval = period / capacity
+        remaining = int((now + period - full_at) / interval + EPSILON)
+        return max(full_at + interval - period, now), remaining
+
+    # Runs an UPSERT ... RETURNING under self.lock. When the file stays
+    # locked the hit is not counted and (0,) stands in for its row, which
+    # every limit allows.
+    def write(self, statement: str, parameters, now: float) -> Optional[tuple]:
+        try:
+            row = self.connection.execute(statement, parameters).fetchone()
+        except sqlite3.OperationalError as e:
+            logger.warning("Rate limit storage unavailable, request let through: %s", e)
+            return (0,)
+
+        self.hits += 1
+        if self.hits % self.PRUNE_INTERVAL == 0:
+            try:
+                self.connection.execute("DELETE FROM rate_limits WHERE expiry <= ?", (now,))
+                self.connection.execute("DELETE FROM token_buckets WHERE full_at <= ?", (now,))
+            except sqlite3.OperationalError:
+                # Pruned on a later hit
+                pass
+
+        return row
+
+    def get(self, key: str) -> int:
+        row = self._fetch(key)
+        return row[0] if row else 0
+
+    def get_expiry(self, key: str) -> float:
+        row = self._fetch(key)
+        return row[1] if row else time.time()
+
+    def _fetch(self, key: str) -> Optional[tuple]:
+        with self.lock:
+            return self.connection.execute(
+                "SELECT count, expiry FROM rate_limits WHERE key = ? AND expiry > ?", (key, time.time())
+            ).fetchone()
+
+    def check(self) -> bool:
+        try:
+            with self.lock:
+                self.connection.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> Optional[int]:
+        with self.lock:
+            return self.connection.execute("DELETE FROM rate_limits").rowcount \
+                + self.connection.execute("DELETE FROM token_buckets").rowcount
+
+    def clear(self, key: str) -> None:
+        with self.lock:
+            self.connection.execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+            self.connection.execute("DELETE FROM token_buckets WHERE key = ?", (key,))
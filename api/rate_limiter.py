@@ -2,9 +2,55 @@ from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
-from fastapi import Request, FastAPI
+from fastapi import FastAPI
+from typing import Optional
+from limits.errors import ConfigurationError
+from limits.storage import SCHEMES
+from .rate_limit_storage import TokenBucketRateLimiter, TokenBucketSupport
+import os
 
-limiter = Limiter(key_func=get_remote_address)
+DEFAULT_STORAGE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "db", "rate_limits.sqlite")
+
+# Buckets live in a file every worker on the host shares, however the
+# workers were started, so a client gets its budget once and not once per
+# process. memory:// only suits a single process and has to be asked for.
+RATE_LIMIT_STORAGE_URI = os.getenv("RATE_LIMIT_STORAGE_URI", f"sqlite:///{DEFAULT_STORAGE_PATH}")
+
+# Unset picks token-bucket when the storage keeps buckets, fixed-window otherwise
+RATE_LIMIT_STRATEGY = os.getenv("RATE_LIMIT_STRATEGY")
+
+def get_strategy(storage_uri: str, strategy: Optional[str]) -> str:
+    storage_class = SCHEMES.get(storage_uri.split("://")[0])
+    keeps_buckets = storage_class is not None and issubclass(storage_class, TokenBucketSupport)
+    if not strategy:
+        return "token-bucket" if keeps_buckets else "fixed-window"
+    if strategy == "token-bucket" and not keeps_buckets:
+        raise ConfigurationError(
+            f"RATE_LIMIT_STRATEGY=token-bucket needs a sqlite:/// storage, not {storage_uri}; "
+            "use fixed-window, moving-window or sliding-window-counter with it"
+        )
+    return strategy
+
+# slowapi only builds the strategies registered with `limits`; this limiter
+# swaps in the token bucket after the fact instead of adding it to that
+# process-wide registry
+class TokenBucketLimiter(Limiter):
+    def __init__(self, **kwargs):
+        super().__init__(strategy="fixed-window", **kwargs)
+        self._limiter = TokenBucketRateLimiter(self._storage)
+
+def create_limiter() -> Limiter:
+    options = dict(
+        key_func=get_remote_address,
+        storage_uri=RATE_LIMIT_STORAGE_URI,
+        enabled=os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+    )
+    strategy = get_strategy(RATE_LIMIT_STORAGE_URI, RATE_LIMIT_STRATEGY)
+    if strategy == "token-bucket":
+        return TokenBucketLimiter(**options)
+    return Limiter(strategy=strategy, **options)
+
+limiter = create_limiter()
 
 def setup_rate_limiting(app: FastAPI) -> None:
     app.state.limiter = limiter
@@ -0,0 +1,68 @@
+from fastapi import APIRouter, Request
+from typing import Optional
+from pydantic import BaseModel
+from db.session import getPoolStats
+from ..cache import get_cache_stats
+from ..rate_limiter import limiter, RateLimitConfig
+from .stock_management import stock_increases
+
+router = APIRouter(prefix="/diagnostics", tags=["diagnostics"])
+
+class PoolStatsResponse(BaseModel):
+    pool_class: str
+    size: Optional[int] = None
+    checked_in: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow: Optional[int] = None
+    max_overflow: Optional[int] = None
+    connects: int
+    checkouts: int
+    checkins: int
+    invalidations: int
+    timeouts: int
+    peak_checked_out: int
+    wait_count: int
+    wait_avg_ms: float
+    wait_max_ms: float
+
+class CacheStats(BaseModel):
+    entries: int
+    max_entries: int
+    ttl_seconds: float
+    hits: int
+    misses: int
+    evictions: int
+    hit_ratio: float
+
+class CacheStatsResponse(BaseModel):
+    warehouses: CacheStats
+
+class GroupCommitStatsResponse(BaseModel):
+    enabled: bool
+    window_ms: float
+    max_batch: int
+    batches: int
+    items: int
+    failed_batches: int
+    largest_batch: int
+    avg_batch_size: float
+    avg_wait_ms: float
+    max_wait_ms: float
+    avg_apply_ms: float
+
+@router.get("/pool", response_model=PoolStatsResponse)
+@limiter.limit(RateLimitConfig.READ)
+async def get_pool_stats(request: Request):
+    return PoolStatsResponse(**getPoolStats())
+
+
+@router.get("/cache", response_model=CacheStatsResponse)
+@limiter.limit(RateLimitConfig.READ)
+async def get_cache_statistics(request: Request):
+    return CacheStatsResponse(**get_cache_stats())
+
+
+@router.get("/group-commit", response_model=GroupCommitStatsResponse)
+@limiter.limit(RateLimitConfig.READ)
+async def get_group_commit_statistics(request: Request):
+    return GroupCommitStatsResponse(**stock_increases.snapshot())
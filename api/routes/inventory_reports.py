@@ -0,0 +1,79 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from uuid import UUID
+from pydantic import BaseModel
+from models import Product, Stock
+from db.session import get_db
+from ..filters import starts_with
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, fetch_page, page_response
+from ..rate_limiter import limiter, RateLimitConfig
+
+router = APIRouter(prefix="/inventory", tags=["inventory_reports"])
+
+class ProductTotalResponse(BaseModel):
+    product_id: str
+    sku: str
+    name: str
+    category: Optional[str] = None
+    total_quantity: int
+    warehouses: int
+
+class LowStockResponse(BaseModel):
+    warehouse_id: str
+    product_id: str
+    sku: str
+    stock_quantity: int
+
+def filter_products(statement: Select, category: Optional[str], sku_prefix: Optional[str]) -> Select:
+    if category is not None:
+        statement = statement.where(Product.category == category)
+    if sku_prefix:
+        statement = statement.where(starts_with(Product.sku, sku_prefix))
+    return statement
+
+@router.get("/totals", response_model=List[ProductTotalResponse])
+@limiter.limit(RateLimitConfig.READ)
+async def get_inventory_totals(request: Request, category: Optional[str] = None, sku_prefix: Optional[str] = None, below: Optional[int] = None, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    # The total across warehouses is maintained on the product by the stock
+    # routes; only the warehouse count is aggregated, grouped in page order
+    # so the database stops after one page, each product counted from the
+    # covering stocks index
+    statement = select(
+        Product.id.label("product_id"),
+        Product.sku.label("sku"),
+        Product.name.label("name"),
+        Product.category.label("category"),
+        Product.stock_quantity.label("total_quantity"),
+        func.count(Stock.product_id).label("warehouses")
+    ).outerjoin(Stock, Stock.product_id == Product.id).group_by(Product.created_at, Product.id)
+
+    statement = filter_products(statement, category, sku_prefix)
+    if below is not None:
+        statement = statement.where(Product.stock_quantity < below)
+
+    rows, next_cursor = await fetch_page(db, statement, Product.created_at, Product.id, cursor, limit)
+    return page_response(request, rows, list(ProductTotalResponse.model_fields), next_cursor)
+
+@router.get("/low-stock", response_model=List[LowStockResponse])
+@limiter.limit(RateLimitConfig.READ)
+async def get_low_stock(request: Request, threshold: int, warehouse_id: Optional[str] = None, category: Optional[str] = None, sku_prefix: Optional[str] = None, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    statement = select(
+        Stock.warehouse_id.label("warehouse_id"),
+        Stock.product_id.label("product_id"),
+        Stock.sku.label("sku"),
+        Stock.stock_quantity.label("stock_quantity")
+    ).where(Stock.stock_quantity < threshold)
+
+    if warehouse_id:
+        try:
+            statement = statement.where(Stock.warehouse_id == UUID(warehouse_id))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid warehouse ID format")
+
+    if category is not None or sku_prefix:
+        statement = filter_products(statement.join(Product, Product.id == Stock.product_id), category, sku_prefix)
+
+    rows, next_cursor = await fetch_page(db, statement, Stock.created_at, Stock.id, cursor, limit)
+    return page_response(request, rows, list(LowStockResponse.model_fields), next_cursor)
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+from db.session import getQueryStats
+from ..metrics import request_metrics
+from ..rate_limiter import limiter, RateLimitConfig
+
+router = APIRouter(tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Prometheus scrape target; counts cover the worker process that answers
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+@limiter.limit(RateLimitConfig.READ)
+async def get_metrics(request: Request):
+    return PlainTextResponse(request_metrics.render(getQueryStats()), media_type=PROMETHEUS_CONTENT_TYPE)
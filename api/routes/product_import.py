@@ -0,0 +1,56 @@
+import io
+from fastapi import APIRouter, HTTPException, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Literal, Optional
+from uuid import UUID
+from models import Supplier
+from db.session import get_db
+from ..cache import get_warehouse_metadata
+from ..product_import import ImportResult, import_products
+from ..rate_limiter import limiter, RateLimitConfig
+
+router = APIRouter(prefix="/warehouses/{warehouse_id}/products", tags=["product_management"])
+
+# Larger catalogs go through import_products.py, which has no size limit
+MAX_IMPORT_BYTES = 32 * 1024 * 1024
+
+def import_too_large() -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Imports are limited to {MAX_IMPORT_BYTES // (1024 * 1024)} MiB per request")
+
+@router.post("/import", response_model=ImportResult)
+@limiter.limit(RateLimitConfig.BULK)
+async def import_product_catalog(request: Request, warehouse_id: str, format: Literal["ndjson", "csv"] = "ndjson", supplier_id: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    try:
+        warehouse_uuid = UUID(warehouse_id)
+        supplier_uuid = UUID(supplier_id) if supplier_id else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid ID format")
+    
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_IMPORT_BYTES:
+        raise import_too_large()
+    
+    warehouse = await get_warehouse_metadata(db, warehouse_uuid)
+    if not warehouse:
+        raise HTTPException(status_code=404, detail="Warehouse not found")
+    
+    if supplier_uuid and not await db.get(Supplier, supplier_uuid):
+        raise HTTPException(status_code=404, detail="Supplier not found")
+    
+    # Counted as it arrives, so a chunked body, which has no Content-Length,
+    # is refused at the limit instead of after it has all been buffered
+    chunks = []
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > MAX_IMPORT_BYTES:
+            raise import_too_large()
+        chunks.append(chunk)
+    body = b"".join(chunks)
+    
+    try:
+        content = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Import must be UTF-8 encoded")
+    
+    return await import_products(db, warehouse_uuid, supplier_uuid, io.StringIO(content, newline=""), format)
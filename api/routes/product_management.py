@@ -1,11 +1,18 @@
-from fastapi import APIRouter, HTTPException, Depends, Request
-from sqlalchemy.orm import Session
-from typing import List, Optional, Generator
-from uuid import UUID
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from sqlalchemy import and_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Literal, Optional, Tuple
+from uuid import UUID, uuid4
 from pydantic import BaseModel, validator
-from models import Product, Warehouse, Stock
-from db.session import getSession
+from models import Product, Stock, StockMovement
+from db.session import get_db
+from ..cache import get_warehouse_metadata
+from ..etag import ALL_INVENTORY_SCOPE, bump_versions, get_etag, inventory_scope, is_not_modified, not_modified_response, set_etag
+from ..filters import starts_with
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, fetch_page, page_not_modified, page_response, parse_fields, select_fields
 from ..rate_limiter import limiter, RateLimitConfig
+from ..search import index_products, unindex_products
 
 router = APIRouter(prefix="/warehouses/{warehouse_id}/products", tags=["product_management"])
 
@@ -67,30 +74,46 @@ class ProductCreateResponse(BaseModel):
 class MessageResponse(BaseModel):
     message: str
 
-def get_db() -> Generator[Session, None, None]:
-    session = getSession()
-    try:
-        yield session
-    finally:
-        session.close()
+PRODUCTS_SCOPE = "products"
+
+PRODUCT_FIELDS = {
+    "id": Product.id,
+    "name": Product.name,
+    "sku": Product.sku,
+    "price": Product.price,
+    "stock_quantity": Product.stock_quantity
+}
+
+# Catalogue writes bump PRODUCTS_SCOPE. Stock writes leave it alone, so they
+# neither contend on its row nor invalidate responses without quantities.
+def product_scopes(columns: Dict[str, Any]) -> Tuple[str, ...]:
+    if "stock_quantity" in columns:
+        return (PRODUCTS_SCOPE, ALL_INVENTORY_SCOPE)
+    return (PRODUCTS_SCOPE,)
+
+PRODUCT_SORTS = {
+    "created_at": Product.created_at,
+    "name": Product.name,
+    "price": Product.price
+}
 
 @router.post("/", response_model=ProductCreateResponse)
 @limiter.limit(RateLimitConfig.WRITE)
-async def create_product(request: Request, warehouse_id: str, product: ProductCreate, db: Session = Depends(get_db)):
+async def create_product(request: Request, warehouse_id: str, product: ProductCreate, db: AsyncSession = Depends(get_db)):
     try:
         warehouse_uuid = UUID(warehouse_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid warehouse ID format")
     
-    warehouse = db.query(Warehouse).filter(Warehouse.id == warehouse_uuid).first()
+    warehouse = await get_warehouse_metadata(db, warehouse_uuid)
     if not warehouse:
         raise HTTPException(status_code=404, detail="Warehouse not found")
     
-    existing_product = db.query(Product).filter(Product.sku == product.sku).first()
-    if existing_product:
-        raise HTTPException(status_code=400, detail="Product with this SKU already exists")
-    
+    # Product, stock, movement and search entry go in one transaction with
+    # the id generated up front; the unique index on sku rejects duplicates
+    # instead of a lookup before every insert.
     db_product = Product(
+        id=uuid4(),
         name=product.name,
         sku=product.sku,
         description=product.description,
@@ -99,18 +122,29 @@ async def create_product(request: Request, warehouse_id: str, product: ProductCr
         stock_quantity=product.stock_quantity
     )
     db.add(db_product)
-    db.commit()
-    db.refresh(db_product)
-    
-    # Create initial stock record for this warehouse
-    stock_record = Stock(
+    db.add(Stock(
+        warehouse_id=warehouse.id,
         product_id=db_product.id,
         sku=product.sku,
         stock_quantity=product.stock_quantity
-    )
-    stock_record.warehouses.append(warehouse)
-    db.add(stock_record)
-    db.commit()
+    ))
+    db.add(StockMovement(
+        warehouse_id=warehouse.id,
+        product_id=db_product.id,
+        movement_type="initial",
+        quantity=product.stock_quantity
+    ))
+    try:
+        await db.flush()
+        await index_products(db, [db_product])
+        await bump_versions(db, PRODUCTS_SCOPE, inventory_scope(warehouse_uuid))
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        # Only the failure path pays for finding out which constraint it was
+        if await db.scalar(select(Product.id).where(Product.sku == product.sku).limit(1)):
+            raise HTTPException(status_code=400, detail="Product with this SKU already exists")
+        raise
     
     return ProductCreateResponse(
         id=str(db_product.id),
@@ -119,45 +153,69 @@ async def create_product(request: Request, warehouse_id: str, product: ProductCr
 
 @router.get("/", response_model=List[ProductResponse])
 @limiter.limit(RateLimitConfig.READ)
-async def get_products(request: Request, warehouse_id: str, db: Session = Depends(get_db)):
+async def get_products(request: Request, warehouse_id: str, category: Optional[str] = None, min_price: Optional[float] = None, max_price: Optional[float] = None, name_prefix: Optional[str] = None, sku_prefix: Optional[str] = None, in_warehouse: bool = False, sort: Literal["created_at", "-created_at", "name", "-name", "price", "-price"] = "created_at", limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, fields: Optional[str] = None, db: AsyncSession = Depends(get_db)):
     try:
         warehouse_uuid = UUID(warehouse_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid warehouse ID format")
     
-    warehouse = db.query(Warehouse).filter(Warehouse.id == warehouse_uuid).first()
+    warehouse = await get_warehouse_metadata(db, warehouse_uuid)
     if not warehouse:
         raise HTTPException(status_code=404, detail="Warehouse not found")
     
-    products = db.query(Product).all()
-    return [
-        ProductResponse(
-            id=str(product.id),
-            name=product.name, # type: ignore
-            sku=product.sku, # type: ignore
-            price=float(product.price), # type: ignore
-            stock_quantity=product.stock_quantity, # type: ignore
-        )
-        for product in products
-    ]
+    columns = parse_fields(fields, PRODUCT_FIELDS)
+    scopes = product_scopes(columns)
+    if in_warehouse:
+        # Which products are listed follows the warehouse's stock rows, which
+        # transfers and bulk operations create without touching the catalogue
+        scopes += (inventory_scope(warehouse_uuid),)
+    etag = await get_etag(db, request, *scopes)
+    if is_not_modified(request, etag):
+        return page_not_modified(etag)
+    
+    statement = select_fields(columns)
+    
+    if category is not None:
+        statement = statement.where(Product.category == category)
+    if min_price is not None:
+        statement = statement.where(Product.price >= min_price)
+    if max_price is not None:
+        statement = statement.where(Product.price <= max_price)
+    if name_prefix:
+        statement = statement.where(starts_with(Product.name, name_prefix))
+    if sku_prefix:
+        statement = statement.where(starts_with(Product.sku, sku_prefix))
+    if in_warehouse:
+        # Driven from the warehouse's stock rows, at most one per product,
+        # rather than probing the warehouse for every product in the catalogue
+        statement = statement.join(Stock, and_(Stock.warehouse_id == warehouse_uuid, Stock.product_id == Product.id))
+    
+    sort_column = PRODUCT_SORTS[sort.removeprefix("-")]
+    rows, next_cursor = await fetch_page(db, statement, sort_column, Product.id, cursor, limit, descending=sort.startswith("-"))
+    return page_response(request, rows, list(columns), next_cursor, etag)
 
 @router.get("/{product_id}", response_model=ProductDetailResponse)
 @limiter.limit(RateLimitConfig.READ)
-async def get_product(request: Request, warehouse_id: str, product_id: str, db: Session = Depends(get_db)):
+async def get_product(request: Request, response: Response, warehouse_id: str, product_id: str, db: AsyncSession = Depends(get_db)):
     try:
         warehouse_uuid = UUID(warehouse_id)
         product_uuid = UUID(product_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid ID format")
     
-    warehouse = db.query(Warehouse).filter(Warehouse.id == warehouse_uuid).first()
+    warehouse = await get_warehouse_metadata(db, warehouse_uuid)
     if not warehouse:
         raise HTTPException(status_code=404, detail="Warehouse not found")
     
-    product = db.query(Product).filter(Product.id == product_uuid).first()
+    etag = await get_etag(db, request, PRODUCTS_SCOPE, ALL_INVENTORY_SCOPE)
+    product = await db.get(Product, product_uuid)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    
+    set_etag(response, etag)
     return ProductDetailResponse(
         id=str(product.id),
         name=product.name, # type: ignore
@@ -170,18 +228,18 @@ async def get_product(request: Request, warehouse_id: str, product_id: str, db:
 
 @router.patch("/{product_id}", response_model=MessageResponse)
 @limiter.limit(RateLimitConfig.WRITE)
-async def patch_product(request: Request, warehouse_id: str, product_id: str, product_update: ProductPatch, db: Session = Depends(get_db)):
+async def patch_product(request: Request, warehouse_id: str, product_id: str, product_update: ProductPatch, db: AsyncSession = Depends(get_db)):
     try:
         warehouse_uuid = UUID(warehouse_id)
         product_uuid = UUID(product_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid ID format")
     
-    warehouse = db.query(Warehouse).filter(Warehouse.id == warehouse_uuid).first()
+    warehouse = await get_warehouse_metadata(db, warehouse_uuid)
     if not warehouse:
         raise HTTPException(status_code=404, detail="Warehouse not found")
     
-    product = db.query(Product).filter(Product.id == product_uuid).first()
+    product = await db.get(Product, product_uuid)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
@@ -189,24 +247,27 @@ async def patch_product(request: Request, warehouse_id: str, product_id: str, pr
     for field, value in update_data.items():
         setattr(product, field, value)
     
-    db.commit()
+    if "name" in update_data or "description" in update_data:
+        await index_products(db, [product])
+    await bump_versions(db, PRODUCTS_SCOPE)
+    await db.commit()
     
     return MessageResponse(message="Product updated successfully")
 
 @router.put("/{product_id}", response_model=MessageResponse)
 @limiter.limit(RateLimitConfig.WRITE)
-async def update_product(request: Request, warehouse_id: str, product_id: str, product_update: ProductUpdate, db: Session = Depends(get_db)):
+async def update_product(request: Request, warehouse_id: str, product_id: str, product_update: ProductUpdate, db: AsyncSession = Depends(get_db)):
     try:
         warehouse_uuid = UUID(warehouse_id)
         product_uuid = UUID(product_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid ID format")
     
-    warehouse = db.query(Warehouse).filter(Warehouse.id == warehouse_uuid).first()
+    warehouse = await get_warehouse_metadata(db, warehouse_uuid)
     if not warehouse:
         raise HTTPException(status_code=404, detail="Warehouse not found")
     
-    product = db.query(Product).filter(Product.id == product_uuid).first()
+    product = await db.get(Product, product_uuid)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
@@ -214,28 +275,32 @@ async def update_product(request: Request, warehouse_id: str, product_id: str, p
     for field, value in update_data.items():
         setattr(product, field, value)
     
-    db.commit()
+    await index_products(db, [product])
+    await bump_versions(db, PRODUCTS_SCOPE)
+    await db.commit()
     
     return MessageResponse(message="Product updated successfully")
 
 @router.delete("/{product_id}", response_model=MessageResponse)
 @limiter.limit(RateLimitConfig.WRITE)
-async def delete_product(request: Request, warehouse_id: str, product_id: str, db: Session = Depends(get_db)):
+async def delete_product(request: Request, warehouse_id: str, product_id: str, db: AsyncSession = Depends(get_db)):
     try:
         warehouse_uuid = UUID(warehouse_id)
         product_uuid = UUID(product_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid ID format")
     
-    warehouse = db.query(Warehouse).filter(Warehouse.id == warehouse_uuid).first()
+    warehouse = await get_warehouse_metadata(db, warehouse_uuid)
     if not warehouse:
         raise HTTPException(status_code=404, detail="Warehouse not found")
     
-    product = db.query(Product).filter(Product.id == product_uuid).first()
+    product = await db.get(Product, product_uuid)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    db.delete(product)
-    db.commit()
+    await db.delete(product)
+    await unindex_products(db, [product_uuid])
+    await bump_versions(db, PRODUCTS_SCOPE)
+    await db.commit()
     
     return MessageResponse(message="Product deleted successfully")
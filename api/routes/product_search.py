@@ -0,0 +1,58 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from pydantic import BaseModel
+from models import Product
+from db.session import get_db
+from ..etag import get_etag, is_not_modified
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, fetch_page, page_not_modified, page_response, parse_fields, select_fields
+from ..rate_limiter import limiter, RateLimitConfig
+from ..search import ranked_products, search_terms
+from .product_management import product_scopes
+
+router = APIRouter(prefix="/products", tags=["product_search"])
+
+class ProductSearchResponse(BaseModel):
+    id: str
+    name: str
+    sku: str
+    description: Optional[str] = None
+    price: float
+    category: Optional[str] = None
+    stock_quantity: int
+
+SEARCH_FIELDS = {
+    "id": Product.id,
+    "name": Product.name,
+    "sku": Product.sku,
+    "description": Product.description,
+    "price": Product.price,
+    "category": Product.category,
+    "stock_quantity": Product.stock_quantity
+}
+
+@router.get("/search", response_model=List[ProductSearchResponse])
+@limiter.limit(RateLimitConfig.READ)
+async def search_products(request: Request, q: str = Query(..., max_length=200), limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, fields: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    terms = search_terms(q)
+    if not terms:
+        raise HTTPException(status_code=400, detail="Search query must contain letters or digits")
+    
+    columns = parse_fields(fields, SEARCH_FIELDS)
+    etag = await get_etag(db, request, *product_scopes(columns))
+    if is_not_modified(request, etag):
+        return page_not_modified(etag)
+    
+    # Ranked by relevance; the cursor carries the score of the last match
+    statement, score, tiebreaker = ranked_products(db.get_bind().dialect.name, terms)
+    matches, next_cursor = await fetch_page(db, statement, score, tiebreaker, cursor, limit)
+    
+    product_uuids = [match.product_id for match in matches]
+    products = {
+        row.product_key: row
+        for row in (await db.execute(
+            select_fields(columns).add_columns(Product.id.label("product_key")).where(Product.id.in_(product_uuids))
+        )).all()
+    }
+    rows = [products[product_uuid] for product_uuid in product_uuids if product_uuid in products]
+    return page_response(request, rows, list(columns), next_cursor, etag)
@@ -1,11 +1,25 @@
-from fastapi import APIRouter, HTTPException, Depends, Request
-from sqlalchemy.orm import Session
-from typing import List, Optional, Generator
-from uuid import UUID
+import csv
+import io
+import json
+from collections import defaultdict
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Row, bindparam, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncGenerator, Dict, List, Literal, NamedTuple, Optional, Tuple
+from uuid import UUID, uuid4
 from pydantic import BaseModel
-from models import Product, Warehouse, Stock
-from db.session import getSession
+from models import Product, Warehouse, Stock, StockMovement
+from db.session import get_db, getAsyncSession
+from ..cache import get_warehouse_metadata
+from ..etag import bump_versions, get_etag, inventory_scope, is_not_modified, not_modified_response, set_etag
+from ..group_commit import STOCK_GROUP_COMMIT_MAX_BATCH, STOCK_GROUP_COMMIT_MS, GroupCommitter
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, fetch_page, page_not_modified, page_response, parse_fields, select_fields
+from ..serialization import json_value
 from ..rate_limiter import limiter, RateLimitConfig
+from ..snapshots import quantities_as_of, to_utc
 
 router = APIRouter(prefix="/warehouses/{warehouse_id}/inventory", tags=["stock_management"])
 
@@ -31,135 +45,382 @@ class StockOperationResponse(BaseModel):
     message: str
     new_stock_quantity: int
 
-def get_db() -> Generator[Session, None, None]:
-    session = getSession()
+class StockMovementResponse(BaseModel):
+    id: str
+    movement_type: str
+    quantity: int
+    supplier_id: Optional[str] = None
+    counterpart_warehouse_id: Optional[str] = None
+    reason: Optional[str] = None
+    created_at: datetime
+
+class BulkStockOperation(BaseModel):
+    operation: Literal["increase", "decrease", "transfer"]
+    product_id: str
+    quantity: int
+    supplier_id: Optional[str] = None
+    target_warehouse_id: Optional[str] = None
+    reason: Optional[str] = None
+
+class BulkStockRequest(BaseModel):
+    operations: List[BulkStockOperation]
+    atomic: bool = True
+
+class BulkStockItemResult(BaseModel):
+    index: int
+    product_id: str
+    success: bool
+    new_stock_quantity: Optional[int] = None
+    error: Optional[str] = None
+
+class BulkStockResponse(BaseModel):
+    message: str
+    applied: int
+    failed: int
+    results: List[BulkStockItemResult]
+
+MAX_BULK_OPERATIONS = 5000
+
+EXPORT_BATCH_SIZE = 1000
+
+MOVEMENT_FIELDS = {
+    "id": StockMovement.id,
+    "movement_type": StockMovement.movement_type,
+    "quantity": StockMovement.quantity,
+    "supplier_id": StockMovement.supplier_id,
+    "counterpart_warehouse_id": StockMovement.counterpart_warehouse_id,
+    "reason": StockMovement.reason,
+    "created_at": StockMovement.created_at
+}
+
+STOCK_FIELDS = {
+    "product_id": Stock.product_id,
+    "sku": Stock.sku,
+    "stock_quantity": Stock.stock_quantity
+}
+
+async def adjust_stock_quantity(db: AsyncSession, warehouse_uuid: UUID, product_uuid: UUID, delta: int) -> Optional[Row]:
+    # Single conditional UPDATE so concurrent requests never lose updates.
+    # Decreases only match rows holding enough stock, so no row back means
+    # the stock is either missing or insufficient.
+    conditions = [
+        Stock.product_id == product_uuid,
+        Stock.warehouse_id == warehouse_uuid
+    ]
+    if delta < 0:
+        conditions.append(Stock.stock_quantity >= -delta)
+    
+    result = await db.execute(
+        update(Stock)
+        .where(*conditions)
+        .values(stock_quantity=Stock.stock_quantity + delta)
+        .returning(Stock.stock_quantity, Stock.sku)
+        .execution_options(synchronize_session=False)
+    )
+    return result.first()
+
+async def record_movements(db: AsyncSession, movements: List[dict]) -> None:
+    # One executemany INSERT for any number of movements, in the caller's
+    # transaction so the ledger and the stock never disagree.
+    await db.execute(insert(StockMovement.__table__), movements)
+    
+    # Product.stock_quantity is the total over all warehouses and moves with
+    # the ledger; transfers cancel out. Rows are updated in id order so
+    # concurrent batches lock them in the same order.
+    totals: Dict[UUID, int] = defaultdict(int)
+    for entry in movements:
+        totals[entry["product_id"]] += entry["quantity"]
+    changed = sorted(product_uuid for product_uuid, delta in totals.items() if delta)
+    if changed:
+        products_table = Product.__table__
+        await db.execute(
+            update(products_table)
+            .where(products_table.c.id == bindparam("p_id"))
+            .values(stock_quantity=products_table.c.stock_quantity + bindparam("p_delta")),
+            [{"p_id": product_uuid, "p_delta": totals[product_uuid]} for product_uuid in changed]
+        )
+
+def movement(warehouse_uuid: UUID, product_uuid: UUID, movement_type: str, quantity: int, supplier_uuid: Optional[UUID] = None, counterpart_uuid: Optional[UUID] = None, reason: Optional[str] = None) -> dict:
+    return {
+        "warehouse_id": warehouse_uuid,
+        "product_id": product_uuid,
+        "movement_type": movement_type,
+        "quantity": quantity,
+        "supplier_id": supplier_uuid,
+        "counterpart_warehouse_id": counterpart_uuid,
+        "reason": reason
+    }
+
+class StockIncrease(NamedTuple):
+    warehouse_uuid: UUID
+    product_uuid: UUID
+    quantity: int
+    supplier_uuid: UUID
+
+async def apply_stock_increases(increases: List[StockIncrease]) -> List[Optional[int]]:
+    # Increases of the same stock are merged into one UPDATE, but each keeps
+    # its own movement. Everything commits together in one transaction.
+    deltas: Dict[Tuple[UUID, UUID], int] = defaultdict(int)
+    for increase in increases:
+        deltas[(increase.warehouse_uuid, increase.product_uuid)] += increase.quantity
+    
+    quantities: Dict[Tuple[UUID, UUID], int] = {}
+    session = getAsyncSession()
     try:
-        yield session
+        for warehouse_uuid, product_uuid in sorted(deltas):
+            stock = await adjust_stock_quantity(session, warehouse_uuid, product_uuid, deltas[(warehouse_uuid, product_uuid)])
+            if stock:
+                quantities[(warehouse_uuid, product_uuid)] = stock.stock_quantity
+        
+        if quantities:
+            await record_movements(session, [
+                movement(increase.warehouse_uuid, increase.product_uuid, "increase", increase.quantity, supplier_uuid=increase.supplier_uuid)
+                for increase in increases if (increase.warehouse_uuid, increase.product_uuid) in quantities
+            ])
+            await bump_versions(session, *(inventory_scope(warehouse_uuid) for warehouse_uuid, _ in quantities))
+            await session.commit()
     finally:
-        session.close()
+        await session.close()
+    
+    # Walked backwards, so every increase reports the quantity right after
+    # itself, as if the batch had been applied one request at a time
+    results: List[Optional[int]] = [None] * len(increases)
+    for index in reversed(range(len(increases))):
+        key = (increases[index].warehouse_uuid, increases[index].product_uuid)
+        if key in quantities:
+            results[index] = quantities[key]
+            quantities[key] -= increases[index].quantity
+    return results
+
+stock_increases = GroupCommitter(apply_stock_increases, STOCK_GROUP_COMMIT_MS, STOCK_GROUP_COMMIT_MAX_BATCH)
+
+async def stream_inventory(warehouse_uuid: UUID, format: str) -> AsyncGenerator[str, None]:
+    # The request's session is closed before the response body is sent, so
+    # the export opens its own and reads through a server-side cursor one
+    # batch at a time; memory stays flat whatever the warehouse size.
+    fields = list(STOCK_FIELDS)
+    statement = select_fields(STOCK_FIELDS).where(
+        Stock.warehouse_id == warehouse_uuid
+    ).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    
+    session = getAsyncSession()
+    try:
+        result = await session.stream(statement)
+        if format == "csv":
+            yield ",".join(fields) + "\n"
+        async for rows in result.partitions():
+            buffer = io.StringIO()
+            if format == "csv":
+                csv.writer(buffer, lineterminator="\n").writerows(
+                    [json_value(value) for value in row] for row in rows
+                )
+            else:
+                for row in rows:
+                    buffer.write(json.dumps({field: json_value(row._mapping[field]) for field in fields}))
+                    buffer.write("\n")
+            yield buffer.getvalue()
+    finally:
+        await session.close()
+
+async def stock_exists(db: AsyncSession, warehouse_uuid: UUID, product_uuid: UUID) -> bool:
+    stock_id = await db.scalar(select(Stock.id).where(
+        Stock.product_id == product_uuid,
+        Stock.warehouse_id == warehouse_uuid
+    ).limit(1))
+    return stock_id is not None
 
 @router.get("/", response_model=List[StockResponse])
 @limiter.limit(RateLimitConfig.READ)
-async def get_inventory(request: Request, warehouse_id: str, db: Session = Depends(get_db)):
+async def get_inventory(request: Request, warehouse_id: str, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, fields: Optional[str] = None, as_of: Optional[datetime] = None, db: AsyncSession = Depends(get_db)):
     try:
         warehouse_uuid = UUID(warehouse_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid warehouse ID format")
     
-    warehouse = db.query(Warehouse).filter(Warehouse.id == warehouse_uuid).first()
+    warehouse = await get_warehouse_metadata(db, warehouse_uuid)
     if not warehouse:
         raise HTTPException(status_code=404, detail="Warehouse not found")
     
-    stocks = db.query(Stock).filter(
-        Stock.warehouses.any(Warehouse.id == warehouse_uuid)
-    ).all()
+    etag = await get_etag(db, request, inventory_scope(warehouse_uuid))
+    if is_not_modified(request, etag):
+        return page_not_modified(etag)
     
-    return [
-        StockResponse(
-            product_id=str(stock.product_id),
-            sku=stock.sku, # type: ignore
-            stock_quantity=stock.stock_quantity # type: ignore
-        )
-        for stock in stocks
-    ]
+    if as_of:
+        # Quantities at that time, from the nearest snapshot and the
+        # movements recorded after it; products added later are left out
+        quantities = await quantities_as_of(db, warehouse_uuid, to_utc(as_of))
+        columns = parse_fields(fields, {**STOCK_FIELDS, "stock_quantity": quantities.c.stock_quantity})
+        statement = select_fields(columns).join_from(Stock, quantities, quantities.c.product_id == Stock.product_id)
+    else:
+        columns = parse_fields(fields, STOCK_FIELDS)
+        statement = select_fields(columns)
+    
+    statement = statement.where(Stock.warehouse_id == warehouse_uuid)
+    rows, next_cursor = await fetch_page(db, statement, Stock.created_at, Stock.id, cursor, limit)
+    return page_response(request, rows, list(columns), next_cursor, etag)
+
+@router.get("/export")
+@limiter.limit(RateLimitConfig.READ)
+async def export_inventory(request: Request, warehouse_id: str, format: Literal["ndjson", "csv"] = "ndjson", db: AsyncSession = Depends(get_db)):
+    try:
+        warehouse_uuid = UUID(warehouse_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid warehouse ID format")
+    
+    warehouse = await get_warehouse_metadata(db, warehouse_uuid)
+    if not warehouse:
+        raise HTTPException(status_code=404, detail="Warehouse not found")
+    
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream_inventory(warehouse_uuid, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="inventory-{warehouse_uuid}.{format}"'}
+    )
 
 @router.get("/{product_id}", response_model=StockResponse)
 @limiter.limit(RateLimitConfig.READ)
-async def get_product_inventory(request: Request, warehouse_id: str, product_id: str, db: Session = Depends(get_db)):
+async def get_product_inventory(request: Request, response: Response, warehouse_id: str, product_id: str, db: AsyncSession = Depends(get_db)):
     try:
         warehouse_uuid = UUID(warehouse_id)
         product_uuid = UUID(product_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid ID format")
     
-    warehouse = db.query(Warehouse).filter(Warehouse.id == warehouse_uuid).first()
+    warehouse = await get_warehouse_metadata(db, warehouse_uuid)
     if not warehouse:
         raise HTTPException(status_code=404, detail="Warehouse not found")
     
-    stock = db.query(Stock).filter(
+    etag = await get_etag(db, request, inventory_scope(warehouse_uuid))
+    stock = await db.scalar(select(Stock).where(
         Stock.product_id == product_uuid,
-        Stock.warehouses.any(Warehouse.id == warehouse_uuid)
-    ).first()
+        Stock.warehouse_id == warehouse_uuid
+    ).limit(1))
     
     if not stock:
         raise HTTPException(status_code=404, detail="Product not found in this warehouse")
     
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    
+    set_etag(response, etag)
     return StockResponse(
         product_id=str(stock.product_id),
         sku=stock.sku, # type: ignore
         stock_quantity=stock.stock_quantity # type: ignore
     )
 
+@router.get("/{product_id}/movements", response_model=List[StockMovementResponse])
+@limiter.limit(RateLimitConfig.READ)
+async def get_product_movements(request: Request, warehouse_id: str, product_id: str, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, fields: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    try:
+        warehouse_uuid = UUID(warehouse_id)
+        product_uuid = UUID(product_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid ID format")
+    
+    warehouse = await get_warehouse_metadata(db, warehouse_uuid)
+    if not warehouse:
+        raise HTTPException(status_code=404, detail="Warehouse not found")
+    
+    etag = await get_etag(db, request, inventory_scope(warehouse_uuid))
+    if not await stock_exists(db, warehouse_uuid, product_uuid):
+        raise HTTPException(status_code=404, detail="Product not found in this warehouse")
+    
+    if is_not_modified(request, etag):
+        return page_not_modified(etag)
+    
+    columns = parse_fields(fields, MOVEMENT_FIELDS)
+    statement = select_fields(columns).where(
+        StockMovement.warehouse_id == warehouse_uuid,
+        StockMovement.product_id == product_uuid
+    )
+    rows, next_cursor = await fetch_page(db, statement, StockMovement.created_at, StockMovement.id, cursor, limit)
+    return page_response(request, rows, list(columns), next_cursor, etag)
+
 @router.post("/{product_id}/increase", response_model=StockOperationResponse)
 @limiter.limit(RateLimitConfig.STOCK)
-async def increase_product_inventory(request: Request, warehouse_id: str, product_id: str, stock_request: StockIncreaseRequest, db: Session = Depends(get_db)):
+async def increase_product_inventory(request: Request, warehouse_id: str, product_id: str, stock_request: StockIncreaseRequest, db: AsyncSession = Depends(get_db)):
     try:
         warehouse_uuid = UUID(warehouse_id)
         product_uuid = UUID(product_id)
+        supplier_uuid = UUID(stock_request.supplier_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid ID format")
     
-    warehouse = db.query(Warehouse).filter(Warehouse.id == warehouse_uuid).first()
+    if stock_request.quantity <= 0:
+        raise HTTPException(status_code=400, detail="Quantity must be positive")
+    
+    warehouse = await get_warehouse_metadata(db, warehouse_uuid)
     if not warehouse:
         raise HTTPException(status_code=404, detail="Warehouse not found")
     
-    stock = db.query(Stock).filter(
-        Stock.product_id == product_uuid,
-        Stock.warehouses.any(Warehouse.id == warehouse_uuid)
-    ).first()
+    if stock_increases.enabled:
+        # Hand the pooled connection back while waiting; the batch opens its own
+        await db.close()
+        new_stock_quantity = await stock_increases.submit(
+            StockIncrease(warehouse_uuid, product_uuid, stock_request.quantity, supplier_uuid)
+        )
+        if new_stock_quantity is None:
+            raise HTTPException(status_code=404, detail="Product not found in this warehouse")
+        
+        return StockOperationResponse(
+            message="Stock increased successfully",
+            new_stock_quantity=new_stock_quantity
+        )
     
+    stock = await adjust_stock_quantity(db, warehouse_uuid, product_uuid, stock_request.quantity)
     if not stock:
         raise HTTPException(status_code=404, detail="Product not found in this warehouse")
     
-    if stock_request.quantity <= 0:
-        raise HTTPException(status_code=400, detail="Quantity must be positive")
-    
-    stock.stock_quantity += stock_request.quantity # type: ignore
-    db.commit()
+    await record_movements(db, [
+        movement(warehouse_uuid, product_uuid, "increase", stock_request.quantity, supplier_uuid=supplier_uuid)
+    ])
+    await bump_versions(db, inventory_scope(warehouse_uuid))
+    await db.commit()
     
     return StockOperationResponse(
         message="Stock increased successfully",
-        new_stock_quantity=stock.stock_quantity # type: ignore
+        new_stock_quantity=stock.stock_quantity
     )
 
 @router.post("/{product_id}/decrease", response_model=StockOperationResponse)
 @limiter.limit(RateLimitConfig.STOCK)
-async def decrease_product_inventory(request: Request, warehouse_id: str, product_id: str, stock_request: StockDecreaseRequest, db: Session = Depends(get_db)):
+async def decrease_product_inventory(request: Request, warehouse_id: str, product_id: str, stock_request: StockDecreaseRequest, db: AsyncSession = Depends(get_db)):
     try:
         warehouse_uuid = UUID(warehouse_id)
         product_uuid = UUID(product_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid ID format")
     
-    warehouse = db.query(Warehouse).filter(Warehouse.id == warehouse_uuid).first()
+    if stock_request.quantity <= 0:
+        raise HTTPException(status_code=400, detail="Quantity must be positive")
+    
+    warehouse = await get_warehouse_metadata(db, warehouse_uuid)
     if not warehouse:
         raise HTTPException(status_code=404, detail="Warehouse not found")
     
-    stock = db.query(Stock).filter(
-        Stock.product_id == product_uuid,
-        Stock.warehouses.any(Warehouse.id == warehouse_uuid)
-    ).first()
-    
+    stock = await adjust_stock_quantity(db, warehouse_uuid, product_uuid, -stock_request.quantity)
     if not stock:
-        raise HTTPException(status_code=404, detail="Product not found in this warehouse")
-    
-    if stock_request.quantity <= 0:
-        raise HTTPException(status_code=400, detail="Quantity must be positive")
-    
-    if stock.stock_quantity < stock_request.quantity: # type: ignore
+        await db.rollback()
+        if not await stock_exists(db, warehouse_uuid, product_uuid):
+            raise HTTPException(status_code=404, detail="Product not found in this warehouse")
         raise HTTPException(status_code=400, detail="Insufficient stock quantity")
     
-    stock.stock_quantity -= stock_request.quantity # type: ignore
-    db.commit()
+    await record_movements(db, [
+        movement(warehouse_uuid, product_uuid, "decrease", -stock_request.quantity, reason=stock_request.reason)
+    ])
+    await bump_versions(db, inventory_scope(warehouse_uuid))
+    await db.commit()
     
     return StockOperationResponse(
         message="Stock decreased successfully",
-        new_stock_quantity=stock.stock_quantity # type: ignore
+        new_stock_quantity=stock.stock_quantity
     )
 
 @router.post("/{product_id}/transfer", response_model=StockOperationResponse)
 @limiter.limit(RateLimitConfig.STOCK)
-async def transfer_product_inventory(request: Request, warehouse_id: str, product_id: str, stock_request: StockTransferRequest, db: Session = Depends(get_db)):
+async def transfer_product_inventory(request: Request, warehouse_id: str, product_id: str, stock_request: StockTransferRequest, db: AsyncSession = Depends(get_db)):
     try:
         warehouse_uuid = UUID(warehouse_id)
         product_uuid = UUID(product_id)
@@ -167,52 +428,209 @@ async def transfer_product_inventory(request: Request, warehouse_id: str, produc
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid ID format")
     
-    warehouse = db.query(Warehouse).filter(Warehouse.id == warehouse_uuid).first()
+    if stock_request.quantity <= 0:
+        raise HTTPException(status_code=400, detail="Quantity must be positive")
+    
+    warehouse = await get_warehouse_metadata(db, warehouse_uuid)
     if not warehouse:
         raise HTTPException(status_code=404, detail="Source warehouse not found")
     
-    target_warehouse = db.query(Warehouse).filter(Warehouse.id == target_warehouse_uuid).first()
+    target_warehouse = await get_warehouse_metadata(db, target_warehouse_uuid)
     if not target_warehouse:
         raise HTTPException(status_code=404, detail="Target warehouse not found")
     
     if warehouse_uuid == target_warehouse_uuid:
         raise HTTPException(status_code=400, detail="Cannot transfer to the same warehouse")
     
-    source_stock = db.query(Stock).filter(
-        Stock.product_id == product_uuid,
-        Stock.warehouses.any(Warehouse.id == warehouse_uuid)
-    ).first()
-    
+    source_stock = await adjust_stock_quantity(db, warehouse_uuid, product_uuid, -stock_request.quantity)
     if not source_stock:
-        raise HTTPException(status_code=404, detail="Product not found in source warehouse")
-    
-    if stock_request.quantity <= 0:
-        raise HTTPException(status_code=400, detail="Quantity must be positive")
-    
-    if source_stock.stock_quantity < stock_request.quantity: # type: ignore
+        await db.rollback()
+        if not await stock_exists(db, warehouse_uuid, product_uuid):
+            raise HTTPException(status_code=404, detail="Product not found in source warehouse")
         raise HTTPException(status_code=400, detail="Insufficient stock quantity")
     
-    source_stock.stock_quantity -= stock_request.quantity # type: ignore
-    
-    target_stock = db.query(Stock).filter(
-        Stock.product_id == product_uuid,
-        Stock.warehouses.any(Warehouse.id == target_warehouse_uuid)
-    ).first()
-    
-    if target_stock:
-        target_stock.stock_quantity += stock_request.quantity # type: ignore
-    else:
-        target_stock = Stock(
+    target_stock = await adjust_stock_quantity(db, target_warehouse_uuid, product_uuid, stock_request.quantity)
+    if not target_stock:
+        new_stock = Stock(
+            warehouse_id=target_warehouse_uuid,
             product_id=product_uuid,
-            sku=source_stock.sku, # type: ignore
+            sku=source_stock.sku,
             stock_quantity=stock_request.quantity
         )
-        target_stock.warehouses.append(target_warehouse)
-        db.add(target_stock)
+        db.add(new_stock)
     
-    db.commit()
+    try:
+        await db.flush()
+        await record_movements(db, [
+            movement(warehouse_uuid, product_uuid, "transfer_out", -stock_request.quantity, counterpart_uuid=target_warehouse_uuid, reason=stock_request.reason),
+            movement(target_warehouse_uuid, product_uuid, "transfer_in", stock_request.quantity, counterpart_uuid=warehouse_uuid, reason=stock_request.reason)
+        ])
+        await bump_versions(db, inventory_scope(warehouse_uuid), inventory_scope(target_warehouse_uuid))
+        await db.commit()
+    except IntegrityError:
+        # Another request created the target stock row first
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Stock changed concurrently, retry the transfer")
     
     return StockOperationResponse(
         message="Stock transferred successfully",
-        new_stock_quantity=source_stock.stock_quantity # type: ignore
+        new_stock_quantity=source_stock.stock_quantity
+    )
+
+@router.post("/bulk", response_model=BulkStockResponse)
+@limiter.limit(RateLimitConfig.BULK)
+async def bulk_product_inventory(request: Request, warehouse_id: str, bulk_request: BulkStockRequest, db: AsyncSession = Depends(get_db)):
+    try:
+        warehouse_uuid = UUID(warehouse_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid warehouse ID format")
+    
+    if not bulk_request.operations:
+        raise HTTPException(status_code=400, detail="No operations provided")
+    
+    if len(bulk_request.operations) > MAX_BULK_OPERATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_OPERATIONS} operations are allowed per request")
+    
+    warehouse = await get_warehouse_metadata(db, warehouse_uuid)
+    if not warehouse:
+        raise HTTPException(status_code=404, detail="Warehouse not found")
+    
+    results: List[BulkStockItemResult] = []
+    parsed: List[Tuple[int, BulkStockOperation, UUID, Optional[UUID], Optional[UUID]]] = []
+    for index, operation in enumerate(bulk_request.operations):
+        try:
+            product_uuid = UUID(operation.product_id)
+            target_uuid = UUID(operation.target_warehouse_id) if operation.operation == "transfer" else None
+            supplier_uuid = UUID(operation.supplier_id) if operation.operation == "increase" and operation.supplier_id else None
+        except (TypeError, ValueError):
+            results.append(BulkStockItemResult(index=index, product_id=operation.product_id, success=False, error="Invalid ID format"))
+            continue
+        parsed.append((index, operation, product_uuid, target_uuid, supplier_uuid))
+    
+    # Resolve every referenced warehouse and stock row with one query each
+    # instead of three or four queries per operation.
+    target_uuids = {target_uuid for _, _, _, target_uuid, _ in parsed if target_uuid}
+    known_warehouses = {warehouse_uuid}
+    if target_uuids:
+        known_warehouses.update((await db.scalars(
+            select(Warehouse.id).where(Warehouse.id.in_(target_uuids))
+        )).all())
+    
+    product_uuids = {product_uuid for _, _, product_uuid, _, _ in parsed}
+    stock_rows = (await db.execute(
+        select(Stock.warehouse_id, Stock.product_id, Stock.id, Stock.sku, Stock.stock_quantity)
+        .where(
+            Stock.warehouse_id.in_(known_warehouses),
+            Stock.product_id.in_(product_uuids)
+        )
+    )).all()
+    
+    # (warehouse, product) -> [stock id, sku, quantity, net delta]
+    balances: Dict[Tuple[UUID, UUID], list] = {}
+    for row in stock_rows:
+        balances.setdefault((row.warehouse_id, row.product_id), [row.id, row.sku, row.stock_quantity, 0])
+    new_stocks: Dict[Tuple[UUID, UUID], list] = {}
+    movements: List[dict] = []
+    
+    for index, operation, product_uuid, target_uuid, supplier_uuid in parsed:
+        error = None
+        source = balances.get((warehouse_uuid, product_uuid))
+        if operation.quantity <= 0:
+            error = "Quantity must be positive"
+        elif operation.operation == "increase" and supplier_uuid is None:
+            error = "Supplier ID is required for an increase"
+        elif not source:
+            error = "Product not found in this warehouse"
+        elif operation.operation == "transfer" and target_uuid not in known_warehouses:
+            error = "Target warehouse not found"
+        elif operation.operation == "transfer" and target_uuid == warehouse_uuid:
+            error = "Cannot transfer to the same warehouse"
+        elif operation.operation != "increase" and source[2] < operation.quantity:
+            error = "Insufficient stock quantity"
+        
+        if error:
+            results.append(BulkStockItemResult(index=index, product_id=operation.product_id, success=False, error=error))
+            continue
+        
+        delta = operation.quantity if operation.operation == "increase" else -operation.quantity
+        source[2] += delta
+        source[3] += delta
+        
+        if operation.operation == "transfer":
+            target = balances.get((target_uuid, product_uuid))
+            if not target:
+                target = [uuid4(), source[1], 0, 0]
+                balances[(target_uuid, product_uuid)] = target
+                new_stocks[(target_uuid, product_uuid)] = target
+            target[2] += operation.quantity
+            target[3] += operation.quantity
+            
+            movements.append(movement(warehouse_uuid, product_uuid, "transfer_out", delta, counterpart_uuid=target_uuid, reason=operation.reason))
+            movements.append(movement(target_uuid, product_uuid, "transfer_in", operation.quantity, counterpart_uuid=warehouse_uuid, reason=operation.reason))
+        else:
+            movements.append(movement(warehouse_uuid, product_uuid, operation.operation, delta, supplier_uuid=supplier_uuid, reason=operation.reason))
+        
+        results.append(BulkStockItemResult(index=index, product_id=operation.product_id, success=True, new_stock_quantity=source[2]))
+    
+    results.sort(key=lambda result: result.index)
+    failed = sum(1 for result in results if not result.success)
+    
+    if failed and bulk_request.atomic:
+        for result in results:
+            if result.success:
+                result.success = False
+                result.new_stock_quantity = None
+                result.error = "Not applied: batch rejected"
+        return BulkStockResponse(
+            message="No operations applied: batch contains invalid operations",
+            applied=0,
+            failed=failed,
+            results=results
+        )
+    
+    # Apply the net change per stock row with one executemany UPDATE. The
+    # guard re-checks the quantity so a concurrent decrease can not drive
+    # stock negative between the read above and this write.
+    updates = [
+        {"b_id": balance[0], "b_delta": balance[3]}
+        for key, balance in balances.items()
+        if balance[3] != 0 and key not in new_stocks
+    ]
+    if updates:
+        stocks_table = Stock.__table__
+        result = await db.execute(
+            update(stocks_table)
+            .where(
+                stocks_table.c.id == bindparam("b_id"),
+                stocks_table.c.stock_quantity + bindparam("b_delta") >= 0
+            )
+            .values(stock_quantity=stocks_table.c.stock_quantity + bindparam("b_delta")),
+            updates
+        )
+        if result.rowcount != len(updates):
+            await db.rollback()
+            raise HTTPException(status_code=409, detail="Stock changed concurrently, retry the batch")
+    
+    try:
+        if new_stocks:
+            await db.execute(insert(Stock.__table__), [
+                {"id": stock[0], "warehouse_id": target_uuid, "product_id": product_uuid, "sku": stock[1], "stock_quantity": stock[2]}
+                for (target_uuid, product_uuid), stock in new_stocks.items()
+            ])
+        if movements:
+            await record_movements(db, movements)
+        scopes = [inventory_scope(key[0]) for key, balance in balances.items() if balance[3] != 0]
+        if scopes:
+            await bump_versions(db, *scopes)
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Stock changed concurrently, retry the batch")
+    
+    applied = len(results) - failed
+    return BulkStockResponse(
+        message="Bulk stock operations applied" if not failed else "Bulk stock operations partially applied",
+        applied=applied,
+        failed=failed,
+        results=results
     )
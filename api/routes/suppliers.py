@@ -1,10 +1,12 @@
-from fastapi import APIRouter, HTTPException, Depends, Request
-from sqlalchemy.orm import Session
-from typing import List, Optional, Generator
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from uuid import UUID
 from pydantic import BaseModel
 from models import Supplier
-from db.session import getSession
+from db.session import get_db
+from ..etag import bump_versions, get_etag, is_not_modified, not_modified_response, set_etag
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, fetch_page, page_not_modified, page_response, parse_fields, select_fields
 from ..rate_limiter import limiter, RateLimitConfig
 
 router = APIRouter(prefix="/suppliers", tags=["suppliers"])
@@ -33,23 +35,25 @@ class SupplierCreateResponse(BaseModel):
 class MessageResponse(BaseModel):
     message: str
 
-def get_db() -> Generator[Session, None, None]:
-    session = getSession()
-    try:
-        yield session
-    finally:
-        session.close()
+SUPPLIERS_SCOPE = "suppliers"
+
+SUPPLIER_FIELDS = {
+    "id": Supplier.id,
+    "name": Supplier.name,
+    "contact_email": Supplier.contact_email
+}
 
 @router.post("/", response_model=SupplierCreateResponse)
 @limiter.limit(RateLimitConfig.WRITE)
-async def create_supplier(request: Request, supplier: SupplierCreate, db: Session = Depends(get_db)):
+async def create_supplier(request: Request, supplier: SupplierCreate, db: AsyncSession = Depends(get_db)):
     db_supplier = Supplier(
         name=supplier.name,
         contact_email=supplier.contact_email
     )
     db.add(db_supplier)
-    db.commit()
-    db.refresh(db_supplier)
+    await bump_versions(db, SUPPLIERS_SCOPE)
+    await db.commit()
+    await db.refresh(db_supplier)
     
     return SupplierCreateResponse(
         message="Supplier created successfully",
@@ -58,30 +62,33 @@ async def create_supplier(request: Request, supplier: SupplierCreate, db: Sessio
 
 @router.get("/", response_model=List[SupplierResponse])
 @limiter.limit(RateLimitConfig.READ)
-async def get_suppliers(request: Request, db: Session = Depends(get_db)):
-    suppliers = db.query(Supplier).all()
-    return [
-        SupplierResponse(
-            id=str(supplier.id),
-            name=str(supplier.name),
-            contact_email=str(supplier.contact_email)
-        )
-        for supplier in suppliers
-    ]
+async def get_suppliers(request: Request, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, fields: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    etag = await get_etag(db, request, SUPPLIERS_SCOPE)
+    if is_not_modified(request, etag):
+        return page_not_modified(etag)
+    
+    columns = parse_fields(fields, SUPPLIER_FIELDS)
+    rows, next_cursor = await fetch_page(db, select_fields(columns), Supplier.created_at, Supplier.id, cursor, limit)
+    return page_response(request, rows, list(columns), next_cursor, etag)
 
 @router.get("/{supplier_id}", response_model=SupplierResponse)
 @limiter.limit(RateLimitConfig.READ)
-async def get_supplier(request: Request, supplier_id: str, db: Session = Depends(get_db)):
+async def get_supplier(request: Request, response: Response, supplier_id: str, db: AsyncSession = Depends(get_db)):
     try:
         supplier_uuid = UUID(supplier_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid supplier ID format")
     
-    supplier = db.query(Supplier).filter(Supplier.id == supplier_uuid).first()
+    etag = await get_etag(db, request, SUPPLIERS_SCOPE)
+    supplier = await db.get(Supplier, supplier_uuid)
     
     if not supplier:
         raise HTTPException(status_code=404, detail="Supplier not found")
     
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    
+    set_etag(response, etag)
     return SupplierResponse(
         id=str(supplier.id),
         name=str(supplier.name),
@@ -90,13 +97,13 @@ async def get_supplier(request: Request, supplier_id: str, db: Session = Depends
 
 @router.patch("/{supplier_id}", response_model=MessageResponse)
 @limiter.limit(RateLimitConfig.WRITE)
-async def patch_supplier(request: Request, supplier_id: str, supplier_update: SupplierPatch, db: Session = Depends(get_db)):
+async def patch_supplier(request: Request, supplier_id: str, supplier_update: SupplierPatch, db: AsyncSession = Depends(get_db)):
     try:
         supplier_uuid = UUID(supplier_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid supplier ID format")
     
-    supplier = db.query(Supplier).filter(Supplier.id == supplier_uuid).first()
+    supplier = await db.get(Supplier, supplier_uuid)
     
     if not supplier:
         raise HTTPException(status_code=404, detail="Supplier not found")
@@ -105,19 +112,20 @@ async def patch_supplier(request: Request, supplier_id: str, supplier_update: Su
     for field, value in update_data.items():
         setattr(supplier, field, value)
     
-    db.commit()
+    await bump_versions(db, SUPPLIERS_SCOPE)
+    await db.commit()
     
     return MessageResponse(message="Supplier updated successfully")
 
 @router.put("/{supplier_id}", response_model=MessageResponse)
 @limiter.limit(RateLimitConfig.WRITE)
-async def update_supplier(request: Request, supplier_id: str, supplier_update: SupplierUpdate, db: Session = Depends(get_db)):
+async def update_supplier(request: Request, supplier_id: str, supplier_update: SupplierUpdate, db: AsyncSession = Depends(get_db)):
     try:
         supplier_uuid = UUID(supplier_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid supplier ID format")
     
-    supplier = db.query(Supplier).filter(Supplier.id == supplier_uuid).first()
+    supplier = await db.get(Supplier, supplier_uuid)
     
     if not supplier:
         raise HTTPException(status_code=404, detail="Supplier not found")
@@ -126,6 +134,7 @@ async def update_supplier(request: Request, supplier_id: str, supplier_update: S
     for field, value in update_data.items():
         setattr(supplier, field, value)
     
-    db.commit()
+    await bump_versions(db, SUPPLIERS_SCOPE)
+    await db.commit()
     
     return MessageResponse(message="Supplier updated successfully")
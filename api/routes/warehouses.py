@@ -1,10 +1,13 @@
-from fastapi import APIRouter, HTTPException, Depends, Request
-from sqlalchemy.orm import Session
-from typing import List, Optional, Generator
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from uuid import UUID
 from pydantic import BaseModel
 from models import Warehouse
-from db.session import getSession
+from db.session import get_db
+from ..cache import warehouse_cache
+from ..etag import bump_versions, get_etag, is_not_modified, not_modified_response, set_etag
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, fetch_page, page_not_modified, page_response, parse_fields, select_fields
 from ..rate_limiter import limiter, RateLimitConfig
 
 router = APIRouter(prefix="/warehouses", tags=["warehouses"])
@@ -33,23 +36,25 @@ class WarehouseCreateResponse(BaseModel):
 class MessageResponse(BaseModel):
     message: str
 
-def get_db() -> Generator[Session, None, None]:
-    session = getSession()
-    try:
-        yield session
-    finally:
-        session.close()
+WAREHOUSES_SCOPE = "warehouses"
+
+WAREHOUSE_FIELDS = {
+    "id": Warehouse.id,
+    "name": Warehouse.name,
+    "location": Warehouse.location
+}
 
 @router.post("/", response_model=WarehouseCreateResponse)
 @limiter.limit(RateLimitConfig.WRITE)
-async def create_warehouse(request: Request, warehouse: WarehouseCreate, db: Session = Depends(get_db)):
+async def create_warehouse(request: Request, warehouse: WarehouseCreate, db: AsyncSession = Depends(get_db)):
     db_warehouse = Warehouse(
         name=warehouse.name,
         location=warehouse.location
     )
     db.add(db_warehouse)
-    db.commit()
-    db.refresh(db_warehouse)
+    await bump_versions(db, WAREHOUSES_SCOPE)
+    await db.commit()
+    await db.refresh(db_warehouse)
     
     return WarehouseCreateResponse(
         message="Warehouse created successfully",
@@ -58,30 +63,33 @@ async def create_warehouse(request: Request, warehouse: WarehouseCreate, db: Ses
 
 @router.get("/", response_model=List[WarehouseResponse])
 @limiter.limit(RateLimitConfig.READ)
-async def get_warehouses(request: Request, db: Session = Depends(get_db)):
-    warehouses = db.query(Warehouse).all()
-    return [
-        WarehouseResponse(
-            id=str(warehouse.id),
-            name=str(warehouse.name),
-            location=str(warehouse.location)
-        )
-        for warehouse in warehouses
-    ]
+async def get_warehouses(request: Request, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, fields: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    etag = await get_etag(db, request, WAREHOUSES_SCOPE)
+    if is_not_modified(request, etag):
+        return page_not_modified(etag)
+    
+    columns = parse_fields(fields, WAREHOUSE_FIELDS)
+    rows, next_cursor = await fetch_page(db, select_fields(columns), Warehouse.created_at, Warehouse.id, cursor, limit)
+    return page_response(request, rows, list(columns), next_cursor, etag)
 
 @router.get("/{warehouse_id}", response_model=WarehouseResponse)
 @limiter.limit(RateLimitConfig.READ)
-async def get_warehouse(request: Request, warehouse_id: str, db: Session = Depends(get_db)):
+async def get_warehouse(request: Request, response: Response, warehouse_id: str, db: AsyncSession = Depends(get_db)):
     try:
         warehouse_uuid = UUID(warehouse_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid warehouse ID format")
     
-    warehouse = db.query(Warehouse).filter(Warehouse.id == warehouse_uuid).first()
+    etag = await get_etag(db, request, WAREHOUSES_SCOPE)
+    warehouse = await db.get(Warehouse, warehouse_uuid)
     
     if not warehouse:
         raise HTTPException(status_code=404, detail="Warehouse not found")
     
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    
+    set_etag(response, etag)
     return WarehouseResponse(
         id=str(warehouse.id),
         name=str(warehouse.name),
@@ -90,13 +98,13 @@ async def get_warehouse(request: Request, warehouse_id: str, db: Session = Depen
 
 @router.patch("/{warehouse_id}", response_model=MessageResponse)
 @limiter.limit(RateLimitConfig.WRITE)
-async def patch_warehouse(request: Request, warehouse_id: str, warehouse_update: WarehousePatch, db: Session = Depends(get_db)):
+async def patch_warehouse(request: Request, warehouse_id: str, warehouse_update: WarehousePatch, db: AsyncSession = Depends(get_db)):
     try:
         warehouse_uuid = UUID(warehouse_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid warehouse ID format")
     
-    warehouse = db.query(Warehouse).filter(Warehouse.id == warehouse_uuid).first()
+    warehouse = await db.get(Warehouse, warehouse_uuid)
     
     if not warehouse:
         raise HTTPException(status_code=404, detail="Warehouse not found")
@@ -105,19 +113,21 @@ async def patch_warehouse(request: Request, warehouse_id: str, warehouse_update:
     for field, value in update_data.items():
         setattr(warehouse, field, value)
     
-    db.commit()
+    await bump_versions(db, WAREHOUSES_SCOPE)
+    await db.commit()
+    warehouse_cache.invalidate(warehouse_uuid)
     
     return MessageResponse(message="Warehouse updated successfully")
 
 @router.put("/{warehouse_id}", response_model=MessageResponse)
 @limiter.limit(RateLimitConfig.WRITE)
-async def update_warehouse(request: Request, warehouse_id: str, warehouse_update: WarehouseUpdate, db: Session = Depends(get_db)):
+async def update_warehouse(request: Request, warehouse_id: str, warehouse_update: WarehouseUpdate, db: AsyncSession = Depends(get_db)):
     try:
         warehouse_uuid = UUID(warehouse_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid warehouse ID format")
     
-    warehouse = db.query(Warehouse).filter(Warehouse.id == warehouse_uuid).first()
+    warehouse = await db.get(Warehouse, warehouse_uuid)
     
     if not warehouse:
         raise HTTPException(status_code=404, detail="Warehouse not found")
@@ -126,6 +136,8 @@ async def update_warehouse(request: Request, warehouse_id: str, warehouse_update
     for field, value in update_data.items():
         setattr(warehouse, field, value)
     
-    db.commit()
+    await bump_versions(db, WAREHOUSES_SCOPE)
+    await db.commit()
+    warehouse_cache.invalidate(warehouse_uuid)
     
     return MessageResponse(message="Warehouse updated successfully")
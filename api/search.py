@@ -0,0 +1,56 @@
+import re
+from typing import Iterable, List, Tuple
+from uuid import UUID
+from sqlalchemy import ColumnElement, Float, Select, delete, func, insert, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import Product, product_search
+from models.product_search import SEARCH_DOCUMENT, SEARCH_TABLE
+
+MAX_SEARCH_TERMS = 10
+
+# Letters and digits only, so no term can carry FTS5 or tsquery syntax
+SEARCH_TERM = re.compile(r"[^\W_]+")
+
+def search_terms(q: str) -> List[str]:
+    return SEARCH_TERM.findall(q.lower())[:MAX_SEARCH_TERMS]
+
+def search_rowid(product_uuid: UUID) -> int:
+    # FTS5 rows are keyed by integer; the product's own rowid can change on
+    # VACUUM, so the key is taken from the (random) UUID instead
+    return int.from_bytes(product_uuid.bytes[:8], "big") >> 1
+
+async def index_products(db: AsyncSession, products: Iterable[Product]) -> None:
+    if db.get_bind().dialect.name != "sqlite":
+        return
+
+    rows = [
+        {"rowid": search_rowid(product.id), "product_id": product.id, "name": product.name, "description": product.description or ""}
+        for product in products
+    ]
+    if rows:
+        await db.execute(insert(product_search).prefix_with("OR REPLACE"), rows)
+
+async def unindex_products(db: AsyncSession, product_uuids: Iterable[UUID]) -> None:
+    if db.get_bind().dialect.name != "sqlite":
+        return
+
+    rowids = [search_rowid(product_uuid) for product_uuid in product_uuids]
+    if rowids:
+        await db.execute(delete(product_search).where(product_search.c.rowid.in_(rowids)))
+
+def ranked_products(dialect: str, terms: List[str]) -> Tuple[Select, ColumnElement, ColumnElement]:
+    # Ids of the products containing every term as a word prefix, the score
+    # ordering them (lowest first for the best match) and the tiebreaker.
+    # Pages are ranked on the search index alone and joined to the products
+    # afterwards, so only one page of matches is ever looked up.
+    if dialect == "sqlite":
+        query = " ".join(f'"{term}"*' for term in terms)
+        statement = select(product_search.c.product_id).where(product_search.c[SEARCH_TABLE].match(query))
+        # Ties are broken on the rowid, which unlike product_id is read
+        # without going back to the stored content
+        return statement, func.bm25(literal_column(SEARCH_TABLE), type_=Float), product_search.c.rowid
+
+    document = literal_column(SEARCH_DOCUMENT)
+    query = func.to_tsquery(literal_column("'simple'"), " & ".join(f"{term}:*" for term in terms))
+    statement = select(Product.id.label("product_id")).where(document.op("@@")(query))
+    return statement, -func.ts_rank(document, query, type_=Float), Product.id
@@ -0,0 +1,111 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+from uuid import UUID
+
+# orjson is optional; when it is installed responses are encoded with it,
+# which also encodes UUIDs and datetimes without converting them first
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# msgpack is optional too; without it MessagePack is simply not offered
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+COLUMNAR_MEDIA_TYPE = "application/vnd.inventory.columnar+json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+def json_value(value: Any) -> Any:
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def orjson_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class Rows(NamedTuple):
+    # Result rows whose leading columns are `fields`, encoded straight to a
+    # JSON array of objects; no model is built or validated per row
+    rows: Sequence[Any]
+    fields: List[str]
+
+class Columns(NamedTuple):
+    # The same rows encoded as one array per field, e.g.
+    # {"id": [...], "sku": [...]}, so field names appear once per page
+    rows: Sequence[Any]
+    fields: List[str]
+
+def records(content: Rows, convert: Optional[Callable[[Any], Any]] = None) -> List[Dict[str, Any]]:
+    if convert is None:
+        return [dict(zip(content.fields, row)) for row in content.rows]
+    return [{field: convert(value) for field, value in zip(content.fields, row)} for row in content.rows]
+
+def columns(content: Columns, convert: Optional[Callable[[Any], Any]] = None) -> Dict[str, List[Any]]:
+    if convert is None:
+        return {field: [row[i] for row in content.rows] for i, field in enumerate(content.fields)}
+    return {field: [convert(row[i]) for row in content.rows] for i, field in enumerate(content.fields)}
+
+def dump_json(content: Any) -> bytes:
+    convert = None if orjson else json_value
+    if isinstance(content, Rows):
+        content = records(content, convert)
+    elif isinstance(content, Columns):
+        content = columns(content, convert)
+
+    if orjson:
+        return orjson.dumps(content, default=orjson_default)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def dump_msgpack(content: Any) -> bytes:
+    # Values are converted as for JSON, so both formats decode to the same data
+    if isinstance(content, Rows):
+        content = records(content)
+    elif isinstance(content, Columns):
+        content = columns(content)
+    return msgpack.packb(content, default=json_value)
+
+def list_media_types() -> List[str]:
+    media_types = [JSON_MEDIA_TYPE, COLUMNAR_MEDIA_TYPE]
+    if msgpack:
+        media_types.append(MSGPACK_MEDIA_TYPE)
+    return media_types
+
+def negotiate_media_type(accept: Optional[str]) -> str:
+    # The supported type with the highest q-value wins, earlier ones on a
+    # tie; anything else, including a missing header, gets JSON
+    if not accept:
+        return JSON_MEDIA_TYPE
+
+    supported = list_media_types()
+    best, best_quality = JSON_MEDIA_TYPE, 0.0
+    for part in accept.split(","):
+        media_type, _, parameters = part.partition(";")
+        media_type = media_type.strip().lower()
+        if media_type in ("*/*", "application/*"):
+            media_type = JSON_MEDIA_TYPE
+
+        quality = 1.0
+        for parameter in parameters.split(";"):
+            name, _, value = parameter.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        if media_type in supported and quality > best_quality:
+            best, best_quality = media_type, quality
+
+    return best
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID, uuid4
+from sqlalchemy import Row, Select, Subquery, func, insert, literal, select, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import InventorySnapshot, InventorySnapshotItem, StockMovement, Warehouse
+from db.session import getAsyncSession
+
+SNAPSHOT_INTERVAL_SECONDS = int(os.getenv("SNAPSHOT_INTERVAL_SECONDS", "3600"))
+
+# Movements are timestamped before their transaction commits, so a
+# snapshot is only taken once no transaction can still be open behind it.
+SNAPSHOT_LAG_SECONDS = int(os.getenv("SNAPSHOT_LAG_SECONDS", "60"))
+
+logger = logging.getLogger(__name__)
+
+def to_utc(value: datetime) -> datetime:
+    # Timestamps are stored as naive UTC
+    if value.tzinfo:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+async def find_snapshot(db: AsyncSession, warehouse_uuid: UUID, at: datetime) -> Optional[Row]:
+    return (await db.execute(
+        select(InventorySnapshot.id, InventorySnapshot.taken_at)
+        .where(
+            InventorySnapshot.warehouse_id == warehouse_uuid,
+            InventorySnapshot.taken_at <= at
+        )
+        .order_by(InventorySnapshot.taken_at.desc())
+        .limit(1)
+    )).first()
+
+def movements_between(warehouse_uuid: UUID, after: Optional[datetime], until: datetime) -> Select:
+    statement = select(StockMovement.product_id, StockMovement.quantity.label("stock_quantity")).where(
+        StockMovement.warehouse_id == warehouse_uuid,
+        StockMovement.created_at <= until
+    )
+    if after:
+        statement = statement.where(StockMovement.created_at > after)
+    return statement
+
+def balances_query(warehouse_uuid: UUID, snapshot: Optional[Row], until: datetime) -> Select:
+    # Quantities per product from the snapshot plus the movements after it
+    movements = movements_between(warehouse_uuid, snapshot.taken_at if snapshot else None, until)
+    if snapshot:
+        rows = union_all(
+            select(InventorySnapshotItem.product_id, InventorySnapshotItem.stock_quantity)
+            .where(InventorySnapshotItem.snapshot_id == snapshot.id),
+            movements
+        ).subquery()
+    else:
+        rows = movements.subquery()
+
+    return select(
+        rows.c.product_id,
+        func.sum(rows.c.stock_quantity).label("stock_quantity")
+    ).group_by(rows.c.product_id)
+
+async def quantities_as_of(db: AsyncSession, warehouse_uuid: UUID, as_of: datetime) -> Subquery:
+    snapshot = await find_snapshot(db, warehouse_uuid, as_of)
+    return balances_query(warehouse_uuid, snapshot, as_of).subquery()
+
+async def take_snapshot(db: AsyncSession, warehouse_uuid: UUID, taken_at: datetime) -> bool:
+    previous = await find_snapshot(db, warehouse_uuid, taken_at)
+    if previous and previous.taken_at == taken_at:
+        return False
+
+    # Nothing moved since the previous snapshot, which therefore still holds
+    changes = movements_between(warehouse_uuid, previous.taken_at if previous else None, taken_at)
+    if not await db.scalar(select(changes.exists())):
+        return False
+
+    snapshot_id = uuid4()
+    db.add(InventorySnapshot(id=snapshot_id, warehouse_id=warehouse_uuid, taken_at=taken_at))
+    await db.flush()
+
+    balances = balances_query(warehouse_uuid, previous, taken_at).subquery()
+    await db.execute(insert(InventorySnapshotItem.__table__).from_select(
+        ["snapshot_id", "product_id", "stock_quantity"],
+        select(literal(snapshot_id, InventorySnapshot.id.type), balances.c.product_id, balances.c.stock_quantity)
+    ))
+    return True
+
+async def take_snapshots(taken_at: datetime) -> int:
+    taken = 0
+    session = getAsyncSession()
+    try:
+        warehouse_uuids = (await session.scalars(select(Warehouse.id))).all()
+        for warehouse_uuid in warehouse_uuids:
+            try:
+                if await take_snapshot(session, warehouse_uuid, taken_at):
+                    taken += 1
+                await session.commit()
+            except IntegrityError:
+                # Another worker took this snapshot first
+                await session.rollback()
+    finally:
+        await session.close()
+
+    return taken
+
+def snapshot_boundary(now: datetime) -> datetime:
+    # Snapshot times are aligned to the interval, so every worker process
+    # agrees on them and the unique index turns duplicates into no-ops.
+    interval = timedelta(seconds=SNAPSHOT_INTERVAL_SECONDS)
+    epoch = datetime(1970, 1, 1)
+    cutoff = now - timedelta(seconds=SNAPSHOT_LAG_SECONDS)
+    return epoch + (cutoff - epoch) // interval * interval
+
+async def run_snapshot_scheduler() -> None:
+    while True:
+        taken_at = snapshot_boundary(datetime.utcnow())
+        try:
+            await take_snapshots(taken_at)
+        except Exception:
+            logger.exception("Taking inventory snapshots failed")
+
+        next_run = taken_at + timedelta(seconds=SNAPSHOT_INTERVAL_SECONDS + SNAPSHOT_LAG_SECONDS)
+        await asyncio.sleep(max((next_run - datetime.utcnow()).total_seconds(), 1))
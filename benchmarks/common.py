@@ -0,0 +1,58 @@
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import FastAPI
+
+from api.app import create_app
+from api.rate_limiter import limiter
+
+def use_temp_database(name: str = "bench") -> str:
+    # Benchmarks seed and write freely, so they run against a throwaway
+    # SQLite file removed at exit, never the database configured for the
+    # API. Call before db.initConnection(), which reads DATABASE_URL.
+    directory = tempfile.mkdtemp(prefix="inventory-bench-")
+    atexit.register(shutil.rmtree, directory, True)
+    database_url = f"sqlite:///{os.path.join(directory, f'{name}.sqlite')}"
+    os.environ["DATABASE_URL"] = database_url
+    return database_url
+
+def build_app() -> FastAPI:
+    # The ASGI transport does not run the lifespan, so callers initialize
+    # the database connection themselves.
+    app = create_app()
+
+    # Benchmarks measure the handlers, not the rate limiter
+    limiter.enabled = False
+    return app
+
+def build_client(app: FastAPI) -> httpx.AsyncClient:
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    return httpx.AsyncClient(transport=transport, base_url="http://bench")
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+async def create_warehouse(client: httpx.AsyncClient, name: str = "Benchmark") -> str:
+    response = await client.post("/api/warehouses/", json={"name": name, "location": "Bench"})
+    return response.json()["id"]
+
+async def create_products(client: httpx.AsyncClient, warehouse_id: str, products: int, stock_quantity: int = 1000):
+    product_ids = []
+    for i in range(products):
+        response = await client.post(f"/api/warehouses/{warehouse_id}/products/", json={
+            "name": f"Bench product {i}",
+            "sku": f"BENCH-{time.time_ns()}-{i}",
+            "price": 1.0,
+            "stock_quantity": stock_quantity
+        })
+        product_ids.append(response.json()["id"])
+
+    return product_ids
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import time
+
+from common import build_app, build_client, use_temp_database
+from load_test import seed
+import db.session as db
+from api.compression import BROTLI_QUALITY, GZIP_LEVEL, brotli
+from api.serialization import COLUMNAR_MEDIA_TYPE, JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, msgpack
+
+PAGE_SIZE = 1000
+
+async def fetch(client, url: str, params: dict, accept: str, encoding: str):
+    # Raw bytes as sent, without the client decompressing them
+    async with client.stream("GET", url, params=params, headers={"accept": accept, "accept-encoding": encoding}) as response:
+        body = b"".join([chunk async for chunk in response.aiter_raw()])
+        assert response.status_code == 200, body
+        return len(body), response.headers.get("content-encoding", "identity"), response.headers.get("x-next-cursor")
+
+async def walk_pages(client, url: str, accept: str, encoding: str):
+    sizes, cursor = [], None
+    while True:
+        params = {"limit": PAGE_SIZE, **({"cursor": cursor} if cursor else {})}
+        size, applied, cursor = await fetch(client, url, params, accept, encoding)
+        sizes.append(size)
+        if not cursor:
+            return sizes, applied
+
+async def run(products: int, repeat: int):
+    use_temp_database("compression")
+    db.initConnection()
+    dataset = seed(2, products, 2, 42)
+    warehouse_id = dataset.warehouse_ids[0]
+
+    formats = [("json", JSON_MEDIA_TYPE), ("columnar", COLUMNAR_MEDIA_TYPE)]
+    if msgpack:
+        formats.append(("msgpack", MSGPACK_MEDIA_TYPE))
+    encodings = ["identity", "gzip"] + (["br"] if brotli else [])
+    print(f"{products} products, pages of {PAGE_SIZE}; gzip level {GZIP_LEVEL}, brotli quality {BROTLI_QUALITY}")
+
+    async with build_client(build_app()) as client:
+        print(f"{'product pages':24} {'encoding':9} {'bytes/page':>11} {'ratio':>6} {'cpu ms/page':>12}")
+        for label, accept in formats:
+            identity = None
+            for encoding in encodings:
+                best = None
+                for _ in range(repeat):
+                    start = time.process_time()
+                    sizes, applied = await walk_pages(client, f"/api/warehouses/{warehouse_id}/products/", accept, encoding)
+                    cpu = (time.process_time() - start) / len(sizes)
+                    best = cpu if best is None else min(best, cpu)
+                size = sum(sizes) / len(sizes)
+                identity = identity or size
+                print(f"{label:24} {applied:9} {size:11.0f} {identity / size:6.1f} {best * 1000:12.2f}")
+
+        print(f"\n{'inventory export':24} {'encoding':9} {'bytes':>11} {'ratio':>6} {'cpu ms':>12}")
+        identity = None
+        for encoding in encodings:
+            best = None
+            for _ in range(repeat):
+                start = time.process_time()
+                size, applied, _ = await fetch(client, f"/api/warehouses/{warehouse_id}/inventory/export", {}, "*/*", encoding)
+                cpu = time.process_time() - start
+                best = cpu if best is None else min(best, cpu)
+            identity = identity or size
+            print(f"{'ndjson':24} {applied:9} {size:11.0f} {identity / size:6.1f} {best * 1000:12.2f}")
+
+    await db.getAsyncEngine().dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes on the wire and CPU per request for each response format and encoding")
+    parser.add_argument('--products', type=int, default=20000, help='Number of products to seed')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per combination; the lowest CPU time is reported')
+    args = parser.parse_args()
+
+    asyncio.run(run(args.products, args.repeat))
+
+if __name__ == "__main__":
+    main()
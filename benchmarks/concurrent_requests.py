@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import time
+
+from common import build_app, build_client, percentile, create_warehouse, create_products, use_temp_database
+import db.session as db
+
+async def run(concurrency: int, requests: int, products: int):
+    use_temp_database("concurrent_requests")
+    db.initConnection()
+
+    async with build_client(build_app()) as client:
+        warehouse_id = await create_warehouse(client)
+        product_ids = await create_products(client, warehouse_id, products)
+        read_latencies = []
+        write_latencies = []
+        errors = []
+        queue = asyncio.Queue()
+        for i in range(requests):
+            queue.put_nowait(i)
+
+        async def worker():
+            while not queue.empty():
+                i = queue.get_nowait()
+                start = time.perf_counter()
+                if i % 2:
+                    response = await client.get(f"/api/warehouses/{warehouse_id}/inventory/")
+                    read_latencies.append(time.perf_counter() - start)
+                else:
+                    product_id = product_ids[i % len(product_ids)]
+                    response = await client.post(f"/api/warehouses/{warehouse_id}/inventory/{product_id}/increase",
+                        json={"quantity": 1, "supplier_id": warehouse_id})
+                    write_latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors.append(response.status_code)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    await db.getAsyncEngine().dispose()
+
+    print(f"requests:    {requests} with concurrency {concurrency}")
+    print(f"throughput:  {requests / elapsed:.1f} req/s")
+    print(f"errors:      {len(errors)}")
+    print(f"read  p50/p99: {percentile(read_latencies, 50) * 1000:.1f} / {percentile(read_latencies, 99) * 1000:.1f} ms")
+    print(f"write p50/p99: {percentile(write_latencies, 50) * 1000:.1f} / {percentile(write_latencies, 99) * 1000:.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent inventory read/increase benchmark")
+    parser.add_argument('--concurrency', type=int, default=50, help='Number of concurrent clients')
+    parser.add_argument('--requests', type=int, default=2000, help='Total number of requests')
+    parser.add_argument('--products', type=int, default=50, help='Number of products to seed')
+    args = parser.parse_args()
+
+    asyncio.run(run(args.concurrency, args.requests, args.products))
+
+if __name__ == "__main__":
+    main()
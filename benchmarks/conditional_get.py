@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import time
+
+from common import build_app, build_client, percentile, create_warehouse, create_products, use_temp_database
+import db.session as db
+
+async def poll(client, url: str, polls: int, etag: str = None):
+    headers = {"If-None-Match": etag} if etag else {}
+    latencies = []
+    transferred = 0
+    for _ in range(polls):
+        start = time.perf_counter()
+        response = await client.get(url, headers=headers)
+        latencies.append(time.perf_counter() - start)
+        transferred += len(response.content)
+
+    return response.status_code, latencies, transferred
+
+async def run(products: int, polls: int):
+    use_temp_database("conditional_get")
+    db.initConnection()
+
+    async with build_client(build_app()) as client:
+        warehouse_id = await create_warehouse(client)
+        await create_products(client, warehouse_id, products)
+        url = f"/api/warehouses/{warehouse_id}/inventory/?limit=1000"
+        etag = (await client.get(url)).headers["ETag"]
+
+        # Dashboards that poll unchanged data: full responses vs revalidation
+        for label, header in (("full", None), ("if-none-match", etag)):
+            status, latencies, transferred = await poll(client, url, polls, header)
+            print(f"{label:14} status {status}  p50/p99: {percentile(latencies, 50) * 1000:.2f} / "
+                  f"{percentile(latencies, 99) * 1000:.2f} ms  {transferred / polls:.0f} bytes/poll")
+
+    await db.getAsyncEngine().dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Inventory polling with and without conditional GET")
+    parser.add_argument('--products', type=int, default=500, help='Number of products to seed')
+    parser.add_argument('--polls', type=int, default=500, help='Number of polls per mode')
+    args = parser.parse_args()
+
+    asyncio.run(run(args.products, args.polls))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import os
+import time
+
+# Lock waits make every statement look slow under this load
+os.environ.setdefault("SLOW_QUERY_THRESHOLD_MS", "0")
+
+from common import build_app, build_client, percentile, create_warehouse, create_products, use_temp_database
+import db.session as db
+from api.routes.stock_management import stock_increases
+from models import Stock, StockMovement
+from sqlalchemy import func, select
+
+async def measure(client, warehouse_id: str, product_ids, supplier_id: str, window_ms: float, concurrency: int, requests: int):
+    stock_increases.window_ms = window_ms
+    stock_increases.reset()
+    latencies = []
+    errors = 0
+    remaining = [requests]
+
+    async def scanner():
+        nonlocal errors
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            product_id = product_ids[remaining[0] % len(product_ids)]
+            start = time.perf_counter()
+            response = await client.post(f"/api/warehouses/{warehouse_id}/inventory/{product_id}/increase",
+                json={"quantity": 1, "supplier_id": supplier_id})
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(scanner() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    stats = stock_increases.snapshot()
+    label = f"{window_ms:g} ms window" if window_ms > 0 else "per request"
+    batches = f"{stats['batches']:5} batches, avg {stats['avg_batch_size']:5.1f}" if window_ms > 0 else f"{requests:5} commits"
+    print(f"{label:16} {requests / elapsed:8.1f} req/s  p50={percentile(latencies, 50) * 1000:6.1f}ms "
+          f"p99={percentile(latencies, 99) * 1000:6.1f}ms  {batches}  errors={errors}")
+    return requests - errors
+
+async def run(windows, concurrency: int, requests: int, products: int):
+    use_temp_database("group_commit")
+    db.initConnection()
+
+    async with build_client(build_app()) as client:
+        warehouse_id = await create_warehouse(client)
+        product_ids = await create_products(client, warehouse_id, products, stock_quantity=0)
+        supplier = await client.post("/api/suppliers/", json={"name": "Scanner", "contact_email": "scanner@bench.local"})
+        supplier_id = supplier.json()["id"]
+
+        # A few hot SKUs, as at scanner stations
+        print(f"{concurrency} scanners, {requests} increases per run over {products} products")
+        succeeded = 0
+        for window_ms in windows:
+            succeeded += await measure(client, warehouse_id, product_ids, supplier_id, window_ms, concurrency, requests)
+
+    # Merged updates must still add up to one movement and one unit per
+    # successful request
+    with db.getConnection() as connection:
+        total = connection.execute(select(func.sum(Stock.stock_quantity))).scalar()
+        movements = connection.execute(select(func.count()).where(StockMovement.movement_type == "increase")).scalar()
+    print(f"stock total {total}, increase movements {movements}, successful increases {succeeded}: "
+          f"{'ok' if total == movements == succeeded else 'MISMATCH'}")
+
+    await db.getAsyncEngine().dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Stock increase throughput with and without group commit")
+    parser.add_argument('--windows', type=float, nargs='+', default=[0, 2, 5, 10], help='Group commit windows in ms; 0 commits every request')
+    parser.add_argument('--concurrency', type=int, default=64, help='Number of concurrent scanners')
+    parser.add_argument('--requests', type=int, default=3000, help='Increases per run')
+    parser.add_argument('--products', type=int, default=5, help='Number of hot products')
+    args = parser.parse_args()
+
+    asyncio.run(run(args.windows, args.concurrency, args.requests, args.products))
+
+if __name__ == "__main__":
+    main()
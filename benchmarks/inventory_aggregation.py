@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from common import build_app, build_client, percentile, use_temp_database
+import db.session as db
+from models import Product, Stock, Warehouse
+
+SEED_BATCH_SIZE = 50000
+CATEGORIES = 20
+
+def seed(warehouses: int, products: int):
+    # Written straight to the tables; one stock row per product per warehouse
+    start = datetime.utcnow() - timedelta(days=1)
+    warehouse_ids = [uuid4() for _ in range(warehouses)]
+    product_ids = [uuid4() for _ in range(products)]
+    quantities = [[random.randint(0, 100) for _ in warehouse_ids] for _ in product_ids]
+
+    with db.getConnection() as connection:
+        connection.execute(Warehouse.__table__.insert(), [
+            {"id": warehouse_id, "name": f"Warehouse {i}", "location": "Bench", "created_at": start}
+            for i, warehouse_id in enumerate(warehouse_ids)
+        ])
+        connection.execute(Product.__table__.insert(), [
+            {"id": product_id, "name": f"Product {i}", "sku": f"CAT{i % CATEGORIES:02}-{i:07}", "price": 1,
+             "stock_quantity": sum(quantities[i]), "category": f"category-{i % CATEGORIES}", "created_at": start + timedelta(seconds=i)}
+            for i, product_id in enumerate(product_ids)
+        ])
+
+        batch = []
+        for i, product_id in enumerate(product_ids):
+            for warehouse_id, quantity in zip(warehouse_ids, quantities[i]):
+                batch.append({"id": uuid4(), "warehouse_id": warehouse_id, "product_id": product_id,
+                              "sku": f"CAT{i % CATEGORIES:02}-{i:07}", "stock_quantity": quantity, "created_at": start})
+                if len(batch) == SEED_BATCH_SIZE:
+                    connection.execute(Stock.__table__.insert(), batch)
+                    batch = []
+        if batch:
+            connection.execute(Stock.__table__.insert(), batch)
+        connection.commit()
+
+    return warehouse_ids
+
+async def time_route(client, label: str, url: str, params: dict, requests: int):
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = await client.get(url, params=params)
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.text
+
+    print(f"{label:32} {len(response.json()):5} rows  p50/p99: {percentile(latencies, 50) * 1000:7.1f} / {percentile(latencies, 99) * 1000:7.1f} ms")
+
+async def run(warehouses: int, products: int, requests: int):
+    use_temp_database("inventory_aggregation")
+    db.initConnection()
+
+    start = time.perf_counter()
+    warehouse_ids = seed(warehouses, products)
+    print(f"seeded {warehouses * products} stock rows in {time.perf_counter() - start:.1f} s")
+
+    async with build_client(build_app()) as client:
+        cases = [
+            ("totals", "/api/inventory/totals", {}),
+            ("totals, category", "/api/inventory/totals", {"category": "category-7"}),
+            ("totals, sku prefix", "/api/inventory/totals", {"sku_prefix": "CAT03-"}),
+            ("totals, below threshold", "/api/inventory/totals", {"below": warehouses * 45}),
+            ("low stock, all warehouses", "/api/inventory/low-stock", {"threshold": 5}),
+            ("low stock, one warehouse", "/api/inventory/low-stock", {"threshold": 5, "warehouse_id": str(warehouse_ids[0])}),
+            ("low stock, category", "/api/inventory/low-stock", {"threshold": 5, "category": "category-7"}),
+        ]
+        for label, url, params in cases:
+            await time_route(client, label, url, params, requests)
+
+        # Walking every page of the totals visits each stock row exactly once
+        start = time.perf_counter()
+        cursor = None
+        total_products = 0
+        while True:
+            response = await client.get("/api/inventory/totals", params={"limit": 1000, **({"cursor": cursor} if cursor else {})})
+            total_products += len(response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        print(f"all {total_products} product totals paged in {time.perf_counter() - start:.2f} s")
+
+    await db.getAsyncEngine().dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-warehouse aggregation endpoints over a large stock table")
+    parser.add_argument('--warehouses', type=int, default=100, help='Number of warehouses to seed')
+    parser.add_argument('--products', type=int, default=10000, help='Number of products to seed, stocked in every warehouse')
+    parser.add_argument('--requests', type=int, default=20, help='Requests per case')
+    args = parser.parse_args()
+
+    asyncio.run(run(args.warehouses, args.products, args.requests))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from common import build_app, build_client, percentile, use_temp_database
+import db.session as db
+from api.snapshots import take_snapshots
+from models import Product, Stock, StockMovement, Warehouse
+
+SEED_BATCH_SIZE = 50000
+
+def seed(products: int, movements: int, days: int):
+    # Written straight to the tables; going through the API would take hours
+    start = datetime.utcnow() - timedelta(days=days)
+    warehouse_id = uuid4()
+    product_ids = [uuid4() for _ in range(products)]
+    quantities = dict.fromkeys(product_ids, 0)
+    step = timedelta(days=days) / movements
+
+    with db.getConnection() as connection:
+        connection.execute(Warehouse.__table__.insert(), [{"id": warehouse_id, "name": "As of", "location": "Bench", "created_at": start}])
+        connection.execute(Product.__table__.insert(), [
+            {"id": product_id, "name": f"Product {i}", "sku": f"ASOF-{product_id.hex}", "price": 1, "stock_quantity": 0, "created_at": start}
+            for i, product_id in enumerate(product_ids)
+        ])
+
+        batch = []
+        for i in range(movements):
+            product_id = random.choice(product_ids)
+            quantity = random.randint(1, 20) if quantities[product_id] < 20 or random.random() < 0.5 else -random.randint(1, 20)
+            quantities[product_id] += quantity
+            batch.append({
+                "id": uuid4(), "warehouse_id": warehouse_id, "product_id": product_id,
+                "movement_type": "increase" if quantity > 0 else "decrease", "quantity": quantity,
+                "created_at": start + step * i
+            })
+            if len(batch) == SEED_BATCH_SIZE:
+                connection.execute(StockMovement.__table__.insert(), batch)
+                batch = []
+        if batch:
+            connection.execute(StockMovement.__table__.insert(), batch)
+
+        connection.execute(Stock.__table__.insert(), [
+            {"id": uuid4(), "warehouse_id": warehouse_id, "product_id": product_id, "sku": f"ASOF-{product_id.hex}", "stock_quantity": quantity, "created_at": start}
+            for product_id, quantity in quantities.items()
+        ])
+        connection.commit()
+
+    return warehouse_id, start
+
+async def time_queries(client, warehouse_id, start: datetime, days: int, queries: int, products: int):
+    latencies = []
+    for _ in range(queries):
+        as_of = start + timedelta(seconds=random.uniform(0, days * 86400))
+        begin = time.perf_counter()
+        response = await client.get(f"/api/warehouses/{warehouse_id}/inventory/", params={"as_of": as_of.isoformat(), "limit": min(products, 1000)})
+        latencies.append(time.perf_counter() - begin)
+        assert response.status_code == 200, response.text
+
+    return latencies
+
+async def run(products: int, movements: int, days: int, queries: int):
+    use_temp_database("inventory_as_of")
+    db.initConnection()
+
+    begin = time.perf_counter()
+    warehouse_id, start = seed(products, movements, days)
+    print(f"seeded {movements} movements over {days} days in {time.perf_counter() - begin:.1f} s")
+
+    async with build_client(build_app()) as client:
+        replay = await time_queries(client, warehouse_id, start, days, queries, products)
+        print(f"full replay      p50/p99: {percentile(replay, 50) * 1000:.1f} / {percentile(replay, 99) * 1000:.1f} ms")
+
+        # Daily snapshots, each built from the previous one plus a day of movements
+        begin = time.perf_counter()
+        for day in range(1, days + 1):
+            await take_snapshots(start + timedelta(days=day))
+        print(f"{days} snapshots built in {time.perf_counter() - begin:.1f} s")
+
+        snapshot = await time_queries(client, warehouse_id, start, days, queries, products)
+        print(f"snapshot + delta p50/p99: {percentile(snapshot, 50) * 1000:.1f} / {percentile(snapshot, 99) * 1000:.1f} ms")
+
+    await db.getAsyncEngine().dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Point-in-time inventory queries with and without snapshots")
+    parser.add_argument('--products', type=int, default=1000, help='Number of products in the warehouse')
+    parser.add_argument('--movements', type=int, default=2000000, help='Number of stock movements to seed')
+    parser.add_argument('--days', type=int, default=30, help='Days of history the movements span')
+    parser.add_argument('--queries', type=int, default=50, help='Number of as_of queries per mode')
+    args = parser.parse_args()
+
+    asyncio.run(run(args.products, args.movements, args.days, args.queries))
+
+if __name__ == "__main__":
+    main()
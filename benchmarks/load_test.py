@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import sqlite3
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from uuid import UUID
+
+# Under load every statement waits its turn; the slow query log would
+# drown the report, the per-route db time is kept from Server-Timing
+os.environ.setdefault("SLOW_QUERY_THRESHOLD_MS", "0")
+
+from common import build_app, build_client, percentile, use_temp_database
+from worker_scaling import start_server, wait_until_ready
+import httpx
+
+import db.session as db
+from api.cache import warehouse_cache
+from api.search import search_rowid
+from models import Product, Stock, Supplier, Warehouse, product_search
+
+SEED_BATCH_SIZE = 50000
+CATEGORIES = 20
+NOUNS = ["hammer", "drill", "wrench", "screwdriver", "saw", "clamp", "ladder", "toolbox", "chisel", "pliers"]
+
+SERVER_TIMING_DB = re.compile(r'db;dur=([0-9.]+);desc="([0-9]+) queries"')
+
+# Route templates and their share of each mix. Every mix also reads, so a
+# write-heavy change still shows up in the read latencies next to it.
+MIXES = {
+    "read": {
+        "GET /api/warehouses/{warehouse_id}/products/": 25,
+        "GET /api/warehouses/{warehouse_id}/products/{product_id}": 20,
+        "GET /api/warehouses/{warehouse_id}/inventory/": 20,
+        "GET /api/warehouses/{warehouse_id}/inventory/{product_id}": 15,
+        "GET /api/products/search": 10,
+        "GET /api/inventory/totals": 10,
+    },
+    "write": {
+        "POST /api/warehouses/{warehouse_id}/inventory/{product_id}/increase": 30,
+        "POST /api/warehouses/{warehouse_id}/inventory/{product_id}/decrease": 20,
+        "POST /api/warehouses/{warehouse_id}/products/": 15,
+        "PATCH /api/warehouses/{warehouse_id}/products/{product_id}": 15,
+        "GET /api/warehouses/{warehouse_id}/inventory/": 10,
+        "GET /api/warehouses/{warehouse_id}/products/{product_id}": 10,
+    },
+    "transfer": {
+        "POST /api/warehouses/{warehouse_id}/inventory/{product_id}/transfer": 70,
+        "GET /api/warehouses/{warehouse_id}/inventory/{product_id}": 15,
+        "GET /api/warehouses/{warehouse_id}/inventory/": 15,
+    },
+}
+
+def seeded_uuid(rng: random.Random) -> UUID:
+    return UUID(int=rng.getrandbits(128), version=4)
+
+class Dataset:
+    def __init__(self, warehouse_ids, supplier_id, product_ids, stocked):
+        self.warehouse_ids = warehouse_ids
+        self.supplier_id = supplier_id
+        self.product_ids = product_ids
+        # product id -> warehouses holding it
+        self.stocked = stocked
+
+def seed(warehouses: int, products: int, stocks_per_product: int, seed_value: int) -> Dataset:
+    # Written straight to the tables; the same seed gives the same rows
+    rng = random.Random(seed_value)
+    start = datetime(2024, 1, 1)
+    warehouse_ids = [seeded_uuid(rng) for _ in range(warehouses)]
+    supplier_id = seeded_uuid(rng)
+    product_ids = [seeded_uuid(rng) for _ in range(products)]
+    stocked = {}
+
+    with db.getConnection() as connection:
+        connection.execute(Warehouse.__table__.insert(), [
+            {"id": warehouse_id, "name": f"Warehouse {i}", "location": "Load test", "created_at": start}
+            for i, warehouse_id in enumerate(warehouse_ids)
+        ])
+        connection.execute(Supplier.__table__.insert(), [
+            {"id": supplier_id, "name": "Load test supplier", "contact_email": "load@test.local", "created_at": start}
+        ])
+
+        for offset in range(0, products, SEED_BATCH_SIZE):
+            product_rows, stock_rows = [], []
+            for i in range(offset, min(offset + SEED_BATCH_SIZE, products)):
+                product_id = product_ids[i]
+                sku = f"LOAD-{i:07}"
+                holders = rng.sample(warehouse_ids, min(stocks_per_product, warehouses))
+                quantities = [rng.randint(1000, 5000) for _ in holders]
+                stocked[product_id] = holders
+                product_rows.append({"id": product_id, "name": f"{rng.choice(NOUNS)} {i}", "sku": sku, "price": rng.randint(1, 500),
+                                     "description": f"{rng.choice(NOUNS)} for load tests", "category": f"category-{i % CATEGORIES}",
+                                     "stock_quantity": sum(quantities), "created_at": start + timedelta(seconds=i)})
+                stock_rows.extend(
+                    {"id": seeded_uuid(rng), "warehouse_id": warehouse_id, "product_id": product_id, "sku": sku,
+                     "stock_quantity": quantity, "created_at": start}
+                    for warehouse_id, quantity in zip(holders, quantities)
+                )
+
+            connection.execute(Product.__table__.insert(), product_rows)
+            connection.execute(Stock.__table__.insert(), stock_rows)
+            connection.execute(product_search.insert(), [
+                {"rowid": search_rowid(row["id"]), "product_id": row["id"], "name": row["name"], "description": row["description"]}
+                for row in product_rows
+            ])
+        connection.commit()
+
+    return Dataset(warehouse_ids, supplier_id, product_ids, stocked)
+
+def plan_requests(mix: str, dataset: Dataset, requests: int, rng: random.Random):
+    # The whole request sequence is drawn up front, so every run of a mix
+    # sends the same requests in the same order
+    routes = list(MIXES[mix])
+    weights = list(MIXES[mix].values())
+    planned = []
+
+    for route in rng.choices(routes, weights=weights, k=requests):
+        product_id = rng.choice(dataset.product_ids)
+        warehouse_id = rng.choice(dataset.stocked[product_id])
+        product_path = f"/api/warehouses/{warehouse_id}/products"
+        inventory_path = f"/api/warehouses/{warehouse_id}/inventory"
+        method = route.split(" ", 1)[0]
+        body, params = None, None
+
+        if route == "GET /api/warehouses/{warehouse_id}/products/":
+            url, params = f"{product_path}/", rng.choice([
+                {"limit": 50}, {"category": f"category-{rng.randrange(CATEGORIES)}", "limit": 50}, {"sort": "-price", "limit": 50}
+            ])
+        elif route == "GET /api/warehouses/{warehouse_id}/products/{product_id}":
+            url = f"{product_path}/{product_id}"
+        elif route == "GET /api/warehouses/{warehouse_id}/inventory/":
+            url, params = f"{inventory_path}/", {"limit": 50}
+        elif route == "GET /api/warehouses/{warehouse_id}/inventory/{product_id}":
+            url = f"{inventory_path}/{product_id}"
+        elif route == "GET /api/products/search":
+            url, params = "/api/products/search", {"q": rng.choice(NOUNS), "limit": 20}
+        elif route == "GET /api/inventory/totals":
+            url, params = "/api/inventory/totals", {"category": f"category-{rng.randrange(CATEGORIES)}", "limit": 50}
+        elif route.endswith("/increase"):
+            url, body = f"{inventory_path}/{product_id}/increase", {"quantity": rng.randint(1, 10), "supplier_id": str(dataset.supplier_id)}
+        elif route.endswith("/decrease"):
+            url, body = f"{inventory_path}/{product_id}/decrease", {"quantity": 1, "reason": "Load test"}
+        elif route.endswith("/transfer"):
+            target_id = rng.choice([other for other in dataset.warehouse_ids if other != warehouse_id])
+            url, body = f"{inventory_path}/{product_id}/transfer", {"quantity": 1, "target_warehouse_id": str(target_id), "reason": "Load test"}
+        elif route == "POST /api/warehouses/{warehouse_id}/products/":
+            sku = f"LOAD-{seeded_uuid(rng).hex[:12].upper()}"
+            url, body = f"{product_path}/", {"name": f"Load product {sku}", "sku": sku, "price": 9.99,
+                                              "category": "load", "stock_quantity": 100}
+        else:
+            url, body = f"{product_path}/{product_id}", {"price": rng.randint(1, 500)}
+
+        planned.append((route, method, url, params, body))
+
+    return planned
+
+async def drive(client: httpx.AsyncClient, planned, concurrency: int):
+    samples = defaultdict(list)
+    statuses = defaultdict(lambda: defaultdict(int))
+    server_timings = defaultdict(list)
+    position = iter(planned)
+
+    async def worker():
+        for route, method, url, params, body in position:
+            start = time.perf_counter()
+            response = await client.request(method, url, params=params, json=body)
+            samples[route].append(time.perf_counter() - start)
+            statuses[route][response.status_code] += 1
+            timing = SERVER_TIMING_DB.search(response.headers.get("server-timing", ""))
+            if timing:
+                server_timings[route].append((float(timing.group(1)), int(timing.group(2))))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    routes = {}
+    for route, latencies in sorted(samples.items()):
+        timings = server_timings[route]
+        routes[route] = {
+            "requests": len(latencies),
+            "errors": sum(count for status, count in statuses[route].items() if status >= 400),
+            "statuses": {str(status): count for status, count in sorted(statuses[route].items())},
+            "throughput_rps": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "db_ms_mean": round(sum(dur for dur, _ in timings) / len(timings), 2) if timings else None,
+            "queries_mean": round(sum(queries for _, queries in timings) / len(timings), 2) if timings else None,
+        }
+
+    latencies = [latency for route_latencies in samples.values() for latency in route_latencies]
+    return {
+        "requests": len(latencies),
+        "errors": sum(route["errors"] for route in routes.values()),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "routes": routes,
+    }
+
+async def run_mix(args, mix: str) -> dict:
+    # Each mix starts from its own freshly seeded database
+    database_url = use_temp_database(f"load_{mix}")
+    db.initConnection()
+    warehouse_cache.clear()
+
+    start = time.perf_counter()
+    dataset = seed(args.warehouses, args.products, args.stocks_per_product, args.seed)
+    print(f"{mix}: seeded {args.warehouses} warehouses, {args.products} products in {time.perf_counter() - start:.1f} s", file=sys.stderr)
+
+    rng = random.Random(f"{args.seed}-{mix}")
+    warmup = plan_requests(mix, dataset, args.warmup, rng)
+    planned = plan_requests(mix, dataset, args.requests, rng)
+
+    if args.target == "asgi":
+        async with build_client(build_app()) as client:
+            await drive(client, warmup, args.concurrency)
+            result = await drive(client, planned, args.concurrency)
+        await db.getAsyncEngine().dispose()
+        return result
+
+    await db.getAsyncEngine().dispose()
+    db.engine.dispose()
+    server = start_server(args.workers, args.port, database_url)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=60) as client:
+            await wait_until_ready(client)
+            await drive(client, warmup, args.concurrency)
+            return await drive(client, planned, args.concurrency)
+    finally:
+        server.terminate()
+        server.wait()
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Seeded load test of the API, reporting throughput and p50/p95/p99 per route as JSON")
+    parser.add_argument('--mixes', nargs='+', choices=list(MIXES), default=list(MIXES), help='Request mixes to run')
+    parser.add_argument('--target', choices=["asgi", "server"], default="asgi",
+                        help='asgi drives the app in this process; server starts main.py and drives it over HTTP')
+    parser.add_argument('--warehouses', type=int, default=10, help='Warehouses to seed')
+    parser.add_argument('--products', type=int, default=10000, help='Products to seed')
+    parser.add_argument('--stocks-per-product', type=int, default=3, help='Warehouses holding each product')
+    parser.add_argument('--requests', type=int, default=2000, help='Measured requests per mix')
+    parser.add_argument('--warmup', type=int, default=200, help='Unmeasured requests sent before each mix')
+    parser.add_argument('--concurrency', type=int, default=32, help='Number of concurrent clients')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for the data and the request sequence')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes with --target server')
+    parser.add_argument('--port', type=int, default=8766, help='Port for the server under test')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    args = parser.parse_args()
+
+    if args.warehouses < 2:
+        parser.error("--warehouses must be at least 2 for transfers")
+
+    report = {
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "environment": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "mixes": {mix: asyncio.run(run_mix(args, mix)) for mix in args.mixes},
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import json
+import time
+
+from common import build_app, build_client, create_warehouse, use_temp_database
+import db.session as db
+
+async def run(products: int, single: int):
+    use_temp_database("product_import")
+    db.initConnection()
+
+    async with build_client(build_app()) as client:
+        warehouse_id = await create_warehouse(client)
+
+        start = time.perf_counter()
+        for i in range(single):
+            response = await client.post(f"/api/warehouses/{warehouse_id}/products/", json={
+                "name": f"Single product {i}", "sku": f"SINGLE-{i}", "price": 1.0, "stock_quantity": 10
+            })
+            assert response.status_code == 200, response.text
+        elapsed = time.perf_counter() - start
+        print(f"POST per product: {single} products in {elapsed:.2f} s, {single / elapsed:8.0f} products/s")
+
+        body = "\n".join(
+            json.dumps({"name": f"Imported product {i}", "sku": f"IMPORT-{i}", "price": 1.0, "stock_quantity": 10})
+            for i in range(products)
+        )
+        start = time.perf_counter()
+        response = await client.post(f"/api/warehouses/{warehouse_id}/products/import", content=body.encode())
+        elapsed = time.perf_counter() - start
+        assert response.status_code == 200 and response.json()["imported"] == products, response.text
+        print(f"bulk import:      {products} products in {elapsed:.2f} s, {products / elapsed:8.0f} products/s")
+
+    await db.getAsyncEngine().dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk product import against one POST per product")
+    parser.add_argument('--products', type=int, default=20000, help='Products in the bulk import')
+    parser.add_argument('--single', type=int, default=500, help='Products created one request at a time')
+    args = parser.parse_args()
+
+    asyncio.run(run(args.products, args.single))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from common import build_app, build_client, percentile, use_temp_database
+from sqlalchemy import or_, select
+import db.session as db
+from api.search import search_rowid
+from models import Product, product_search
+
+SEED_BATCH_SIZE = 20000
+
+ADJECTIVES = ["heavy", "compact", "cordless", "industrial", "precision", "folding", "magnetic", "insulated", "adjustable", "stainless"]
+NOUNS = ["hammer", "drill", "wrench", "screwdriver", "saw", "clamp", "ladder", "toolbox", "chisel", "pliers", "sander", "level"]
+WORDS = ["steel", "grip", "handle", "blade", "battery", "case", "set", "pro", "kit", "rubber", "carbon", "torque", "motor", "spare"]
+
+# Searched terms: a common word, a common prefix, a rare word and two terms
+QUERIES = ["hammer", "scr", "xylophone", "cordless dri"]
+
+def seed(products: int):
+    rng = random.Random(42)
+    start = datetime.utcnow() - timedelta(days=1)
+
+    with db.getConnection() as connection:
+        for offset in range(0, products, SEED_BATCH_SIZE):
+            rows = []
+            for i in range(offset, min(offset + SEED_BATCH_SIZE, products)):
+                name = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {i}"
+                # A handful of products carry the rare word
+                description = " ".join(rng.choices(WORDS, k=8) + (["xylophone"] if i % 50000 == 0 else []))
+                rows.append({"id": uuid4(), "name": name, "sku": f"SEARCH-{i:07}", "price": 1, "stock_quantity": 0,
+                             "description": description, "created_at": start + timedelta(milliseconds=i)})
+
+            connection.execute(Product.__table__.insert(), rows)
+            connection.execute(product_search.insert(), [
+                {"rowid": search_rowid(row["id"]), "product_id": row["id"], "name": row["name"], "description": row["description"]}
+                for row in rows
+            ])
+        connection.commit()
+
+async def time_search(client, q: str, requests: int) -> int:
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = await client.get("/api/products/search", params={"q": q})
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.text
+
+    print(f"  fts5  {q!r:16} {len(response.json()):4} rows  p50/p99: {percentile(latencies, 50) * 1000:8.1f} / {percentile(latencies, 99) * 1000:8.1f} ms")
+
+async def time_like(q: str, requests: int):
+    # The substring scan the endpoint replaces, unranked and stopping at
+    # the first page of matches, which is as cheap as LIKE gets
+    conditions = []
+    for term in q.split():
+        conditions.append(or_(Product.name.like(f"%{term}%"), Product.description.like(f"%{term}%")))
+    statement = select(Product.id, Product.name).where(*conditions).limit(100)
+
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        async with db.getAsyncSession() as session:
+            rows = (await session.execute(statement)).all()
+        latencies.append(time.perf_counter() - start)
+
+    print(f"  like  {q!r:16} {len(rows):4} rows  p50/p99: {percentile(latencies, 50) * 1000:8.1f} / {percentile(latencies, 99) * 1000:8.1f} ms")
+
+async def run(products: int, requests: int):
+    use_temp_database("product_search")
+    db.initConnection()
+
+    start = time.perf_counter()
+    seed(products)
+    print(f"seeded {products} products in {time.perf_counter() - start:.1f} s")
+
+    async with build_client(build_app()) as client:
+        for q in QUERIES:
+            await time_search(client, q, requests)
+            await time_like(q, requests)
+
+    await db.getAsyncEngine().dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text product search against LIKE '%q%'")
+    parser.add_argument('--products', type=int, default=500000, help='Number of products to seed')
+    parser.add_argument('--requests', type=int, default=20, help='Requests per query')
+    args = parser.parse_args()
+
+    asyncio.run(run(args.products, args.requests))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import common  # noqa: F401 - puts the project root on sys.path
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+
+from api.rate_limit_storage import TokenBucketRateLimiter  # also registers the sqlite:/// storage scheme
+
+def measure_overhead(strategy, storage_uri: str, hits: int, clients: int):
+    limiter = strategy(storage_from_string(storage_uri))
+    item = parse("150/minute")
+
+    start = time.perf_counter()
+    for i in range(hits):
+        limiter.hit(item, f"client-{i % clients}")
+    elapsed = time.perf_counter() - start
+
+    label = f"{storage_uri.split(':')[0]} {'token bucket' if strategy is TokenBucketRateLimiter else 'fixed window'}"
+    print(f"{label:21} {elapsed / hits * 1_000_000:8.1f} us/hit over {clients} clients")
+
+def hit_shared_key(storage_uri: str, hits: int, results):
+    limiter = TokenBucketRateLimiter(storage_from_string(storage_uri))
+    item = parse("100/hour")
+    results.put(sum(limiter.hit(item, "shared-client") for _ in range(hits)))
+
+def check_global_limit(storage_uri: str, processes: int):
+    # Every process hits the same key; across all of them exactly the
+    # configured budget must be allowed, not the budget once per process.
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=hit_shared_key, args=(storage_uri, 100, results))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    allowed = sum(results.get() for _ in workers)
+    print(f"{processes} processes, 100/hour limit: {allowed} hits allowed")
+    return allowed == 100
+
+def main():
+    parser = argparse.ArgumentParser(description="Rate limiter overhead per request and cross-process accuracy")
+    parser.add_argument('--hits', type=int, default=20000, help='Number of hits to time per storage')
+    parser.add_argument('--clients', type=int, default=1000, help='Number of distinct client keys')
+    parser.add_argument('--processes', type=int, default=4, help='Number of processes sharing the limit')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    measure_overhead(FixedWindowRateLimiter, "memory://", args.hits, args.clients)
+    measure_overhead(FixedWindowRateLimiter, f"sqlite:///{os.path.join(directory, 'fixed.sqlite')}", args.hits, args.clients)
+    measure_overhead(TokenBucketRateLimiter, f"sqlite:///{os.path.join(directory, 'bucket.sqlite')}", args.hits, args.clients)
+
+    if not check_global_limit(f"sqlite:///{os.path.join(directory, 'shared.sqlite')}", args.processes):
+        print("FAILED: limit is not global across processes")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
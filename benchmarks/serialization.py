@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from typing import List
+from uuid import uuid4
+
+import common  # noqa: F401 - puts the project root on sys.path
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+
+import api.serialization as serialization
+from api.pagination import select_fields
+from api.routes.product_management import PRODUCT_FIELDS, ProductResponse
+from db.session import base
+from models import Product
+
+def seed(engine, products: int):
+    start = datetime.utcnow() - timedelta(days=1)
+    with engine.begin() as connection:
+        connection.execute(Product.__table__.insert(), [
+            {"id": uuid4(), "name": f"Product {i}", "sku": f"SER-{i:07}", "description": "Serialized by the benchmark",
+             "price": "19.99", "category": f"category-{i % 20}", "stock_quantity": i % 1000, "created_at": start + timedelta(milliseconds=i)}
+            for i in range(products)
+        ])
+
+def per_row_models(rows, fields) -> bytes:
+    # The old list handlers: a response model per row with every value
+    # converted by hand, validated again through response_model
+    models = [ProductResponse(**{field: str(value) if field == "id" else value for field, value in zip(fields, row)}) for row in rows]
+    adapter = TypeAdapter(List[ProductResponse])
+    content = adapter.dump_python(adapter.validate_python([model.model_dump() for model in models]), mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def type_adapter(rows, fields) -> bytes:
+    # Validated once for the whole list, then encoded by pydantic-core
+    adapter = TypeAdapter(List[ProductResponse])
+    return adapter.dump_json(adapter.validate_python([
+        {field: str(value) if field == "id" else value for field, value in zip(fields, row)} for row in rows
+    ]))
+
+def rows_stdlib(rows, fields) -> bytes:
+    orjson, serialization.orjson = serialization.orjson, None
+    try:
+        return serialization.dump_json(serialization.Rows(rows, fields))
+    finally:
+        serialization.orjson = orjson
+
+def rows_orjson(rows, fields) -> bytes:
+    return serialization.dump_json(serialization.Rows(rows, fields))
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-row cost of encoding a product list response")
+    parser.add_argument('--products', type=int, default=100000, help='Rows in the response')
+    parser.add_argument('--repeat', type=int, default=5, help='Encodings per strategy; the fastest is reported')
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    base.metadata.create_all(engine)
+    seed(engine, args.products)
+
+    fields = list(PRODUCT_FIELDS)
+    with engine.connect() as connection:
+        rows = connection.execute(select_fields(PRODUCT_FIELDS)).all()
+
+    strategies = [
+        ("per-row models + response_model", per_row_models),
+        ("TypeAdapter, validated once", type_adapter),
+        ("column tuples, json", rows_stdlib),
+    ]
+    if serialization.orjson:
+        strategies.append(("column tuples, orjson", rows_orjson))
+    else:
+        print("orjson is not installed; skipping its fast path")
+
+    for label, strategy in strategies:
+        best = None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            body = strategy(rows, fields)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"{label:32} {best * 1000:8.1f} ms  {best / len(rows) * 1e6:6.2f} us/row  {len(body) / 1e6:6.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+import common  # noqa: F401 - puts the project root on sys.path
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from uuid import uuid4
+
+from db.session import SQLITE_PROFILES, base, createAsyncSqliteEngine, createSqliteEngine
+from models import Product, Stock, Warehouse
+
+def seed(path: str, profile: str, products: int):
+    engine = createSqliteEngine(path, profile)
+    base.metadata.create_all(engine)
+    warehouse_id = uuid4()
+    product_ids = [uuid4() for _ in range(products)]
+
+    with engine.begin() as connection:
+        connection.execute(Warehouse.__table__.insert(), [{"id": warehouse_id, "name": "Bench", "location": "Bench"}])
+        connection.execute(Product.__table__.insert(), [
+            {"id": product_id, "name": f"Product {i}", "sku": f"SKU-{i}", "price": 1, "stock_quantity": 0}
+            for i, product_id in enumerate(product_ids)
+        ])
+        connection.execute(Stock.__table__.insert(), [
+            {"warehouse_id": warehouse_id, "product_id": product_id, "sku": f"SKU-{i}", "stock_quantity": 1000}
+            for i, product_id in enumerate(product_ids)
+        ])
+
+    engine.dispose()
+    return warehouse_id, product_ids
+
+async def run_profile(profile: str, concurrency: int, operations: int, write_ratio: float, products: int):
+    path = os.path.join(tempfile.mkdtemp(), "bench.sqlite")
+    warehouse_id, product_ids = seed(path, profile, products)
+    engine = createAsyncSqliteEngine(path, profile)
+    sessions = async_sessionmaker(bind=engine, expire_on_commit=False)
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    remaining = [operations]
+
+    async def worker():
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            async with sessions() as session:
+                try:
+                    if random.random() < write_ratio:
+                        await session.execute(
+                            update(Stock)
+                            .where(Stock.warehouse_id == warehouse_id, Stock.product_id == random.choice(product_ids))
+                            .values(stock_quantity=Stock.stock_quantity + 1)
+                        )
+                        await session.commit()
+                        counts["writes"] += 1
+                    else:
+                        (await session.execute(select(Stock.sku, Stock.stock_quantity).where(Stock.warehouse_id == warehouse_id))).all()
+                        counts["reads"] += 1
+                except Exception:
+                    counts["errors"] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    await engine.dispose()
+
+    print(f"{profile:8} {operations / elapsed:9.1f} ops/s  reads={counts['reads']} writes={counts['writes']} errors={counts['errors']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare mixed read/write throughput of the SQLite engine profiles")
+    parser.add_argument('--concurrency', type=int, default=32, help='Number of concurrent sessions')
+    parser.add_argument('--operations', type=int, default=5000, help='Total number of operations per profile')
+    parser.add_argument('--write-ratio', type=float, default=0.3, help='Fraction of operations that are writes')
+    parser.add_argument('--products', type=int, default=200, help='Number of stock rows to seed')
+    args = parser.parse_args()
+
+    for profile in SQLITE_PROFILES:
+        asyncio.run(run_profile(profile, args.concurrency, args.operations, args.write_ratio, args.products))
+
+if __name__ == "__main__":
+    main()
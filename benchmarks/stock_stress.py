@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import sys
+from collections import Counter
+
+from common import build_app, build_client, create_warehouse, create_products, use_temp_database
+import db.session as db
+
+async def run(decrements: int, concurrency: int, initial: int):
+    use_temp_database("stock_stress")
+    db.initConnection()
+
+    async with build_client(build_app()) as client:
+        warehouse_id = await create_warehouse(client, "Stress")
+        product_id = (await create_products(client, warehouse_id, 1, initial))[0]
+        statuses = Counter()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def decrement():
+            async with semaphore:
+                response = await client.post(f"/api/warehouses/{warehouse_id}/inventory/{product_id}/decrease",
+                    json={"quantity": 1, "reason": "stress"})
+                statuses[response.status_code] += 1
+
+        await asyncio.gather(*(decrement() for _ in range(decrements)))
+        response = await client.get(f"/api/warehouses/{warehouse_id}/inventory/{product_id}")
+        final = response.json()["stock_quantity"]
+
+    await db.getAsyncEngine().dispose()
+
+    expected = max(initial - statuses[200], 0)
+    print(f"responses: {dict(statuses)}")
+    print(f"final stock: {final}, expected: {expected}")
+
+    # Every accepted decrement must be reflected and the stock must never go negative
+    if final != expected or final < 0 or statuses[200] > initial:
+        print("FAILED: lost or duplicated stock updates")
+        return False
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel stock decrement stress test")
+    parser.add_argument('--decrements', type=int, default=2000, help='Number of parallel decrements')
+    parser.add_argument('--concurrency', type=int, default=100, help='Maximum in-flight requests')
+    parser.add_argument('--initial', type=int, default=1500, help='Initial stock quantity')
+    args = parser.parse_args()
+
+    if not asyncio.run(run(args.decrements, args.concurrency, args.initial)):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import percentile, create_warehouse, create_products
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def start_server(workers: int, port: int, database_url: str) -> subprocess.Popen:
+    env = dict(os.environ,
+        API_WORKERS=str(workers),
+        API_PORT=str(port),
+        DATABASE_URL=database_url,
+        RATE_LIMIT_ENABLED="false"
+    )
+    return subprocess.Popen([sys.executable, "main.py"], cwd=ROOT, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            await client.get("/api/warehouses/?limit=1")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not start")
+
+async def measure(workers: int, port: int, concurrency: int, requests: int):
+    database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.sqlite')}"
+    server = start_server(workers, port, database_url)
+    limits = httpx.Limits(max_connections=concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            await wait_until_ready(client)
+            warehouse_id = await create_warehouse(client)
+            product_ids = await create_products(client, warehouse_id, 100)
+            latencies = []
+            errors = 0
+            remaining = [requests]
+
+            async def worker():
+                nonlocal errors
+                while remaining[0] > 0:
+                    remaining[0] -= 1
+                    product_id = product_ids[remaining[0] % len(product_ids)]
+                    start = time.perf_counter()
+                    if remaining[0] % 4:
+                        response = await client.get(f"/api/warehouses/{warehouse_id}/inventory/")
+                    else:
+                        response = await client.post(f"/api/warehouses/{warehouse_id}/inventory/{product_id}/increase",
+                            json={"quantity": 1, "supplier_id": warehouse_id})
+                    latencies.append(time.perf_counter() - start)
+                    if response.status_code != 200:
+                        errors += 1
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"workers={workers:<3} {requests / elapsed:8.1f} req/s  "
+          f"p50={percentile(latencies, 50) * 1000:.1f}ms p99={percentile(latencies, 99) * 1000:.1f}ms errors={errors}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API throughput as the number of worker processes grows")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='Worker counts to measure')
+    parser.add_argument('--concurrency', type=int, default=64, help='Number of concurrent clients')
+    parser.add_argument('--requests', type=int, default=4000, help='Requests per run')
+    parser.add_argument('--port', type=int, default=8765, help='Port for the server under test')
+    args = parser.parse_args()
+
+    for workers in args.workers:
+        asyncio.run(measure(workers, args.port, args.concurrency, args.requests))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from threading import Lock
+from typing import Optional
+
+import logging
+import os
+import time
+
+# Statements slower than this are logged with the request that ran them; 0 disables the log
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+
+# Longest statement text written to the slow query log
+SLOW_QUERY_MAX_LENGTH = 1000
+
+logger = logging.getLogger(__name__)
+
+# Connection pool statistics, so pools can be sized from observed load.
+# Counters come from pool events; checkout wait times are recorded by the
+# request session dependency around connection acquisition.
+class PoolMetrics:
+    def __init__(self):
+        self.lock = Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.invalidations = 0
+            self.timeouts = 0
+            self.peak_checked_out = 0
+            self.checked_out = 0
+            self.wait_count = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def attach(self, engine: Engine) -> None:
+        @event.listens_for(engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            with self.lock:
+                self.connects += 1
+
+        @event.listens_for(engine, "checkout")
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            with self.lock:
+                self.checkouts += 1
+                self.checked_out += 1
+                self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+        @event.listens_for(engine, "checkin")
+        def on_checkin(dbapi_connection, connection_record):
+            with self.lock:
+                self.checkins += 1
+                self.checked_out = max(self.checked_out - 1, 0)
+
+        @event.listens_for(engine, "invalidate")
+        def on_invalidate(dbapi_connection, connection_record, exception):
+            with self.lock:
+                self.invalidations += 1
+
+    def record_wait(self, seconds: float) -> None:
+        with self.lock:
+            self.wait_count += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def record_timeout(self) -> None:
+        with self.lock:
+            self.timeouts += 1
+
+    def snapshot(self, engine: Engine) -> dict:
+        pool = engine.pool
+        stats = {
+            "pool_class": type(pool).__name__,
+            "size": getattr(pool, "size", lambda: None)(),
+            "checked_in": getattr(pool, "checkedin", lambda: None)(),
+            "checked_out": getattr(pool, "checkedout", lambda: None)(),
+            "overflow": getattr(pool, "overflow", lambda: None)(),
+            "max_overflow": getattr(pool, "_max_overflow", None),
+        }
+
+        with self.lock:
+            stats.update({
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "peak_checked_out": self.peak_checked_out,
+                "wait_count": self.wait_count,
+                "wait_avg_ms": (self.wait_total / self.wait_count * 1000) if self.wait_count else 0.0,
+                "wait_max_ms": self.wait_max * 1000,
+            })
+
+        return stats
+
+# Statements run on behalf of one request. The request middleware sets a
+# fresh instance for every request; the async engine runs its hooks inside
+# the request's task, so they see it through the context variable.
+class RequestQueryStats:
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+
+current_query_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("current_query_stats", default=None)
+
+# Process-wide statement counters, plus the per-request ones above. An
+# executemany is one statement, as it is one round trip.
+class QueryMetrics:
+    def __init__(self):
+        self.lock = Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.queries = 0
+            self.db_time = 0.0
+            self.slow_queries = 0
+
+    def attach(self, engine: Engine) -> None:
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            context.query_start = time.perf_counter()
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - context.query_start
+            slow = SLOW_QUERY_THRESHOLD_MS > 0 and elapsed * 1000 >= SLOW_QUERY_THRESHOLD_MS
+
+            with self.lock:
+                self.queries += 1
+                self.db_time += elapsed
+                if slow:
+                    self.slow_queries += 1
+
+            stats = current_query_stats.get()
+            if stats:
+                stats.queries += 1
+                stats.db_time += elapsed
+
+            if slow:
+                logger.warning(
+                    "Slow query (%.1f ms) during %s: %s",
+                    elapsed * 1000,
+                    f"{stats.method} {stats.path}" if stats else "background work",
+                    " ".join(statement.split())[:SLOW_QUERY_MAX_LENGTH]
+                )
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "queries": self.queries,
+                "db_time": self.db_time,
+                "slow_queries": self.slow_queries,
+            }
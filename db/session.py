@@ -1,36 +1,162 @@
-from sqlalchemy import create_engine
-from sqlalchemy.engine import Connection
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Connection, Engine, URL, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from typing import AsyncGenerator, Dict
+from .metrics import PoolMetrics, QueryMetrics
 
 import os
+import time
 
-connection = None
+engine = None
 session = None
+async_engine = None
+async_session = None
 base = declarative_base()
+pool_metrics = PoolMetrics()
+query_metrics = QueryMetrics()
 
-def initConnection() -> None:
-    global connection, base, session
+DEFAULT_DATABASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "inventory.sqlite")
 
-    os.chdir(os.path.dirname(__file__))
-    engine = create_engine("sqlite:///inventory.sqlite",
-        pool_size=10,
-        max_overflow=20,
-        pool_timeout=30,
-        pool_recycle=120
-    )
+# Async drivers used for the API routes, keyed by backend
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+psycopg",
+}
 
-    connection = engine.connect()
-    session = sessionmaker(bind=engine)
+# "wal" is tuned for concurrent API traffic, "default" keeps SQLite's
+# rollback journal and no pragmas. Selected with the DB_PROFILE variable.
+SQLITE_PROFILES = ("wal", "default")
+
+def getDatabaseUrl() -> URL:
+    url = make_url(os.getenv("DATABASE_URL", f"sqlite:///{DEFAULT_DATABASE_PATH}"))
+
+    # psycopg 3 serves both the sync and the async engine
+    if url.drivername == "postgresql":
+        url = url.set(drivername="postgresql+psycopg")
+
+    return url
+
+def getAsyncDatabaseUrl(url: URL) -> URL:
+    backend = url.get_backend_name()
+
+    if backend not in ASYNC_DRIVERS:
+        raise Exception(f"Unsupported database backend '{backend}', expected one of {', '.join(ASYNC_DRIVERS)}")
+
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+def getSqliteProfile() -> str:
+    profile = os.getenv("DB_PROFILE", "wal")
+
+    if profile not in SQLITE_PROFILES:
+        raise Exception(f"Unknown DB_PROFILE '{profile}', expected one of {', '.join(SQLITE_PROFILES)}")
+
+    return profile
+
+def getSqlitePragmas(profile: str) -> Dict[str, str]:
+    if profile == "default":
+        return {}
+
+    return {
+        # Readers no longer block on the writer and vice versa
+        "journal_mode": "WAL",
+        # Durable across application crashes; only an OS crash can lose the last commits
+        "synchronous": "NORMAL",
+        "busy_timeout": os.getenv("DB_BUSY_TIMEOUT_MS", "5000"),
+        "mmap_size": os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)),
+        # Negative values are in KiB
+        "cache_size": str(-int(os.getenv("DB_CACHE_SIZE_KB", str(64 * 1024)))),
+        "foreign_keys": "ON",
+        "temp_store": "MEMORY",
+    }
+
+def getPoolOptions(url: URL, profile: str) -> dict:
+    if url.get_backend_name() == "sqlite":
+        if profile == "default":
+            return {"pool_size": 10, "max_overflow": 20, "pool_timeout": 30, "pool_recycle": 120}
+
+        # SQLite connections are cheap and never time out server side, so
+        # there is nothing to recycle or ping. SQLite allows a single writer
+        # at a time, so a large pool only adds threads waiting on the lock.
+        defaults = {"pool_size": 5, "max_overflow": 10, "pool_timeout": 30, "pool_recycle": -1, "pool_pre_ping": False}
+    else:
+        # Server connections can be dropped by the server or a proxy
+        defaults = {"pool_size": 10, "max_overflow": 20, "pool_timeout": 30, "pool_recycle": 1800, "pool_pre_ping": True}
+
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", defaults["pool_size"])),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", defaults["max_overflow"])),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", defaults["pool_timeout"])),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", defaults["pool_recycle"])),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", str(defaults["pool_pre_ping"])).lower() in ("1", "true", "yes"),
+    }
+
+def applySqlitePragmas(engine: Engine, profile: str) -> None:
+    pragmas = getSqlitePragmas(profile)
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+def createDatabaseEngine(url: URL, profile: str) -> Engine:
+    engine = create_engine(url, **getPoolOptions(url, profile))
+    if url.get_backend_name() == "sqlite":
+        applySqlitePragmas(engine, profile)
+    return engine
+
+def createAsyncDatabaseEngine(url: URL, profile: str) -> AsyncEngine:
+    url = getAsyncDatabaseUrl(url)
+    # aiosqlite defaults to NullPool; pool explicitly so the options apply
+    engine = create_async_engine(url, poolclass=AsyncAdaptedQueuePool, **getPoolOptions(url, profile))
+    if url.get_backend_name() == "sqlite":
+        applySqlitePragmas(engine.sync_engine, profile)
+    return engine
+
+def createSqliteEngine(path: str, profile: str) -> Engine:
+    return createDatabaseEngine(make_url(f"sqlite:///{path}"), profile)
+
+def createAsyncSqliteEngine(path: str, profile: str) -> AsyncEngine:
+    return createAsyncDatabaseEngine(make_url(f"sqlite:///{path}"), profile)
+
+def createSchema() -> None:
+    engine = createDatabaseEngine(getDatabaseUrl(), getSqliteProfile())
     base.metadata.create_all(engine)
+    engine.dispose()
+
+def initConnection(create_schema: bool = True) -> None:
+    global engine, base, session, async_engine, async_session
+
+    url = getDatabaseUrl()
+    profile = getSqliteProfile()
+
+    engine = createDatabaseEngine(url, profile)
+    session = sessionmaker(bind=engine)
+    if create_schema:
+        base.metadata.create_all(engine)
+
+    # The API routes use the async engine so that waiting on the database
+    # never blocks the event loop; the sync engine above is kept for
+    # schema creation, migrations and scripts.
+    async_engine = createAsyncDatabaseEngine(url, profile)
+    async_session = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+    pool_metrics.attach(async_engine.sync_engine)
+    query_metrics.attach(async_engine.sync_engine)
 
 def getConnection() -> Connection:
-    global connection
+    global engine
 
-    if connection is None:
+    if engine is None:
         raise Exception("Connection not initialized. Call initConnection() first.")
 
-    return connection
+    return engine.connect()
 
 def getBase():
     global base
@@ -45,5 +171,43 @@ def getSession():
 
     if session is None:
         raise Exception("Session not initialized. Call initConnection() first.")
-    
-    return session()
\ No newline at end of file
+
+    return session()
+
+def getAsyncEngine() -> AsyncEngine:
+    global async_engine
+
+    if async_engine is None:
+        raise Exception("Async engine not initialized. Call initConnection() first.")
+
+    return async_engine
+
+def getAsyncSession() -> AsyncSession:
+    global async_session
+
+    if async_session is None:
+        raise Exception("Async session not initialized. Call initConnection() first.")
+
+    return async_session()
+
+def getPoolStats() -> dict:
+    return pool_metrics.snapshot(getAsyncEngine().sync_engine)
+
+def getQueryStats() -> dict:
+    return query_metrics.snapshot()
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    session = getAsyncSession()
+    try:
+        # Acquire the connection up front so the pool wait is measured
+        start = time.perf_counter()
+        try:
+            await session.connection()
+        except PoolTimeoutError:
+            pool_metrics.record_timeout()
+            raise
+        pool_metrics.record_wait(time.perf_counter() - start)
+
+        yield session
+    finally:
+        await session.close()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import os
+import sys
+from uuid import UUID
+import db.session as db
+from api.product_import import IMPORT_FORMATS, import_products
+from models import Supplier, Warehouse
+
+async def run_import(warehouse_uuid, supplier_uuid, path, format):
+    db.initConnection(create_schema=False)
+    session = db.getAsyncSession()
+    try:
+        if not await session.get(Warehouse, warehouse_uuid):
+            print("Warehouse not found")
+            return False
+        if supplier_uuid and not await session.get(Supplier, supplier_uuid):
+            print("Supplier not found")
+            return False
+
+        # Read line by line, so the catalog is never held in memory at once
+        with open(path, newline="", encoding="utf-8-sig") as lines:
+            result = await import_products(session, warehouse_uuid, supplier_uuid, lines, format)
+    finally:
+        await session.close()
+        await db.getAsyncEngine().dispose()
+
+    for error in result.errors:
+        print(f"Line {error.line}{f' ({error.sku})' if error.sku else ''}: {error.error}")
+    print(f"Imported {result.imported} products, {result.failed} failed")
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a product catalog into a warehouse")
+    parser.add_argument('warehouse_id', type=UUID, help='Warehouse receiving the products')
+    parser.add_argument('path', help='CSV file with a header row, or NDJSON with one product per line')
+    parser.add_argument('--format', choices=IMPORT_FORMATS, help='Input format, by default taken from the file extension')
+    parser.add_argument('--supplier-id', type=UUID, help='Supplier linked to every imported stock')
+    args = parser.parse_args()
+
+    format = args.format or os.path.splitext(args.path)[1].lstrip(".").lower()
+    if format not in IMPORT_FORMATS:
+        parser.error(f"Can not tell the format of {args.path}, pass --format")
+
+    if not asyncio.run(run_import(args.warehouse_id, args.supplier_id, args.path, format)):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
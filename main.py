@@ -1,6 +1,4 @@
 import api.app as api
-import db.session as db
 
 if __name__ == "__main__":
-    db.initConnection() 
-    api.runApp()
\ No newline at end of file
+    api.runApp()
@@ -28,6 +28,10 @@ def rollback_migration():
     print("Rolling back last migration...")
     return run_command("alembic downgrade -1")
 
+def stamp_revision(revision):
+    print(f"Stamping database with revision: {revision}")
+    return run_command(f"alembic stamp {revision}")
+
 def show_current_revision():
     print("Current database revision:")
     return run_command("alembic current")
@@ -50,6 +54,10 @@ def main():
     # Rollback
     subparsers.add_parser('rollback', help='Rollback the last migration')
     
+    # Stamp an existing database
+    stamp_parser = subparsers.add_parser('stamp', help='Mark the database as being at a revision without running migrations')
+    stamp_parser.add_argument('revision', help='Revision to stamp')
+    
     # Current revision
     subparsers.add_parser('current', help='Show current database revision')
     
@@ -64,6 +72,8 @@ def main():
         apply_migrations()
     elif args.command == 'rollback':
         rollback_migration()
+    elif args.command == 'stamp':
+        stamp_revision(args.revision)
     elif args.command == 'current':
         show_current_revision()
     elif args.command == 'history':
@@ -2,13 +2,21 @@
 from .warehouse import Warehouse
 from .supplier import Supplier
 from .product import Product
-from .stock import Stock, stock_suppliers, stock_warehouses
+from .product_search import product_search
+from .stock import Stock, stock_suppliers
+from .stock_movement import StockMovement
+from .inventory_snapshot import InventorySnapshot, InventorySnapshotItem
+from .resource_version import ResourceVersion
 
 __all__ = [
     "Warehouse",
     "Supplier",
     "Product",
+    "product_search",
     "Stock",
     "stock_suppliers",
-    "stock_warehouses"
+    "StockMovement",
+    "InventorySnapshot",
+    "InventorySnapshotItem",
+    "ResourceVersion"
 ]
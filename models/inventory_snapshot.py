@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index, Uuid
+from uuid import uuid4
+from db.session import base as Base
+
+# Stock quantities of one warehouse as of taken_at, built from the
+# previous snapshot plus the stock movements since. Point-in-time queries
+# start from the nearest snapshot and replay only the movements after it.
+class InventorySnapshot(Base):
+    __tablename__ = "inventory_snapshots"
+    __table_args__ = (
+        # Also keeps concurrent schedulers from taking the same snapshot twice
+        Index("ix_inventory_snapshots_warehouse_id_taken_at", "warehouse_id", "taken_at", unique=True),
+    )
+    
+    id = Column(Uuid, primary_key=True, default=uuid4)
+    warehouse_id = Column(Uuid, ForeignKey('warehouses.id'), nullable=False)
+    taken_at = Column(DateTime, nullable=False)
+
+class InventorySnapshotItem(Base):
+    __tablename__ = "inventory_snapshot_items"
+    
+    snapshot_id = Column(Uuid, ForeignKey('inventory_snapshots.id'), primary_key=True)
+    product_id = Column(Uuid, ForeignKey('products.id'), primary_key=True)
+    stock_quantity = Column(Integer, nullable=False)
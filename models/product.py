@@ -1,5 +1,4 @@
-from sqlalchemy import Column, String, Integer, Numeric, DateTime
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Integer, Numeric, DateTime, Index, Uuid
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from uuid import uuid4
@@ -7,8 +6,16 @@ from db.session import base as Base
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        Index("ix_products_created_at_id", "created_at", "id"),
+        # Filtering and sorting of product listings, each ending in the
+        # pagination tiebreaker so a page is a single index range
+        Index("ix_products_category_created_at_id", "category", "created_at", "id"),
+        Index("ix_products_name_id", "name", "id"),
+        Index("ix_products_price_id", "price", "id"),
+    )
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    id = Column(Uuid, primary_key=True, default=uuid4)
     name = Column(String(100), nullable=False)
     sku = Column(String(50), nullable=False, unique=True)
     price = Column(Numeric(10, 2), nullable=False)
@@ -0,0 +1,34 @@
+from sqlalchemy import DDL, Integer, Uuid, column, event, table
+from .product import Product
+
+SEARCH_TABLE = "product_search"
+SEARCH_INDEX = "ix_products_search"
+
+# SQLite: an FTS5 table holding a copy of each product's searchable text,
+# kept in sync by the product routes (see api/search.py). It is not part of
+# the metadata because create_all can not create virtual tables; the DDL
+# below runs whenever the products table is created instead.
+product_search = table(
+    SEARCH_TABLE,
+    column("rowid", Integer),
+    column("product_id", Uuid),
+    column("name"),
+    column("description"),
+    # The hidden column named after the table, used for MATCH
+    column(SEARCH_TABLE)
+)
+
+CREATE_SEARCH_TABLE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+    "product_id UNINDEXED, name, description, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+
+# PostgreSQL: the same text searched through an expression index, which
+# the database keeps up to date on its own
+SEARCH_DOCUMENT = "to_tsvector('simple', name || ' ' || coalesce(description, ''))"
+
+CREATE_SEARCH_INDEX = f"CREATE INDEX IF NOT EXISTS {SEARCH_INDEX} ON products USING gin ({SEARCH_DOCUMENT})"
+
+event.listen(Product.__table__, "after_create", DDL(CREATE_SEARCH_TABLE).execute_if(dialect="sqlite"))
+event.listen(Product.__table__, "after_create", DDL(CREATE_SEARCH_INDEX).execute_if(dialect="postgresql"))
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, Integer
+from db.session import base as Base
+
+# Change counter per cacheable resource, e.g. "suppliers" or the inventory
+# of one warehouse. Write routes bump it in their own transaction and read
+# routes derive their ETag from it.
+class ResourceVersion(Base):
+    __tablename__ = "resource_versions"
+    
+    scope = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -1,30 +1,31 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Table
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Table, Index, Uuid
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from uuid import uuid4
 from db.session import base as Base
 
-# Association tables for many-to-many relationships
+# Association table for many-to-many relationships
 stock_suppliers = Table(
     'stock_suppliers',
     Base.metadata,
-    Column('stock_id', UUID(as_uuid=True), ForeignKey('stocks.id'), primary_key=True),
-    Column('supplier_id', UUID(as_uuid=True), ForeignKey('suppliers.id'), primary_key=True)
-)
-
-stock_warehouses = Table(
-    'stock_warehouses', 
-    Base.metadata,
-    Column('stock_id', UUID(as_uuid=True), ForeignKey('stocks.id'), primary_key=True),
-    Column('warehouse_id', UUID(as_uuid=True), ForeignKey('warehouses.id'), primary_key=True)
+    Column('stock_id', Uuid, ForeignKey('stocks.id'), primary_key=True),
+    Column('supplier_id', Uuid, ForeignKey('suppliers.id'), primary_key=True)
 )
 
 class Stock(Base):
     __tablename__ = "stocks"
+    __table_args__ = (
+        Index("ix_stocks_created_at_id", "created_at", "id"),
+        # One stock row per product per warehouse; also serves every
+        # (warehouse, product) lookup in the stock routes as an index seek
+        Index("ix_stocks_warehouse_id_product_id", "warehouse_id", "product_id", unique=True),
+        # Per-product totals across warehouses, read from the index alone
+        Index("ix_stocks_product_id_stock_quantity", "product_id", "stock_quantity"),
+    )
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
-    product_id = Column(UUID(as_uuid=True), ForeignKey('products.id'), nullable=False)
+    id = Column(Uuid, primary_key=True, default=uuid4)
+    warehouse_id = Column(Uuid, ForeignKey('warehouses.id'), nullable=False)
+    product_id = Column(Uuid, ForeignKey('products.id'), nullable=False)
     sku = Column(String(50), nullable=False)
     stock_quantity = Column(Integer, nullable=False, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -32,4 +33,4 @@ class Stock(Base):
     # Relationships
     product = relationship("Product", back_populates="stocks")
     suppliers = relationship("Supplier", secondary=stock_suppliers, back_populates="stocks")
-    warehouses = relationship("Warehouse", secondary=stock_warehouses, back_populates="stocks")
+    warehouse = relationship("Warehouse", back_populates="stocks")
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index, Uuid
+from datetime import datetime
+from uuid import uuid4
+from db.session import base as Base
+
+# Append-only ledger of stock changes, written in the same transaction as
+# the change itself. Rows are never updated or deleted.
+class StockMovement(Base):
+    __tablename__ = "stock_movements"
+    __table_args__ = (
+        # History of one product in one warehouse, in keyset order
+        Index("ix_stock_movements_warehouse_id_product_id_created_at", "warehouse_id", "product_id", "created_at", "id"),
+        # Movements of a whole warehouse in a time range, for snapshots
+        Index("ix_stock_movements_warehouse_id_created_at", "warehouse_id", "created_at"),
+    )
+    
+    id = Column(Uuid, primary_key=True, default=uuid4)
+    warehouse_id = Column(Uuid, ForeignKey('warehouses.id'), nullable=False)
+    product_id = Column(Uuid, ForeignKey('products.id'), nullable=False)
+    # initial, increase, decrease, transfer_in or transfer_out
+    movement_type = Column(String(20), nullable=False)
+    # Signed change applied to the stock quantity
+    quantity = Column(Integer, nullable=False)
+    supplier_id = Column(Uuid, nullable=True)
+    # The other side of a transfer
+    counterpart_warehouse_id = Column(Uuid, nullable=True)
+    reason = Column(String(255), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,5 +1,4 @@
-from sqlalchemy import Column, String, DateTime
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, DateTime, Index, Uuid
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from uuid import uuid4
@@ -7,8 +6,11 @@ from db.session import base as Base
 
 class Supplier(Base):
     __tablename__ = "suppliers"
+    __table_args__ = (
+        Index("ix_suppliers_created_at_id", "created_at", "id"),
+    )
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    id = Column(Uuid, primary_key=True, default=uuid4)
     name = Column(String(100), nullable=False)
     contact_email = Column(String(100), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -1,5 +1,4 @@
-from sqlalchemy import Column, String, DateTime
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, DateTime, Index, Uuid
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from uuid import uuid4
@@ -7,11 +6,14 @@ from db.session import base as Base
 
 class Warehouse(Base):
     __tablename__ = "warehouses"
+    __table_args__ = (
+        Index("ix_warehouses_created_at_id", "created_at", "id"),
+    )
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    id = Column(Uuid, primary_key=True, default=uuid4)
     name = Column(String(100), nullable=False)
     location = Column(String(255), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
-    stocks = relationship("Stock", secondary="stock_warehouses", back_populates="warehouses")
+    stocks = relationship("Stock", back_populates="warehouse")
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+
+import argparse
+from sqlalchemy import func, select, update
+import db.session as db
+from models import Product, Stock
+
+def reconcile_product_stock(dry_run):
+    products = Product.__table__
+    stocks = Stock.__table__
+    total = select(func.coalesce(func.sum(stocks.c.stock_quantity), 0)).where(
+        stocks.c.product_id == products.c.id
+    ).scalar_subquery()
+
+    engine = db.createDatabaseEngine(db.getDatabaseUrl(), db.getSqliteProfile())
+    try:
+        # One set-based statement recomputes every drifted total at once
+        with engine.begin() as connection:
+            drifted = connection.scalar(select(func.count()).select_from(products).where(products.c.stock_quantity != total))
+            print(f"Products with a stock total out of step: {drifted}")
+
+            if drifted and not dry_run:
+                connection.execute(update(products).where(products.c.stock_quantity != total).values(stock_quantity=total))
+                print("Product stock totals reconciled")
+    finally:
+        engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute Product.stock_quantity as the sum of its stock across warehouses")
+    parser.add_argument('--dry-run', action='store_true', help='Only report how many products are out of step')
+    args = parser.parse_args()
+
+    reconcile_product_stock(args.dry_run)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import os
+
+import httpx
+import pytest
+import pytest_asyncio
+
+# Read when the limiter is created on import; keeps the rate limit buckets of
+# a test run out of db/rate_limits.sqlite
+os.environ.setdefault("RATE_LIMIT_STORAGE_URI", "sqlite:///:memory:")
+
+import db.session as db
+from api.app import create_app
+from api.cache import warehouse_cache
+from api.rate_limiter import limiter
+
+# Every test gets its own SQLite file, so tests never touch the configured
+# database nor see each other's rows
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'test.sqlite'}")
+    db.initConnection()
+    warehouse_cache.clear()
+    yield db
+    db.engine.dispose()
+
+# The ASGI transport does not run the lifespan; the database fixture has
+# already connected. Rate limits are off, tests hit the same routes many times.
+@pytest_asyncio.fixture
+async def client(database, monkeypatch):
+    monkeypatch.setattr(limiter, "enabled", False)
+    transport = httpx.ASGITransport(app=create_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    await db.getAsyncEngine().dispose()
+
+async def create_warehouse(client: httpx.AsyncClient, name: str = "Main") -> str:
+    response = await client.post("/api/warehouses/", json={"name": name, "location": "Test"})
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+async def create_product(client: httpx.AsyncClient, warehouse_id: str, sku: str, stock_quantity: int) -> str:
+    response = await client.post(f"/api/warehouses/{warehouse_id}/products/", json={
+        "name": f"Product {sku}",
+        "sku": sku,
+        "price": 1.0,
+        "stock_quantity": stock_quantity
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
@@ -0,0 +1,113 @@
+from uuid import uuid4
+
+import pytest
+
+from conftest import create_product, create_warehouse
+
+pytestmark = pytest.mark.asyncio
+
+MATCH_ANY = {"If-None-Match": "*"}
+
+async def test_match_any_is_not_modified_for_existing_resources(client):
+    warehouse_id = await create_warehouse(client)
+    product_id = await create_product(client, warehouse_id, "ETAG-1", 5)
+    supplier = await client.post("/api/suppliers/", json={"name": "Acme", "contact_email": "acme@test.local"})
+
+    for path in (f"/api/warehouses/{warehouse_id}",
+                 f"/api/warehouses/{warehouse_id}/products/{product_id}",
+                 f"/api/warehouses/{warehouse_id}/inventory/{product_id}",
+                 f"/api/warehouses/{warehouse_id}/inventory/{product_id}/movements",
+                 f"/api/suppliers/{supplier.json()['id']}"):
+        response = await client.get(path, headers=MATCH_ANY)
+        assert response.status_code == 304, path
+
+async def test_match_any_does_not_hide_a_missing_resource(client):
+    # No representation exists, so `*` does not match and the 404 stands
+    warehouse_id = await create_warehouse(client)
+    other_warehouse_id = await create_warehouse(client, "Other")
+    product_id = await create_product(client, other_warehouse_id, "ETAG-2", 5)
+    missing = uuid4()
+
+    for path in (f"/api/warehouses/{missing}",
+                 f"/api/warehouses/{warehouse_id}/products/{missing}",
+                 f"/api/warehouses/{warehouse_id}/inventory/{product_id}",
+                 f"/api/warehouses/{warehouse_id}/inventory/{product_id}/movements",
+                 f"/api/suppliers/{missing}"):
+        response = await client.get(path, headers=MATCH_ANY)
+        assert response.status_code == 404, path
+
+async def test_stock_changes_invalidate_quantities_but_not_the_catalogue(client):
+    warehouse_id = await create_warehouse(client)
+    product_id = await create_product(client, warehouse_id, "ETAG-3", 5)
+    listing = f"/api/warehouses/{warehouse_id}/products/"
+    names = f"{listing}?fields=id,name"
+    detail = f"{listing}{product_id}"
+    etags = {path: (await client.get(path)).headers["ETag"] for path in (listing, names, detail)}
+
+    response = await client.post(f"/api/warehouses/{warehouse_id}/inventory/{product_id}/decrease",
+        json={"quantity": 2, "reason": "sold"})
+    assert response.status_code == 200
+
+    # Quantities changed; a listing of names only did not
+    for path in (listing, detail):
+        response = await client.get(path, headers={"If-None-Match": etags[path]})
+        assert response.status_code == 200, path
+    assert (await client.get(detail)).json()["stock_quantity"] == 3
+    response = await client.get(names, headers={"If-None-Match": etags[names]})
+    assert response.status_code == 304
+
+async def test_stock_changes_leave_the_products_version_alone(client, database):
+    warehouse_id = await create_warehouse(client)
+    product_id = await create_product(client, warehouse_id, "ETAG-4", 5)
+
+    with database.getConnection() as connection:
+        before = connection.exec_driver_sql("SELECT version FROM resource_versions WHERE scope = 'products'").scalar()
+    await client.post(f"/api/warehouses/{warehouse_id}/inventory/{product_id}/decrease", json={"quantity": 1, "reason": "sold"})
+    with database.getConnection() as connection:
+        after = connection.exec_driver_sql("SELECT version FROM resource_versions WHERE scope = 'products'").scalar()
+    assert before == after
+
+@pytest.mark.parametrize("fields", [None, "id,name"])
+@pytest.mark.parametrize("bulk", [False, True])
+async def test_in_warehouse_listing_sees_stock_transferred_in(client, fields, bulk):
+    source_id = await create_warehouse(client, "Source")
+    target_id = await create_warehouse(client, "Target")
+    product_id = await create_product(client, source_id, "ETAG-5", 5)
+    listing = f"/api/warehouses/{target_id}/products/?in_warehouse=true" + (f"&fields={fields}" if fields else "")
+
+    response = await client.get(listing)
+    assert response.json() == []
+    etag = response.headers["ETag"]
+
+    transfer = {"quantity": 2, "target_warehouse_id": target_id, "reason": "restock"}
+    if bulk:
+        response = await client.post(f"/api/warehouses/{source_id}/inventory/bulk",
+            json={"operations": [{"operation": "transfer", "product_id": product_id, **transfer}]})
+    else:
+        response = await client.post(f"/api/warehouses/{source_id}/inventory/{product_id}/transfer", json=transfer)
+    assert response.status_code == 200, response.text
+
+    response = await client.get(listing, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [product["id"] for product in response.json()] == [product_id]
+
+def vary(response) -> set:
+    return {value.strip().lower() for value in response.headers.get("vary", "").split(",") if value.strip()}
+
+async def test_not_modified_varies_like_the_response_it_revalidates(client):
+    warehouse_id = await create_warehouse(client)
+    product_id = await create_product(client, warehouse_id, "ETAG-6", 5)
+
+    for path in ("/api/warehouses/",
+                 "/api/suppliers/",
+                 f"/api/warehouses/{warehouse_id}/products/",
+                 f"/api/warehouses/{warehouse_id}/inventory/",
+                 f"/api/warehouses/{warehouse_id}/inventory/{product_id}/movements",
+                 "/api/products/search?q=product",
+                 f"/api/warehouses/{warehouse_id}",
+                 f"/api/warehouses/{warehouse_id}/products/{product_id}"):
+        response = await client.get(path)
+        assert response.status_code == 200, path
+        revalidated = await client.get(path, headers={"If-None-Match": response.headers["ETag"]})
+        assert revalidated.status_code == 304, path
+        assert vary(revalidated) == vary(response), path
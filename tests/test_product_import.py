@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+import api.routes.product_import as product_import
+from conftest import create_warehouse
+
+pytestmark = pytest.mark.asyncio
+
+LIMIT = 1024
+
+def catalog(count: int) -> bytes:
+    return "".join(
+        json.dumps({"name": f"Product {i}", "sku": f"IMP-{i}", "price": 1.0, "stock_quantity": 1}) + "\n"
+        for i in range(count)
+    ).encode()
+
+@pytest.fixture
+def small_limit(monkeypatch):
+    monkeypatch.setattr(product_import, "MAX_IMPORT_BYTES", LIMIT)
+
+async def test_import_within_the_limit(client, small_limit):
+    warehouse_id = await create_warehouse(client)
+    body = catalog(5)
+    assert len(body) <= LIMIT
+
+    response = await client.post(f"/api/warehouses/{warehouse_id}/products/import", content=body)
+    assert response.status_code == 200, response.text
+    assert response.json()["imported"] == 5
+
+async def test_oversized_content_length_is_refused_before_reading(client, small_limit):
+    warehouse_id = await create_warehouse(client)
+    read = []
+
+    async def body():
+        read.append(True)
+        yield catalog(50)
+
+    response = await client.post(f"/api/warehouses/{warehouse_id}/products/import", content=body(),
+        headers={"Content-Length": str(LIMIT + 1)})
+    assert response.status_code == 413
+    assert not read
+
+async def test_chunked_body_is_cut_off_at_the_limit(client, small_limit):
+    warehouse_id = await create_warehouse(client)
+    chunk = b" " * 256
+    sent = []
+
+    # No Content-Length; the body goes on for far longer than the limit
+    async def body():
+        for _ in range(1000):
+            sent.append(len(chunk))
+            yield chunk
+
+    response = await client.post(f"/api/warehouses/{warehouse_id}/products/import", content=body())
+    assert response.status_code == 413
+    assert sum(sent) <= LIMIT + len(chunk)
@@ -0,0 +1,51 @@
+import pytest
+from sqlalchemy import event
+
+import db.session as db
+from conftest import create_warehouse
+
+pytestmark = pytest.mark.asyncio
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.statements = 0
+        self.commits = 0
+        event.listen(engine, "before_cursor_execute", self.on_statement)
+        event.listen(engine, "commit", self.on_commit)
+
+    def on_statement(self, *args):
+        self.statements += 1
+
+    def on_commit(self, *args):
+        self.commits += 1
+
+    def reset(self):
+        self.statements = 0
+        self.commits = 0
+
+@pytest.fixture
+def counter(client):
+    return QueryCounter(db.getAsyncEngine().sync_engine)
+
+# Statement and commit budgets per request; an executemany counts once, it
+# is a single round trip. Lower a budget when a change saves a statement.
+async def test_create_product_budget(client, counter):
+    warehouse_id = await create_warehouse(client)
+    url = f"/api/warehouses/{warehouse_id}/products/"
+
+    # The first product warms the warehouse cache and the pool
+    await client.post(url, json={"name": "Warm up", "sku": "COUNT-0", "price": 1.0, "stock_quantity": 1})
+
+    counter.reset()
+    response = await client.post(url, json={"name": "Counted", "sku": "COUNT-1", "price": 1.0, "stock_quantity": 5})
+    assert response.status_code == 200
+    assert counter.statements <= 5
+    assert counter.commits <= 1
+
+    # A duplicate SKU fails on the unique constraint, then one lookup tells
+    # which constraint it was
+    counter.reset()
+    response = await client.post(url, json={"name": "Counted", "sku": "COUNT-1", "price": 1.0, "stock_quantity": 5})
+    assert response.status_code == 400
+    assert counter.statements <= 2
+    assert counter.commits == 0
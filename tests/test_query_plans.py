@@ -0,0 +1,97 @@
+from pathlib import Path
+from uuid import UUID, uuid4
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import and_, create_engine, func, select, update
+
+from api.filters import starts_with
+from db.session import base
+from models import Product, Stock
+
+ROOT = Path(__file__).resolve().parent.parent
+
+WAREHOUSE_ID, PRODUCT_ID = uuid4(), uuid4()
+
+# Plans are checked against the schema built from the models and against
+# the one the migrations build, so an index missing from either fails
+@pytest.fixture(params=["metadata", "migrations"])
+def connection(request, tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'plans.sqlite'}"
+    if request.param == "migrations":
+        monkeypatch.setenv("DATABASE_URL", url)
+        config = Config()
+        config.set_main_option("script_location", str(ROOT / "alembic"))
+        command.upgrade(config, "head")
+
+    engine = create_engine(url)
+    if request.param == "metadata":
+        base.metadata.create_all(engine)
+
+    with engine.connect() as connection:
+        yield connection
+    engine.dispose()
+
+def explain(connection, statement) -> str:
+    compiled = statement.compile(connection)
+    params = tuple(value.hex if isinstance(value, UUID) else value for value in compiled.params.values())
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+    return " | ".join(row[-1] for row in rows)
+
+# Every (warehouse, product) lookup in the stock routes must be a seek on
+# the composite index, never a scan or a correlated subquery
+STOCK_LOOKUPS = {
+    "stock lookup": select(Stock.id).where(Stock.product_id == PRODUCT_ID, Stock.warehouse_id == WAREHOUSE_ID),
+    "stock update": update(Stock).where(Stock.product_id == PRODUCT_ID, Stock.warehouse_id == WAREHOUSE_ID)
+        .values(stock_quantity=Stock.stock_quantity + 1),
+    "warehouse inventory": select(Stock.sku).where(Stock.warehouse_id == WAREHOUSE_ID),
+}
+
+@pytest.mark.parametrize("name", STOCK_LOOKUPS)
+def test_stock_lookups_seek_the_composite_index(connection, name):
+    plan = explain(connection, STOCK_LOOKUPS[name])
+    assert "USING INDEX ix_stocks_warehouse_id_product_id" in plan
+    assert "SCAN" not in plan
+
+# Filtered and sorted product listings must walk an index in page order,
+# so a page stops after `limit` rows instead of sorting them all
+LISTING = select(Product.id, Product.name, Product.price).limit(101)
+
+LISTINGS = {
+    "products by created_at": (LISTING.order_by(Product.created_at, Product.id), "ix_products_created_at_id"),
+    "products by category": (LISTING.where(Product.category == "tools").order_by(Product.created_at, Product.id),
+        "ix_products_category_created_at_id"),
+    "products by name": (LISTING.order_by(Product.name.desc(), Product.id.desc()), "ix_products_name_id"),
+    "products by name prefix": (LISTING.where(starts_with(Product.name, "Ham")).order_by(Product.name, Product.id),
+        "ix_products_name_id"),
+    "products by price range": (LISTING.where(Product.price >= 10, Product.price <= 20).order_by(Product.price, Product.id),
+        "ix_products_price_id"),
+    "stocks by created_at": (select(Stock.id).order_by(Stock.created_at, Stock.id).limit(101), "ix_stocks_created_at_id"),
+}
+
+@pytest.mark.parametrize("name", LISTINGS)
+def test_listings_walk_an_index_in_page_order(connection, name):
+    statement, index = LISTINGS[name]
+    plan = explain(connection, statement)
+    assert index in plan
+    assert "TEMP B-TREE" not in plan
+
+def test_in_warehouse_listing_starts_from_the_warehouse_stock(connection):
+    # Sorting what the warehouse stocks is bounded by the warehouse, not
+    # the whole catalogue
+    statement = LISTING.join(Stock, and_(Stock.warehouse_id == WAREHOUSE_ID, Stock.product_id == Product.id)) \
+        .order_by(Product.created_at, Product.id)
+    plan = explain(connection, statement)
+    assert plan.startswith("SEARCH stocks USING COVERING INDEX ix_stocks_warehouse_id_product_id")
+    assert "SCAN" not in plan
+
+def test_inventory_totals_group_in_page_order(connection):
+    statement = select(Product.id, Product.stock_quantity, func.count(Stock.product_id)) \
+        .outerjoin(Stock, Stock.product_id == Product.id) \
+        .group_by(Product.created_at, Product.id) \
+        .order_by(Product.created_at, Product.id).limit(101)
+    plan = explain(connection, statement)
+    assert "USING INDEX ix_products_created_at_id" in plan
+    assert "USING COVERING INDEX ix_stocks_product_id_stock_quantity" in plan
+    assert "TEMP B-TREE" not in plan
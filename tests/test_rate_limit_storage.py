@@ -0,0 +1,224 @@
+import multiprocessing
+import sqlite3
+import time
+from typing import Tuple
+
+import pytest
+from limits import parse
+from limits.errors import ConfigurationError
+from limits.storage import MemoryStorage, Storage
+from limits.strategies import STRATEGIES, FixedWindowRateLimiter
+
+import api.rate_limit_storage as rate_limit_storage
+from api.rate_limit_storage import SQLiteStorage, TokenBucketRateLimiter, TokenBucketSupport
+from api.rate_limiter import get_strategy, limiter
+
+# What a Redis backend keeps: one key per bucket whose value is the time the
+# bucket is full again, expiring at that time, updated in one atomic step
+class FakeRedisBuckets(Storage, TokenBucketSupport):
+    STORAGE_SCHEME = ["fake-redis"]
+
+    def __init__(self, uri: str = "fake-redis://", **options):
+        super().__init__(uri, **options)
+        self.keys = {}
+
+    @property
+    def base_exceptions(self):
+        return ConnectionError
+
+    def live(self, key: str, now: float) -> float:
+        full_at = self.keys.get(key, now)
+        if full_at <= now:
+            self.keys.pop(key, None)
+            return now
+        return full_at
+
+    def acquire_tokens(self, key: str, capacity: int, period: int, cost: int = 1) -> bool:
+        now = rate_limit_storage.time.time()
+        full_at = self.live(key, now) + cost * period / capacity
+        if full_at > now + period + rate_limit_storage.EPSILON:
+            return False
+        self.keys[key] = full_at
+        return True
+
+    def get_token_bucket(self, key: str, capacity: int, period: int) -> Tuple[float, int]:
+        now = rate_limit_storage.time.time()
+        full_at = self.live(key, now)
+        interval = period / capacity
+        return max(full_at + interval - period, now), int((now + period - full_at) / interval + rate_limit_storage.EPSILON)
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        raise NotImplementedError
+
+    def get(self, key: str) -> int:
+        raise NotImplementedError
+
+    def get_expiry(self, key: str) -> float:
+        raise NotImplementedError
+
+    def check(self) -> bool:
+        return True
+
+    def reset(self) -> int:
+        count = len(self.keys)
+        self.keys.clear()
+        return count
+
+    def clear(self, key: str) -> None:
+        self.keys.pop(key, None)
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit_storage.time, "time", clock)
+    return clock
+
+# The strategy must behave the same on the shipped storage and on the fake,
+# which is all a Redis backend would have to match
+@pytest.fixture(params=["sqlite", "fake-redis"])
+def storage(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteStorage(f"sqlite:///{tmp_path / 'rate_limits.sqlite'}")
+    return FakeRedisBuckets()
+
+def test_bucket_allows_a_burst_of_the_limit_then_refills_evenly(storage, clock):
+    limiter = TokenBucketRateLimiter(storage)
+    item = parse("30/minute")
+
+    assert [limiter.hit(item, "client") for _ in range(31)] == [True] * 30 + [False]
+    reset_time, remaining = limiter.get_window_stats(item, "client")
+    assert remaining == 0
+    assert reset_time == pytest.approx(clock.now + 2)
+
+    # One token comes back every 60 / 30 seconds, not the whole limit at
+    # the next window boundary
+    clock.now += 1.9
+    assert not limiter.test(item, "client")
+    clock.now += 0.1
+    assert limiter.hit(item, "client")
+    assert not limiter.hit(item, "client")
+
+    clock.now += 60
+    assert limiter.get_window_stats(item, "client").remaining == 30
+
+def test_buckets_are_per_client_and_per_limit(storage, clock):
+    limiter = TokenBucketRateLimiter(storage)
+    read, write = parse("3/minute"), parse("2/minute")
+
+    assert all(limiter.hit(write, "a") for _ in range(2))
+    assert not limiter.hit(write, "a")
+    assert limiter.hit(write, "b")
+    assert limiter.get_window_stats(read, "a").remaining == 3
+
+def test_cost_takes_several_tokens(storage, clock):
+    limiter = TokenBucketRateLimiter(storage)
+    item = parse("10/minute")
+
+    assert not limiter.hit(item, "client", cost=11)
+    assert limiter.hit(item, "client", cost=8)
+    assert not limiter.test(item, "client", cost=3)
+    assert not limiter.hit(item, "client", cost=3)
+    assert limiter.hit(item, "client", cost=2)
+
+def test_clear_refills_the_bucket(storage, clock):
+    limiter = TokenBucketRateLimiter(storage)
+    item = parse("2/minute")
+
+    limiter.hit(item, "client")
+    limiter.hit(item, "client")
+    limiter.clear(item, "client")
+    assert limiter.get_window_stats(item, "client").remaining == 2
+
+def test_full_buckets_are_pruned(tmp_path, clock):
+    storage = SQLiteStorage(f"sqlite:///{tmp_path / 'rate_limits.sqlite'}")
+    storage.PRUNE_INTERVAL = 10
+    limiter = TokenBucketRateLimiter(storage)
+    item = parse("5/minute")
+
+    for client in range(9):
+        limiter.hit(item, f"client-{client}")
+    clock.now += 12
+    limiter.hit(item, "client-9")
+
+    # Each idle client drew one token, back after 12 seconds
+    assert storage.connection.execute("SELECT key FROM token_buckets").fetchall() == [("LIMITER/client-9/5/1/minute",)]
+
+def test_fixed_window_counters_still_work(tmp_path, clock):
+    limiter = FixedWindowRateLimiter(SQLiteStorage(f"sqlite:///{tmp_path / 'rate_limits.sqlite'}"))
+    item = parse("2/minute")
+
+    assert [limiter.hit(item, "client") for _ in range(3)] == [True, True, False]
+    clock.now += 61
+    assert limiter.hit(item, "client")
+
+def test_token_bucket_needs_a_storage_that_supports_it():
+    with pytest.raises(NotImplementedError):
+        TokenBucketRateLimiter(MemoryStorage())
+
+def test_api_limits_are_token_buckets():
+    assert isinstance(limiter.limiter, TokenBucketRateLimiter)
+    assert "token-bucket" not in STRATEGIES
+
+@pytest.mark.parametrize("storage_uri, strategy, expected", [
+    ("sqlite:///rate_limits.sqlite", None, "token-bucket"),
+    ("memory://", None, "fixed-window"),
+    ("redis://localhost:6379", None, "fixed-window"),
+    ("memory://", "moving-window", "moving-window"),
+    ("sqlite:///rate_limits.sqlite", "fixed-window", "fixed-window"),
+])
+def test_strategy_follows_the_storage(storage_uri, strategy, expected):
+    assert get_strategy(storage_uri, strategy) == expected
+
+def test_token_bucket_on_a_storage_without_buckets_fails_at_startup():
+    with pytest.raises(ConfigurationError, match="redis://localhost:6379"):
+        get_strategy("redis://localhost:6379", "token-bucket")
+
+def test_hits_fail_open_while_another_worker_holds_the_file(tmp_path):
+    path = tmp_path / "rate_limits.sqlite"
+    limiter = TokenBucketRateLimiter(SQLiteStorage(f"sqlite:///{path}"))
+    item = parse("1/minute")
+    assert limiter.hit(item, "client")
+
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    start = time.perf_counter()
+    assert limiter.hit(item, "client")
+    fixed_window = FixedWindowRateLimiter(limiter.storage)
+    assert fixed_window.hit(item, "client")
+    # Bounded by the busy timeout, not the 5 seconds allowed at setup
+    assert time.perf_counter() - start < 1
+    other.execute("ROLLBACK")
+    other.close()
+
+    # Hits let through were not counted
+    assert not limiter.hit(item, "client")
+    assert fixed_window.hit(item, "client")
+
+def hit_shared_bucket(path: str, hits: int, results):
+    # Waits out the other processes instead of failing open, so every hit counts
+    rate_limit_storage.RATE_LIMIT_BUSY_TIMEOUT_MS = 5000
+    limiter = TokenBucketRateLimiter(SQLiteStorage(f"sqlite:///{path}"))
+    item = parse("100/hour")
+    results.put(sum(limiter.hit(item, "shared-client") for _ in range(hits)))
+
+def test_limit_is_global_across_processes(tmp_path):
+    # Every worker hits the same client's bucket; together they get the
+    # limit once, not once per process
+    path = str(tmp_path / "rate_limits.sqlite")
+    SQLiteStorage(f"sqlite:///{path}")
+
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=hit_shared_bucket, args=(path, 60, results)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert sum(results.get() for _ in workers) == 100
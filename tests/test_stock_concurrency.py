@@ -0,0 +1,48 @@
+import asyncio
+from collections import Counter
+
+import pytest
+
+from conftest import create_product, create_warehouse
+
+pytestmark = pytest.mark.asyncio
+
+INITIAL = 50
+DECREMENTS = 120
+
+async def test_parallel_decrements_never_oversell(client):
+    warehouse_id = await create_warehouse(client)
+    product_id = await create_product(client, warehouse_id, "RACE-1", INITIAL)
+
+    async def decrement():
+        response = await client.post(f"/api/warehouses/{warehouse_id}/inventory/{product_id}/decrease",
+            json={"quantity": 1, "reason": "race"})
+        return response.status_code
+
+    statuses = Counter(await asyncio.gather(*(decrement() for _ in range(DECREMENTS))))
+
+    # Exactly the stock on hand is sold, everything after is refused
+    assert statuses == {200: INITIAL, 400: DECREMENTS - INITIAL}
+
+    stock = await client.get(f"/api/warehouses/{warehouse_id}/inventory/{product_id}")
+    assert stock.json()["stock_quantity"] == 0
+
+    product = await client.get(f"/api/warehouses/{warehouse_id}/products/{product_id}")
+    assert product.json()["stock_quantity"] == 0
+
+async def test_parallel_increases_and_decreases_add_up(client):
+    warehouse_id = await create_warehouse(client)
+    product_id = await create_product(client, warehouse_id, "RACE-2", INITIAL)
+    supplier = await client.post("/api/suppliers/", json={"name": "Supplier", "contact_email": "supplier@test.local"})
+    supplier_id = supplier.json()["id"]
+
+    async def change(operation: str):
+        body = {"quantity": 1, "supplier_id": supplier_id} if operation == "increase" else {"quantity": 1, "reason": "race"}
+        response = await client.post(f"/api/warehouses/{warehouse_id}/inventory/{product_id}/{operation}", json=body)
+        return response.status_code
+
+    statuses = await asyncio.gather(*(change("increase" if i % 2 else "decrease") for i in range(2 * INITIAL)))
+    assert set(statuses) == {200}
+
+    stock = await client.get(f"/api/warehouses/{warehouse_id}/inventory/{product_id}")
+    assert stock.json()["stock_quantity"] == INITIAL